@@ -9,9 +9,37 @@ class PortalAccessConfig(PluginConfig):
     min_version = "4.4.1"
     top_level_menu = True
     required_settings = []
+    middleware = ["netbox_portal_access.profiling.ProfilingMiddleware"]
     default_settings = {
         "stale_days": 90,
         "expiring_soon_days": 14,
+        # Log a one-line audit record for push/test status writes, which skip the changelog
+        "audit_status_writes": False,
+        # Provider/tenant/user panels: fragment cache TTL (seconds) and detail rows per page
+        "panel_cache_timeout": 300,
+        "panel_page_size": 25,
+        # Coalesce repeated pushes of the same assignment queued within this window
+        "push_debounce_seconds": 5,
+        # Shared vendor rate limiting: "redis" (across workers) or "local" (per process, for tests)
+        "rate_limit_backend": "redis",
+        # Seconds a worker may wait for budget before rescheduling the rest of a push
+        "rate_limit_max_wait": 10,
+        # Circuit breaker: consecutive vendor failures before pushes to a portal pause, and for how long
+        "breaker_failure_threshold": 5,
+        "breaker_reset_seconds": 60,
+        # Automatic retry of FAILED pushes: attempts, then exponential backoff (with jitter) from base up to max
+        "push_retry_max_attempts": 5,
+        "push_retry_base_seconds": 60,
+        "push_retry_max_seconds": 3600,
+        # Per-request profiling of plugin code (headers + superuser page); keep the last N profiles
+        "profiling": False,
+        "profiling_history": 50,
     }
 
+    def ready(self):
+        super().ready()
+        from . import signals  # noqa: F401
+        from .metrics import register_collector
+        register_collector()
+
 config = PortalAccessConfig
@@ -1,7 +1,43 @@
 from __future__ import annotations
-from typing import Callable, Type
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import Executor
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache, partial
+from importlib.metadata import EntryPoint, entry_points
+from typing import Callable, Iterable, Type
+from django.db import close_old_connections
+from .metrics import VENDOR_RESPONSES
+from .profiling import span
+from .ratelimit import RateLimited, acquire
 
-_REGISTERY: dict[str, Type["BaseAdapter"]] = {}
+logger = logging.getLogger("netbox.plugins.netbox_portal_access")
+
+# Third-party packages expose adapters as ``slug = "package.module:AdapterClass"``
+# in this group; they are imported the first time a portal uses the slug.
+ENTRY_POINT_GROUP = "netbox_portal_access.adapters"
+
+_REGISTRY: dict[str, Type["BaseAdapter"]] = {}
+
+# One keep-alive session per (adapter, portal, retry/verify settings), per process.
+_SESSIONS: dict[tuple, "requests.Session"] = {}
+
+# Set by the push runner around each vendor call; request() records the last
+# HTTP status into it. A dict so calls made in worker threads write back.
+call_info: ContextVar[dict | None] = ContextVar("netbox_portal_access_call_info", default=None)
+
+def _in_worker(func: Callable, *args):
+    """
+    Call ``func`` on a pool thread. Each thread gets its own DB connection,
+    which the request/job cleanup never sees, so drop stale ones around the call.
+    """
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
 
 def register(
         slug: str,
@@ -10,7 +46,7 @@ def register(
         requires_config: bool = False,
         required_keys: tuple[str, ...] = ()) -> Callable:
     def dec(cls: Type["BaseAdapter"]):
-        _REGISTERY[slug] = cls
+        _REGISTRY[slug] = cls
         cls.slug = slug
         cls.label = label
         cls.requires_config = requires_config
@@ -18,25 +54,54 @@ def register(
         return cls
     return dec
 
+@lru_cache(maxsize=1)
+def _entry_points() -> dict[str, EntryPoint]:
+    """Installed adapter entry points by slug. Reads package metadata only; nothing is imported."""
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
 def get(slug: str) -> Type["BaseAdapter"] | None:
-    return _REGISTERY[slug]
+    """The adapter class for ``slug``, importing its entry point on first use; None if unknown or broken."""
+    if slug in _REGISTRY:
+        return _REGISTRY[slug]
+    ep = _entry_points().get(slug)
+    if ep is None:
+        return None
+    try:
+        cls = ep.load()
+    except Exception:
+        logger.exception("Could not load portal adapter %r from %s", slug, ep.value)
+        return None
+    # Classes that don't use @register get the entry point name as slug/label
+    if slug not in _REGISTRY:
+        cls.slug = cls.slug or slug
+        cls.label = cls.label or slug
+        _REGISTRY[slug] = cls
+    return _REGISTRY[slug]
 
 def all_registered() -> dict[str, Type["BaseAdapter"]]:
-    return dict(_REGISTERY)
+    """Adapters imported so far (built-ins plus entry points already used)."""
+    return dict(_REGISTRY)
 
 def available_choices(plugins_config: dict) -> list[tuple[str, str]]:
-    """Return [(slug, label)] filtered by PLUGINS_CONFIG presence if required."""
-    out: list[tuple[str, str]] = []
+    """
+    Return [(slug, label)] filtered by PLUGINS_CONFIG presence if required.
+
+    Entry-point adapters that haven't been imported yet are listed without
+    loading them: the label comes from ``adapters[slug]["label"]`` in the
+    plugin config, falling back to the entry point name.
+    """
     cfg_root = (plugins_config or {}).get("netbox_portal_access", {})
     adapters_cfg = cfg_root.get("adapters", {}) or {}
-    for slug, cls in sorted(_REGISTERY.items(), key=lambda x: x[1].label.lower()):
-        if getattr(cls, "required_keys", False):
-            req = getattr(cls, "required_keys", ()) or ()
-            has_all = slug in adpaters_cfg and all(k in adapters_cfg[slug] for k in req)
-            if not has_all:
-                continue
-        out.append((slug, cls.label))
-    return out
+    out: dict[str, str] = {}
+    for slug in _entry_points():
+        if slug not in _REGISTRY:
+            out[slug] = (adapters_cfg.get(slug) or {}).get("label") or slug
+    for slug, cls in _REGISTRY.items():
+        req = getattr(cls, "required_keys", ()) or ()
+        if req and not (slug in adapters_cfg and all(k in adapters_cfg[slug] for k in req)):
+            continue
+        out[slug] = cls.label
+    return sorted(out.items(), key=lambda x: x[1].lower())
 
 class BaseAdapter:
     """Adapaters may override any of thse."""
@@ -46,6 +111,25 @@ class BaseAdapter:
     required_keys: tuple[str, ...] = ()
     default_base_url: str = ""
 
+    # HTTP session tuning; adapters may override
+    pool_maxsize: int = 10
+    retry_backoff: float = 0.5
+    retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+    # Methods urllib3 may re-send: the idempotent ones. A retried POST or PATCH
+    # (e.g. after a read timeout) can repeat a create the vendor already
+    # processed, so adapters whose endpoints are safe to repeat opt in by
+    # adding them here.
+    retry_methods: frozenset[str] = frozenset({"HEAD", "GET", "OPTIONS", "PUT", "DELETE"})
+
+    # Request budget shared by all workers (None = unlimited).
+    # Portal.rate_limit_per_minute, when set, takes precedence per portal.
+    rate_limit_per_minute: int | None = None
+    rate_limit_burst: int | None = None
+
+    # Pool for the blocking work behind the async variants; the concurrent
+    # push runner sets one per portal, sized to Portal.push_concurrency.
+    executor: Executor | None = None
+
     def __init__(self, portal, config: dict, creds: dict | None = None):
         self.portal = portal
         self.config = config or {}
@@ -55,6 +139,76 @@ class BaseAdapter:
         self.timeout = getattr(portal, "request_timeout", 10)
         self.retries = getattr(portal, "request_retries", 3)
         self.verify = getattr(portal, "ssl_verify", True)
+        self.last_http_status: int | None = None
+
+    @property
+    def session(self) -> "requests.Session":
+        """Pooled keep-alive session shared by every adapter instance for this portal."""
+        key = (self.slug, getattr(self.portal, "pk", None), self.retries, self.verify, self.rate_limited)
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = _SESSIONS[key] = self.build_session()
+        return session
+
+    def build_session(self) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # urllib3 re-sends below throttle(), so with a request budget in place
+        # only connection failures (nothing reached the vendor) are retried here;
+        # 429s surface as RateLimited and other errors go through the push retry.
+        rate_limited = self.rate_limited
+        retry = Retry(
+            total=self.retries,
+            read=0 if rate_limited else None,
+            backoff_factor=self.retry_backoff,
+            status_forcelist=() if rate_limited else self.retry_statuses,
+            allowed_methods=self.retry_methods,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        pool_maxsize = max(self.pool_maxsize, getattr(self.portal, "push_concurrency", 1) or 1)
+        http = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_maxsize)
+        session = requests.Session()
+        session.mount("https://", http)
+        session.mount("http://", http)
+        session.verify = self.verify
+        return session
+
+    @property
+    def rate_limited(self) -> bool:
+        return bool(getattr(self.portal, "rate_limit_per_minute", None) or self.rate_limit_per_minute)
+
+    def throttle(self) -> None:
+        """Take one request from the shared budget; raises RateLimited if it stays exhausted."""
+        portal_limit = getattr(self.portal, "rate_limit_per_minute", None)
+        if portal_limit:
+            acquire(f"portal:{self.portal.pk}", portal_limit)
+        elif self.rate_limit_per_minute:
+            acquire(f"adapter:{self.slug}", self.rate_limit_per_minute, self.rate_limit_burst)
+
+    def request(self, method: str, url: str = "", **kwargs) -> "requests.Response":
+        """
+        Send a request through the pooled session; relative URLs are joined to
+        base_url. A 429 that survives the session's retries raises RateLimited.
+        """
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.base_url.rstrip('/')}/{url.lstrip('/')}" if url else self.base_url
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("verify", self.verify)
+        self.throttle()
+        with span("adapter", self.slug):
+            response = self.session.request(method, url, **kwargs)
+        self.last_http_status = response.status_code
+        VENDOR_RESPONSES.labels(self.slug or "none", str(response.status_code)).inc()
+        info = call_info.get()
+        if info is not None:
+            info["http_status"] = response.status_code
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            raise RateLimited(f"portal:{getattr(self.portal, 'pk', None)}", float(retry_after) if retry_after.isdigit() else 30.0)
+        return response
 
     def ping(self) -> bool:
         return True
@@ -77,12 +231,81 @@ class BaseAdapter:
             return ok, msg, assignment.remote_id
         return self.create_access(assignment)
 
+    def list_accesses(self) -> Iterable[dict] | None:
+        """
+        Stream the vendor's user list for reconciliation. Each record is a dict
+        with ``remote_id`` and/or ``username`` and optionally ``role`` (vendor
+        role name), ``active`` and ``user`` (NetBox username, used to create
+        assignments that don't exist locally yet). Prefer a generator so large
+        directories are never held in memory.
+
+        Adapters without a user-list API leave this as is (None): the Sync
+        button is hidden for them and sync jobs report "List not implemented".
+        """
+        return None
+
+    @classmethod
+    def supports_sync(cls) -> bool:
+        return cls.list_accesses is not BaseAdapter.list_accesses
+
+    def list_changes(self, cursor: str | None = None, since: datetime | None = None) -> Iterable[tuple[list[dict], str | None]] | None:
+        """
+        Optional incremental feed for sync. Yield ``(records, cursor)`` pages of
+        users changed after ``cursor`` (the opaque token returned with the last
+        page applied) or, when there is no cursor, after ``since`` (the start
+        of the last successful sync). Records are shaped as in list_accesses();
+        removed users are sent as ``{"remote_id": ..., "deleted": True}``. The
+        cursor yielded with each page is stored once the page is applied, so an
+        interrupted sync resumes from there. Adapters without a change feed
+        leave this as is (None) and get a full sync instead.
+        """
+        return None
+
+    @classmethod
+    def supports_changes(cls) -> bool:
+        return cls.list_changes is not BaseAdapter.list_changes
+
+    def push_many(self, assignments, action: str = "upsert") -> list[tuple[bool, str, str | None]] | None:
+        """
+        Optional batch push. Return one (ok, message, remote_id) per assignment,
+        in the same order, or None to have the caller push each item individually.
+        """
+        return None
+
+    async def run_in_thread(self, func: Callable, *args):
+        """
+        Await a blocking call on ``executor`` (the loop's default pool when
+        unset). The caller's context goes along, so call_info and profiling
+        spans still see the call.
+        """
+        ctx = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(ctx.run, _in_worker, func, *args))
+
+    # Async variants used by the concurrent push runner. The defaults run the
+    # sync method through run_in_thread(); adapters with a native async client
+    # can override these directly.
+    async def acreate_access(self, assignment) -> tuple[bool, str, str | None]:
+        return await self.run_in_thread(self.create_access, assignment)
+    async def aread_access(self, assignment) -> tuple[bool, str, dict | None]:
+        return await self.run_in_thread(self.read_access, assignment)
+    async def aupdate_access(self, assignment) -> tuple[bool, str, str | None]:
+        return await self.run_in_thread(self.update_access, assignment)
+    async def adeactivate_access(self, assignment) -> tuple[bool, str]:
+        return await self.run_in_thread(self.deactivate_access, assignment)
+    async def adelete_access(self, assignment) -> tuple[bool, str]:
+        return await self.run_in_thread(self.delete_access, assignment)
+    async def aupsert_access(self, assignment) -> tuple[bool, str, str | None]:
+        return await self.run_in_thread(self.upsert_access, assignment)
+
 @register("echo", "Demo Echo (httpbingo)", requires_config=True)
 class EchoAdapter(BaseAdapter):
     default_base_url = "https://httpbingo.org/post"
+    # Echoing a payload twice is harmless
+    retry_methods = BaseAdapter.retry_methods | {"POST"}
 
     def create_access(self, assignment):
-        import requests, json
+        import json
         payload = {
             "action": "create",
             "assignment_id": assignment.pk,
@@ -90,7 +313,7 @@ class EchoAdapter(BaseAdapter):
             "portal": assignment.portal.name,
             "role": assignment.role.name if assignment.role else None,
         }
-        r = requests.post(self.base_url, json=payload, timeout=self.timeout, verify=self.verify)
+        r = self.request("POST", self.base_url, json=payload)
         if r.status_code == 200:
             rid = str(hash(json.dumps(payload, sort_keys=True)))
             return True, "Echo OK (create)", rid
@@ -0,0 +1,43 @@
+from netbox.api.pagination import OptionalLimitOffsetPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(OptionalLimitOffsetPagination):
+    """
+    NetBox limit/offset pagination plus keyset paging on ``id``: pass
+    ``?after=<id>`` (``?after=0`` to start) and follow ``next``. Each page is an
+    indexed ``id > after`` range scan, so page 1,000 costs the same as page 1.
+    Keyset pages are always ordered by id and omit ``count``.
+    """
+    after_query_param = "after"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        after = request.query_params.get(self.after_query_param)
+        self.keyset = after is not None
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        try:
+            after = int(after)
+        except ValueError:
+            raise ValidationError({self.after_query_param: "Must be an integer ID."})
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        queryset = queryset.filter(pk__gt=after).order_by("pk")
+        if not self.limit:
+            self.next_after = None
+            return list(queryset)
+
+        rows = list(queryset[:self.limit + 1])
+        self.next_after = rows[self.limit - 1].pk if len(rows) > self.limit else None
+        return rows[:self.limit]
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        next_url = None
+        if self.next_after is not None:
+            next_url = replace_query_param(self.request.build_absolute_uri(), self.after_query_param, self.next_after)
+        return Response({"next": next_url, "previous": None, "results": data})
@@ -1,22 +1,69 @@
-
+from django.contrib.contenttypes.models import ContentType
 from rest_framework import serializers
 from ..models import Portal, VendorRole, AccessAssignment, PortalCredential
+from ..tasks import PUSH_ACTIONS
+from netbox.api.fields import ContentTypeField
 from netbox.api.serializers import NetBoxModelSerializer, WritableNestedSerializer
+from users.api.serializers import UserSerializer
+from utilities.api import get_serializer_for_model
+
+class PortalSerializer(NetBoxModelSerializer):
+    vendor_ct = ContentTypeField(
+        queryset=ContentType.objects.filter(app_label__in=["circuits", "tenancy"], model__in=["provider", "tenant"])
+    )
+    vendor = serializers.SerializerMethodField(read_only=True)
+    circuit_breaker = serializers.SerializerMethodField(read_only=True)
 
-class PortalSerializer(serializers.ModelSerializer):
     class Meta:
         model = Portal
-        fields = "__all__"
+        fields = (
+            "id", "url", "display_url", "display", "vendor_ct", "vendor_id", "vendor", "name",
+            "base_url", "adapter", "request_timeout", "request_retries", "ssl_verify",
+            "push_concurrency", "rate_limit_per_minute", "last_sync_at", "circuit_breaker", "notes", "tags", "custom_fields",
+            "created", "last_updated",
+        )
+        read_only_fields = ("last_sync_at",)
+        brief_fields = ("id", "url", "display", "name")
+
+    def get_vendor(self, obj):
+        # Resolved from the GFK prefetch done by Portal.objects.with_vendor()
+        if obj.vendor is None:
+            return None
+        serializer = get_serializer_for_model(obj.vendor)
+        return serializer(obj.vendor, nested=True, context=self.context).data
+
+    def get_circuit_breaker(self, obj) -> dict:
+        return obj.breaker_status
+
+class VendorRoleSerializer(NetBoxModelSerializer):
+    portal = PortalSerializer(nested=True)
 
-class VendorRoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = VendorRole
-        fields = "__all__"
+        fields = (
+            "id", "url", "display_url", "display", "portal", "name", "category", "description",
+            "tags", "custom_fields", "created", "last_updated",
+        )
+        brief_fields = ("id", "url", "display", "name", "category")
+
+class AccessAssignmentSerializer(NetBoxModelSerializer):
+    portal = PortalSerializer(nested=True)
+    role = VendorRoleSerializer(nested=True)
+    user = UserSerializer(nested=True, required=False, allow_null=True)
 
-class AccessAssignmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = AccessAssignment
-        fields = "__all__"
+        fields = (
+            "id", "url", "display_url", "display", "user", "contact_ct", "contact_id",
+            "portal", "role", "account_identifier", "username_on_portal", "active",
+            "mfa_type", "sso_provider", "last_verified", "expires_on", "notes", "remote_id",
+            "needs_push", "last_push_status", "last_push_at", "last_push_message", "last_push_action", "push_attempts", "next_retry_at",
+            "tags", "custom_fields", "created", "last_updated",
+        )
+        read_only_fields = (
+            "needs_push", "last_push_status", "last_push_at", "last_push_message", "last_push_action", "push_attempts", "next_retry_at",
+        )
+        brief_fields = ("id", "url", "display", "user", "portal", "role", "active")
 
 class NestedPortalSerializer(WritableNestedSerializer):
     class Meta:
@@ -41,3 +88,13 @@ class NestedPortalCredentialSerializer(WritableNestedSerializer):
     class Meta:
         model = PortalCredential
         fields = ('id', 'display')
+
+class BulkPushSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+    filter = serializers.DictField(required=False, help_text="AccessAssignment filterset parameters")
+    action = serializers.ChoiceField(choices=PUSH_ACTIONS, default="upsert")
+
+    def validate(self, data):
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError("Provide exactly one of 'ids' or 'filter'.")
+        return data
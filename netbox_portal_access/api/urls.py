@@ -1,10 +1,16 @@
 
+from django.urls import path
 from netbox.api.routers import NetBoxRouter
-from .views import PortalViewSet, VendorRoleViewSet, AccessAssignmentViewSet
+from .views import PortalViewSet, VendorRoleViewSet, AccessAssignmentViewSet, AccessReportView, BulkPushView, MetricsView, PushJobView
 
 router = NetBoxRouter()
 router.register("portals", PortalViewSet)
 router.register("vendor-roles", VendorRoleViewSet)
 router.register("assignments", AccessAssignmentViewSet)
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("report/", AccessReportView.as_view(), name="access-report"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("push/", BulkPushView.as_view(), name="push"),
+    path("push/<str:job_id>/", PushJobView.as_view(), name="push-status"),
+] + router.urls
@@ -1,16 +1,181 @@
 
+import logging
+from netbox.api.authentication import IsAuthenticatedOrLoginNotRequired
 from netbox.api.viewsets import NetBoxModelViewSet
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.urls import reverse
+from django_rq import get_queue
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from ..models import Portal, VendorRole, AccessAssignment
-from .serializers import PortalSerializer, VendorRoleSerializer, AccessAssignmentSerializer
+from ..filters import PortalFilterSet, VendorRoleFilterSet, AccessAssignmentFilterSet
+from ..reports import BUCKETS, access_report, bucket_assignments
+from ..imports import AccessAssignmentImporter, VendorRoleImporter, parse_records
+from .. import metrics
+from ..tasks import push_assignments, push_assignments_async, push_job
+from .pagination import KeysetPagination
+from .serializers import PortalSerializer, VendorRoleSerializer, AccessAssignmentSerializer, BulkPushSerializer
+
+logger = logging.getLogger("netbox.plugins.netbox_portal_access")
+
+# Bulk pushes run as either job, depending on the portals' push_concurrency
+PUSH_JOB_NAMES = {f"{func.__module__}.{func.__name__}" for func in (push_assignments, push_assignments_async)}
+
+def _job_error(job):
+    """'ExcClass: message' for a failed job; the traceback itself only goes to the server log."""
+    if not job.exc_info:
+        return "Push job failed."
+    logger.error("Push job %s failed:\n%s", job.id, job.exc_info)
+    lines = [line for line in job.exc_info.strip().splitlines() if line.strip()]
+    return lines[-1].strip() if lines else "Push job failed."
+
+class BulkImportMixin:
+    """
+    POST .../bulk-import/ with a JSON list of rows, or {"data": "...", "format": "csv|json|yaml"}.
+    All rows are validated first and inserted with bulk_create in one transaction.
+    """
+    importer = None
+
+    @action(detail=False, methods=["post"], url_path="bulk-import")
+    def bulk_import(self, request):
+        model = self.importer.model
+        if not request.user.has_perm(f"{model._meta.app_label}.add_{model._meta.model_name}"):
+            raise PermissionDenied()
+
+        payload = request.data
+        try:
+            if isinstance(payload, dict) and "data" in payload:
+                records = parse_records(payload["data"], payload.get("format", "auto"))
+            elif isinstance(payload, list) and all(isinstance(r, dict) for r in payload):
+                records = payload
+            else:
+                raise ValidationError("Expected a list of objects or a {\"data\": ..., \"format\": ...} body.")
+        except ValidationError as e:
+            return Response({"errors": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = self.importer(records, request.user)
+        created = importer.run()
+        if importer.errors:
+            return Response({"errors": importer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"created": len(created), "ids": [obj.pk for obj in created]}, status=status.HTTP_201_CREATED)
 
 class PortalViewSet(NetBoxModelViewSet):
-    queryset = Portal.objects.all()
+    queryset = Portal.objects.with_vendor().prefetch_related("tags")
     serializer_class = PortalSerializer
+    filterset_class = PortalFilterSet
+    pagination_class = KeysetPagination
 
-class VendorRoleViewSet(NetBoxModelViewSet):
-    queryset = VendorRole.objects.all()
+class VendorRoleViewSet(BulkImportMixin, NetBoxModelViewSet):
+    queryset = VendorRole.objects.with_vendor().prefetch_related("tags")
     serializer_class = VendorRoleSerializer
+    filterset_class = VendorRoleFilterSet
+    pagination_class = KeysetPagination
+    importer = VendorRoleImporter
 
-class AccessAssignmentViewSet(NetBoxModelViewSet):
-    queryset = AccessAssignment.objects.all()
+class AccessAssignmentViewSet(BulkImportMixin, NetBoxModelViewSet):
+    queryset = AccessAssignment.objects.with_vendor().prefetch_related("tags")
     serializer_class = AccessAssignmentSerializer
+    filterset_class = AccessAssignmentFilterSet
+    pagination_class = KeysetPagination
+    importer = AccessAssignmentImporter
+
+class AccessReportView(APIView):
+    """
+    Stale/expiring/expired counts per portal and role category. Pass
+    ?bucket=stale|expiring|expired (and optionally ?limit=) to include the
+    matching assignments.
+    """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        if not request.user.has_perm("netbox_portal_access.view_accessassignment"):
+            raise PermissionDenied()
+        qs = AccessAssignment.objects.restrict(request.user, "view")
+        data = access_report(qs)
+
+        bucket = request.query_params.get("bucket")
+        if bucket in BUCKETS:
+            try:
+                limit = min(max(int(request.query_params.get("limit", 50)), 1), 1000)
+            except ValueError:
+                limit = 50
+            data["assignments"] = AccessAssignmentSerializer(
+                bucket_assignments(qs, bucket, limit=limit), many=True, context={"request": request}
+            ).data
+        return Response(data)
+
+class MetricsView(APIView):
+    """
+    Prometheus exposition of the plugin metrics, for scrapers that
+    authenticate with an API token (``Authorization: Token ...``).
+    """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        if not request.user.has_perm("netbox_portal_access.view_accessassignment"):
+            raise PermissionDenied()
+        payload, content_type = metrics.render()
+        return HttpResponse(payload, content_type=content_type)
+
+class BulkPushView(APIView):
+    """
+    POST {"ids": [...]} or {"filter": {...}} with an "action" to push many
+    assignments in one batched background job. Returns the job ID.
+    """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def post(self, request):
+        if not request.user.has_perm("netbox_portal_access.can_push_vendor"):
+            raise PermissionDenied()
+        serializer = BulkPushSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        qs = AccessAssignment.objects.restrict(request.user, "view")
+        if "filter" in data:
+            filterset = AccessAssignmentFilterSet(data["filter"], queryset=qs)
+            if not filterset.is_valid():
+                return Response({"filter": filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+            qs = filterset.qs
+        else:
+            qs = qs.filter(pk__in=data["ids"])
+        ids = list(qs.order_by("pk").values_list("pk", flat=True))
+        if not ids:
+            return Response({"detail": "No matching assignments."}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = get_queue("default").enqueue(push_job(ids), assignment_ids=ids, action=data["action"])
+        return Response({
+            "job_id": job.id,
+            "action": data["action"],
+            "count": len(ids),
+            "status_url": request.build_absolute_uri(
+                reverse("plugins-api:netbox_portal_access-api:push-status", kwargs={"job_id": job.id})
+            ),
+        }, status=status.HTTP_202_ACCEPTED)
+
+class PushJobView(APIView):
+    """Status, progress counts and (once finished) per-item results of a bulk push job."""
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request, job_id):
+        if not request.user.has_perm("netbox_portal_access.can_push_vendor"):
+            raise PermissionDenied()
+        job = get_queue("default").fetch_job(job_id)
+        if job is None or job.func_name not in PUSH_JOB_NAMES:
+            raise NotFound("Push job not found.")
+
+        result = job.return_value() if hasattr(job, "return_value") else job.result
+        return Response({
+            "job_id": job.id,
+            "status": job.get_status(),
+            "enqueued_at": job.enqueued_at,
+            "started_at": job.started_at,
+            "ended_at": job.ended_at,
+            "progress": job.meta.get("progress"),
+            "result": result,
+            "error": _job_error(job) if job.is_failed else None,
+        })
@@ -0,0 +1,13 @@
+import logging
+from netbox.plugins import get_plugin_config
+
+logger = logging.getLogger("netbox.plugins.netbox_portal_access.audit")
+
+def status_write(model: str, pk, **fields) -> None:
+    """
+    Compact audit record for status-only writes that bypass save() and the
+    changelog. Enabled with the ``audit_status_writes`` plugin setting.
+    """
+    if not get_plugin_config("netbox_portal_access", "audit_status_writes"):
+        return
+    logger.info("%s %s %s", model, pk, " ".join(f"{k}={v}" for k, v in fields.items()))
@@ -0,0 +1,96 @@
+from __future__ import annotations
+import time
+from typing import Callable
+from django.core.cache import cache
+from netbox.plugins import get_plugin_config
+
+KEY_PREFIX = "netbox_portal_access:breaker"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+class CircuitBreaker:
+    """
+    Per-portal circuit breaker kept in the shared cache so every worker sees it.
+
+    After ``breaker_failure_threshold`` consecutive failed vendor calls the
+    breaker opens and pushes are rescheduled without touching the network.
+    Once ``breaker_reset_seconds`` have passed it is half-open: one worker
+    probes with ``adapter.ping()`` and either closes it or re-opens it.
+    """
+
+    def __init__(self, portal_id: int):
+        self.portal_id = portal_id
+        self.failures_key = f"{KEY_PREFIX}:{portal_id}:failures"
+        self.opened_key = f"{KEY_PREFIX}:{portal_id}:opened_at"
+        self.probe_key = f"{KEY_PREFIX}:{portal_id}:probe"
+        self.threshold = get_plugin_config("netbox_portal_access", "breaker_failure_threshold")
+        self.reset_seconds = get_plugin_config("netbox_portal_access", "breaker_reset_seconds")
+        # Local view for the current job: skip redundant cache writes, stop once tripped
+        self.clean = False
+        self.tripped = False
+
+    @property
+    def state(self) -> str:
+        opened_at = cache.get(self.opened_key)
+        if opened_at is None:
+            return CLOSED
+        return OPEN if time.time() - opened_at < self.reset_seconds else HALF_OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker becomes half-open (0 if it is not open)."""
+        opened_at = cache.get(self.opened_key)
+        if opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.time() - opened_at))
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": cache.get(self.failures_key, 0),
+            "retry_in": round(self.retry_in()),
+        }
+
+    def allow(self, probe: Callable[[], bool]) -> bool:
+        """Whether calls may go out now; runs the half-open probe when it is due."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        # Half-open: only one worker gets to probe
+        if not cache.add(self.probe_key, 1, timeout=self.reset_seconds):
+            return False
+        try:
+            ok = bool(probe())
+        except Exception:
+            ok = False
+        finally:
+            cache.delete(self.probe_key)
+        if ok:
+            self.record_success()
+        else:
+            self.trip()
+        return ok
+
+    def record_success(self) -> None:
+        if not self.clean:
+            cache.delete_many([self.failures_key, self.opened_key])
+            self.clean = True
+            self.tripped = False
+
+    def record_failure(self) -> None:
+        self.clean = False
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            cache.add(self.failures_key, 1, timeout=None)
+            failures = 1
+        if failures >= self.threshold and cache.get(self.opened_key) is None:
+            self.trip()
+
+    def trip(self) -> None:
+        cache.set(self.opened_key, time.time(), timeout=None)
+        self.clean = False
+        self.tripped = True
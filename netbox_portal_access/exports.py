@@ -0,0 +1,56 @@
+import csv
+import json
+from datetime import date, datetime
+
+# (header, queryset lookup); rows are pulled with values_list so no model
+# instances or related objects are built per row.
+EXPORT_COLUMNS = (
+    ("id", "pk"),
+    ("user", "user__username"),
+    ("portal_id", "portal_id"),
+    ("portal", "portal__name"),
+    ("role", "role__name"),
+    ("category", "role__category"),
+    ("account_identifier", "account_identifier"),
+    ("username_on_portal", "username_on_portal"),
+    ("active", "active"),
+    ("mfa_type", "mfa_type"),
+    ("sso_provider", "sso_provider"),
+    ("last_verified", "last_verified"),
+    ("expires_on", "expires_on"),
+    ("remote_id", "remote_id"),
+    ("needs_push", "needs_push"),
+    ("last_push_status", "last_push_status"),
+    ("last_push_at", "last_push_at"),
+)
+
+CHUNK_SIZE = 2000
+
+class _Echo:
+    """File-like object whose write() just hands the line back to the caller."""
+    def write(self, value):
+        return value
+
+def _rows(queryset):
+    return (
+        queryset
+        .order_by("pk")
+        .values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def iter_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    for row in _rows(queryset):
+        yield writer.writerow(["" if v is None else v for v in row])
+
+def iter_jsonl(queryset):
+    headers = [header for header, _ in EXPORT_COLUMNS]
+    for row in _rows(queryset):
+        yield json.dumps(dict(zip(headers, row)), default=_json_default) + "\n"
@@ -2,6 +2,7 @@
 import django_filters
 from netbox.filtersets import NetBoxModelFilterSet
 from .models import Portal, VendorRole, AccessAssignment, RoleCategory
+from .reports import bucket_filters
 
 class PortalFilterSet(NetBoxModelFilterSet):
     class Meta:
@@ -17,6 +18,15 @@ class VendorRoleFilterSet(NetBoxModelFilterSet):
 class AccessAssignmentFilterSet(NetBoxModelFilterSet):
     active = django_filters.BooleanFilter()
     role__category = django_filters.CharFilter(field_name='role__category')
+    needs_push = django_filters.BooleanFilter()
+    review_status = django_filters.ChoiceFilter(
+        choices=(("stale", "Stale"), ("expiring", "Expiring soon"), ("expired", "Expired")),
+        method="filter_review_status",
+        label="Review status",
+    )
     class Meta:
         model = AccessAssignment
-        fields = ['portal', 'role', 'active', 'role__category', 'user']
+        fields = ['portal', 'role', 'active', 'role__category', 'user', 'needs_push', 'last_push_status']
+
+    def filter_review_status(self, queryset, name, value):
+        return queryset.filter(active=True).filter(bucket_filters()[value])
@@ -6,7 +6,8 @@ from netbox.forms import NetBoxModelForm
 from .models import Portal, VendorRole, AccessAssignment, RoleCategory, PortalCredential
 from utilities.forms.widgets import DatePicker, APISelect
 from .adapters import available_choices
-from .secrets import mask
+from .imports import FORMAT_CHOICES
+from .secrets import DecryptionError, mask
 
 class PortalForm(NetBoxModelForm):
     vendor_ct = forms.ModelChoiceField(
@@ -18,7 +19,7 @@ class PortalForm(NetBoxModelForm):
         )
     class Meta:
         model = Portal
-        fields = ("vendor_ct", "vendor_id", "name", "base_url", "adapter", "notes")
+        fields = ("vendor_ct", "vendor_id", "name", "base_url", "adapter", "push_concurrency", "rate_limit_per_minute", "notes")
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -79,7 +80,13 @@ class PortalCredentialForm(NetBoxModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         portal = self.instance.portal
-        data = portal.get_credentials()
+        self.decrypt_error = None
+        try:
+            data = portal.get_credentials()
+        except DecryptionError as e:
+            # Don't let a key mismatch silently overwrite the stored secrets on save
+            self.decrypt_error = str(e)
+            data = {}
 
         if data.get("username"): self.fields["username"].initial = data.get("username")
         if data.get("password"): self.fields["password"].initial = mask(data.get("password"))
@@ -91,6 +98,14 @@ class PortalCredentialForm(NetBoxModelForm):
         if extra:
             self.fields["extra_json"].initial = json.dumps(extra, indent=2, sort_keys=True)
 
+    def clean(self):
+        cleaned = super().clean()
+        if self.decrypt_error:
+            raise forms.ValidationError(
+                f"{self.decrypt_error} Add the previous key to fernet_old_keys before editing these credentials."
+            )
+        return cleaned
+
     def clean_extra_json(self):
         raw = self.cleaned_data.get("extra_json", "").strip()
         if not raw:
@@ -174,3 +189,23 @@ class AccessAssignmentForm(NetBoxModelForm):
             self.fields["queue_push_now"].widget.attrs["disabled"] = "disabled"
             self.fields["queue_push_now"].help_text = "This portal does not have an API adapter configured."
 
+
+
+class BulkImportForm(forms.Form):
+    data = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={"class": "font-monospace", "rows": 15}),
+        label="Data",
+        help_text="CSV with a header row, or a JSON/YAML list of objects.",
+    )
+    upload_file = forms.FileField(required=False, label="Data file")
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, initial="auto")
+
+    def clean(self):
+        cleaned = super().clean()
+        upload = cleaned.get("upload_file")
+        if upload:
+            cleaned["data"] = upload.read().decode("utf-8-sig")
+        if not cleaned.get("data", "").strip():
+            raise forms.ValidationError("Paste data or upload a file.")
+        return cleaned
@@ -0,0 +1,240 @@
+import csv
+import io
+import json
+from abc import ABC, abstractmethod
+from datetime import date
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+import yaml
+from .models import AccessAssignment, Portal, RoleCategory, VendorRole
+from .panels import invalidate_all
+
+FORMAT_CHOICES = (
+    ("auto", "Auto-detect"),
+    ("csv", "CSV"),
+    ("json", "JSON"),
+    ("yaml", "YAML"),
+)
+
+class PermissionViolation(Exception):
+    """Created rows fall outside the importing user's object permissions."""
+
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+FALSE_VALUES = {"0", "false", "no", "n", "off"}
+
+def _chunked(seq, size: int):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+def parse_records(data: str, fmt: str = "auto") -> list[dict]:
+    """Parse CSV (with a header row), a JSON list or a YAML list into row dicts."""
+    data = data.strip()
+    if fmt == "auto":
+        if data.startswith(("[", "{")):
+            fmt = "json"
+        elif data.startswith(("---", "- ")):
+            fmt = "yaml"
+        else:
+            fmt = "csv"
+
+    if fmt == "csv":
+        return [dict(row) for row in csv.DictReader(io.StringIO(data))]
+    try:
+        records = json.loads(data) if fmt == "json" else yaml.safe_load(data)
+    except (ValueError, yaml.YAMLError) as e:
+        raise ValidationError(f"Invalid {fmt.upper()}: {e}")
+    if isinstance(records, dict):
+        records = [records]
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValidationError("Expected a list of objects.")
+    return records
+
+class BulkImporter(ABC):
+    """
+    Validate every row against lookup dicts built up front (a handful of
+    queries regardless of row count), then insert all rows with bulk_create
+    in a single transaction. Nothing is written if any row is invalid.
+
+    Lookups only see objects ``user`` may view, and the created rows must
+    satisfy the user's ``add`` permission constraints or the whole import is
+    rolled back, as with NetBox's own bulk import.
+
+    Rows created this way bypass save(), so no changelog entries are recorded.
+    """
+    model = None
+    batch_size = 1000
+    clean_exclude: tuple[str, ...] = ()
+
+    def __init__(self, records: list[dict], user):
+        self.records = records
+        self.user = user
+        self.errors: list[str] = []
+        self.portals_by_id: dict[int, Portal] = {}
+        self.portals_by_name: dict[str, list[Portal]] = {}
+
+    def run(self) -> list:
+        """Return the created objects; on validation failure return [] and populate .errors."""
+        self.build_lookups()
+        objs = []
+        for chunk_start in range(0, len(self.records), self.batch_size):
+            for i, record in enumerate(self.records[chunk_start:chunk_start + self.batch_size], start=chunk_start + 1):
+                try:
+                    obj = self.build(record)
+                    obj.clean_fields(exclude=self.clean_exclude)
+                    objs.append(obj)
+                except ValidationError as e:
+                    self.errors.append(f"Row {i}: {'; '.join(self._messages(e))}")
+        if self.errors:
+            return []
+
+        try:
+            with transaction.atomic():
+                created = self.model.objects.bulk_create(objs, batch_size=self.batch_size)
+                self.check_constraints(created)
+        except PermissionViolation as e:
+            self.errors.append(str(e))
+            return []
+        # bulk_create skips the signals that normally invalidate cached panels
+        invalidate_all()
+        return created
+
+    def check_constraints(self, created: list) -> None:
+        """Raise PermissionViolation (rolling back) if any created row falls outside the user's add constraints."""
+        pks = [obj.pk for obj in created]
+        allowed = 0
+        for chunk in _chunked(pks, self.batch_size):
+            allowed += self.model.objects.restrict(self.user, "add").filter(pk__in=chunk).count()
+        if allowed != len(pks):
+            raise PermissionViolation(
+                f"{len(pks) - allowed} row(s) are outside your permitted {self.model._meta.verbose_name_plural}."
+            )
+
+    @staticmethod
+    def _messages(error: ValidationError) -> list[str]:
+        if hasattr(error, "message_dict"):
+            return [f"{field}: {' '.join(msgs)}" for field, msgs in error.message_dict.items()]
+        return error.messages
+
+    def build_lookups(self) -> None:
+        for portal in Portal.objects.restrict(self.user, "view").only("pk", "name"):
+            self.portals_by_id[portal.pk] = portal
+            self.portals_by_name.setdefault(portal.name.lower(), []).append(portal)
+
+    def resolve_portal(self, record: dict) -> Portal:
+        value = str(record.get("portal") or record.get("portal_id") or "").strip()
+        if not value:
+            raise ValidationError({"portal": "This field is required."})
+        if value.isdigit() and int(value) in self.portals_by_id:
+            return self.portals_by_id[int(value)]
+        matches = self.portals_by_name.get(value.lower(), [])
+        if len(matches) > 1:
+            raise ValidationError({"portal": f'"{value}" matches {len(matches)} portals; use the portal ID.'})
+        if not matches:
+            raise ValidationError({"portal": f'Portal "{value}" not found.'})
+        return matches[0]
+
+    @abstractmethod
+    def build(self, record: dict):
+        """Return an unsaved model instance for one row, or raise ValidationError."""
+
+class VendorRoleImporter(BulkImporter):
+    model = VendorRole
+    clean_exclude = ("portal",)
+
+    def build_lookups(self) -> None:
+        super().build_lookups()
+        # Uniqueness is checked against every role, not just the visible ones
+        self.existing = set(VendorRole.objects.values_list("portal_id", "name"))
+        self.categories = {v.lower(): v for v, _ in RoleCategory.choices}
+        self.categories.update({label.lower(): v for v, label in RoleCategory.choices})
+
+    def build(self, record: dict) -> VendorRole:
+        portal = self.resolve_portal(record)
+        name = str(record.get("name") or "").strip()
+        if not name:
+            raise ValidationError({"name": "This field is required."})
+        category = self.categories.get(str(record.get("category") or "").strip().lower())
+        if not category:
+            raise ValidationError({"category": f'Unknown category "{record.get("category")}".'})
+        if (portal.pk, name) in self.existing:
+            raise ValidationError({"name": f'Role "{name}" already exists on {portal.name}.'})
+        self.existing.add((portal.pk, name))
+        return VendorRole(portal=portal, name=name, category=category, description=record.get("description") or "")
+
+class AccessAssignmentImporter(BulkImporter):
+    model = AccessAssignment
+    clean_exclude = ("portal", "role", "user", "contact_ct")
+    text_fields = ("account_identifier", "username_on_portal", "mfa_type", "sso_provider", "notes")
+
+    def build_lookups(self) -> None:
+        super().build_lookups()
+        portal_ids = set()
+        usernames = set()
+        for record in self.records:
+            try:
+                portal_ids.add(self.resolve_portal(record).pk)
+            except ValidationError:
+                pass
+            if record.get("user"):
+                usernames.add(str(record["user"]).strip())
+
+        self.roles: dict[tuple[int, str], int] = {}
+        for chunk in _chunked(sorted(portal_ids), self.batch_size):
+            roles = VendorRole.objects.restrict(self.user, "view").filter(portal_id__in=chunk)
+            for pk, portal_id, name in roles.values_list("pk", "portal_id", "name"):
+                self.roles[(portal_id, name.lower())] = pk
+
+        User = get_user_model()
+        self.users: dict[str, int] = {}
+        for chunk in _chunked(sorted(usernames), self.batch_size):
+            users = User.objects.restrict(self.user, "view").filter(username__in=chunk)
+            self.users.update(users.values_list("username", "pk"))
+
+    @staticmethod
+    def _bool(value, default: bool = True) -> bool:
+        if isinstance(value, bool):
+            return value
+        text = str(value if value is not None else "").strip().lower()
+        if not text:
+            return default
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValidationError({"active": f'"{value}" is not a boolean.'})
+
+    @staticmethod
+    def _date(field: str, value) -> date | None:
+        if value in (None, ""):
+            return None
+        if isinstance(value, date):
+            return value
+        try:
+            return date.fromisoformat(str(value).strip())
+        except ValueError:
+            raise ValidationError({field: f'"{value}" is not a YYYY-MM-DD date.'})
+
+    def build(self, record: dict) -> AccessAssignment:
+        portal = self.resolve_portal(record)
+        username = str(record.get("user") or "").strip()
+        if not username:
+            raise ValidationError({"user": "This field is required."})
+        user_id = self.users.get(username)
+        if not user_id:
+            raise ValidationError({"user": f'User "{username}" not found.'})
+        role_name = str(record.get("role") or "").strip()
+        role_id = self.roles.get((portal.pk, role_name.lower()))
+        if not role_id:
+            raise ValidationError({"role": f'Role "{role_name}" not found on {portal.name}.'})
+
+        return AccessAssignment(
+            portal=portal,
+            role_id=role_id,
+            user_id=user_id,
+            active=self._bool(record.get("active")),
+            last_verified=self._date("last_verified", record.get("last_verified")),
+            expires_on=self._date("expires_on", record.get("expires_on")),
+            remote_id=str(record["remote_id"]).strip() if record.get("remote_id") else None,
+            **{f: str(record.get(f) or "") for f in self.text_fields},
+        )
@@ -0,0 +1,79 @@
+from datetime import datetime, time, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from netbox_portal_access.models import PushAttempt, PushAttemptRollup
+
+ROLLUP_KEYS = ("day", "portal_id", "adapter", "action", "outcome")
+
+def _midnight(day):
+    # Local midnight, matching the day boundaries TruncDate uses
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+class Command(BaseCommand):
+    help = "Delete push attempt history older than --days, optionally rolling it up into daily counts first."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Keep this many days of raw history")
+        parser.add_argument("--rollup", action="store_true", help="Aggregate pruned rows into PushAttemptRollup")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows to delete per statement")
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+        # Cut at local midnight so each rolled-up day is complete
+        cutoff_day = timezone.localdate() - timedelta(days=options["days"])
+        old = PushAttempt.objects.filter(started_at__lt=_midnight(cutoff_day))
+
+        rolled = deleted = 0
+        if options["rollup"]:
+            # One transaction per day: its rollup is only kept if its rows are deleted
+            days = old.annotate(day=TruncDate("started_at")).values_list("day", flat=True).distinct().order_by("day")
+            for day in list(days):
+                day_qs = PushAttempt.objects.filter(
+                    started_at__gte=_midnight(day), started_at__lt=_midnight(day + timedelta(days=1)),
+                )
+                with transaction.atomic():
+                    rolled += self._rollup(day_qs)
+                    deleted += self._delete(day_qs, options["chunk_size"])
+        else:
+            deleted = self._delete(old, options["chunk_size"])
+
+        msg = f"Deleted {deleted} push attempt(s) before {cutoff_day}."
+        if options["rollup"]:
+            msg += f" Updated {rolled} daily rollup row(s)."
+        self.stdout.write(self.style.SUCCESS(msg))
+
+    def _rollup(self, qs) -> int:
+        rows = (
+            qs.annotate(day=TruncDate("started_at"))
+            .values(*ROLLUP_KEYS)
+            .annotate(attempts=Count("pk"), total_duration_ms=Coalesce(Sum("duration_ms"), 0))
+            .order_by()
+        )
+        totals = {tuple(row[k] for k in ROLLUP_KEYS): row for row in rows}
+        if not totals:
+            return 0
+
+        # Merge into rollups already recorded for these days
+        existing = PushAttemptRollup.objects.filter(day__in={key[0] for key in totals})
+        updates = []
+        for rollup in existing:
+            row = totals.pop(tuple(getattr(rollup, k) for k in ROLLUP_KEYS), None)
+            if row:
+                rollup.attempts += row["attempts"]
+                rollup.total_duration_ms += row["total_duration_ms"]
+                updates.append(rollup)
+        PushAttemptRollup.objects.bulk_update(updates, ["attempts", "total_duration_ms"], batch_size=500)
+        PushAttemptRollup.objects.bulk_create([PushAttemptRollup(**row) for row in totals.values()], batch_size=500)
+        return len(updates) + len(totals)
+
+    def _delete(self, qs, chunk_size: int) -> int:
+        # Outside a rollup each chunk commits on its own, keeping locks and undo short
+        deleted = 0
+        while ids := list(qs.values_list("pk", flat=True)[:chunk_size]):
+            with transaction.atomic():
+                deleted += PushAttempt.objects.filter(pk__in=ids).delete()[0]
+        return deleted
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from netbox_portal_access.models import PortalCredential
+from netbox_portal_access.secrets import DecryptionError, rotate_token
+
+class Command(BaseCommand):
+    help = "Re-encrypt every stored portal credential with the primary fernet_key."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows to rewrite per bulk update")
+        parser.add_argument("--dry-run", action="store_true", help="Decrypt and re-encrypt without saving")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        dry_run = options["dry_run"]
+        rotated = failed = 0
+        batch = []
+
+        qs = PortalCredential.objects.only("pk", "portal_id", "data_encrypted").order_by("pk")
+        for cred in qs.iterator(chunk_size=chunk_size):
+            if not cred.data_encrypted:
+                continue
+            try:
+                cred.data_encrypted = rotate_token(cred.data_encrypted)
+            except DecryptionError:
+                failed += 1
+                self.stderr.write(f"Credential {cred.pk} (portal {cred.portal_id}) could not be decrypted; skipped.")
+                continue
+            batch.append(cred)
+            if len(batch) >= chunk_size:
+                rotated += self._flush(batch, dry_run)
+                batch = []
+        rotated += self._flush(batch, dry_run)
+
+        verb = "Would re-encrypt" if dry_run else "Re-encrypted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {rotated} credential(s)."))
+        if failed:
+            raise CommandError(f"{failed} credential(s) could not be decrypted with the configured keys.")
+
+    def _flush(self, batch, dry_run: bool) -> int:
+        if batch and not dry_run:
+            with transaction.atomic():
+                PortalCredential.objects.bulk_update(batch, ["data_encrypted"])
+        return len(batch)
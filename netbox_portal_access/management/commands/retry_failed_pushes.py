@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django_rq import enqueue
+from netbox_portal_access.tasks import retry_failed_pushes
+
+class Command(BaseCommand):
+    help = "Re-enqueue FAILED assignment pushes whose retry backoff has elapsed. Safe to run every minute from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=5000, help="Maximum assignments to retry per run")
+        parser.add_argument("--batch-size", type=int, default=500, help="Assignments per push job")
+        parser.add_argument("--background", action="store_true", help="Run the scan itself as a background job")
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            job = enqueue(retry_failed_pushes, limit=options["limit"], batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Queued retry scan as job {job.id}."))
+            return
+        count = retry_failed_pushes(limit=options["limit"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Queued {count} assignment(s) for retry."))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from netbox_portal_access.models import Portal
+from netbox_portal_access.tasks import sync_portal, sync_portal_incremental, sync_portals
+
+class Command(BaseCommand):
+    help = (
+        "Sync portal assignments from their vendors. Incremental by default (falls back to a full "
+        "read for adapters without a change feed); schedule it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--portal", type=int, action="append", dest="portals", help="Portal ID (repeatable; default: all with an adapter)")
+        parser.add_argument("--full", action="store_true", help="Re-read the vendor's full user list")
+        parser.add_argument("--background", action="store_true", help="Enqueue one job per portal instead of syncing inline")
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            jobs = sync_portals(options["portals"], full=options["full"])
+            self.stdout.write(self.style.SUCCESS(f"Queued {len(jobs)} portal sync job(s)."))
+            return
+
+        job = sync_portal if options["full"] else sync_portal_incremental
+        qs = Portal.objects.exclude(adapter__isnull=True).exclude(adapter="")
+        if options["portals"]:
+            qs = qs.filter(pk__in=options["portals"])
+        failed = 0
+        for portal in qs.only("pk", "name", "adapter"):
+            if not portal.supports_sync:
+                self.stdout.write(f"{portal.name}: skipped, the {portal.adapter} adapter can't list vendor users")
+                continue
+            try:
+                stats = job(portal.pk)
+            except Exception as e:
+                stats = {"ok": False, "message": str(e)}
+            if not stats.pop("ok", True):
+                failed += 1
+                self.stderr.write(f"{portal.name}: {stats.get('message')}")
+                continue
+            self.stdout.write(f"{portal.name}: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
+        if failed:
+            raise CommandError(f"{failed} portal(s) failed to sync.")
@@ -0,0 +1,146 @@
+"""
+Prometheus metrics for pushes, syncs, credential decrypts and queue depth.
+
+prometheus_client is optional (NetBox installs it with django-prometheus);
+without it every metric is a no-op. Counters and histograms live in the
+default registry, so NetBox's /metrics endpoint exports them. Pushes run in
+RQ workers, so set PROMETHEUS_MULTIPROC_DIR for the web and worker processes
+to aggregate across them. Per-portal gauges and queue depth are computed at
+scrape time by PortalAccessCollector.
+"""
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover - depends on the environment
+    prometheus_client = None
+
+PREFIX = "netbox_portal_access"
+
+# Vendor calls range from a few ms (batched, local) to request_timeout
+PUSH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DECRYPT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+RECONCILE_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 1800, 3600)
+
+class _NoOpMetric:
+    """Stands in for a metric (and its labelled children) when prometheus_client is missing."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+def _metric(kind: str, name: str, documentation: str, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return _NoOpMetric()
+    return getattr(prometheus_client, kind)(f"{PREFIX}_{name}", documentation, labelnames, **kwargs)
+
+PUSH_DURATION = _metric(
+    "Histogram", "push_duration_seconds", "Vendor push call duration",
+    ("adapter", "action"), buckets=PUSH_BUCKETS,
+)
+PUSH_OUTCOMES = _metric("Counter", "pushes_total", "Push attempts by outcome", ("adapter", "action", "outcome"))
+VENDOR_RESPONSES = _metric("Counter", "vendor_http_responses_total", "Vendor API responses by HTTP status", ("adapter", "status"))
+DECRYPT_DURATION = _metric("Histogram", "decrypt_duration_seconds", "Credential decrypt duration", buckets=DECRYPT_BUCKETS)
+DECRYPT_FAILURES = _metric("Counter", "decrypt_failures_total", "Credentials that could not be decrypted")
+RECONCILE_DURATION = _metric(
+    "Histogram", "reconcile_duration_seconds", "Vendor sync (reconcile) duration",
+    ("adapter", "mode"), buckets=RECONCILE_BUCKETS,
+)
+
+def observe_push(adapter: str, action: str, outcome: str, duration_ms: int | None) -> None:
+    PUSH_OUTCOMES.labels(adapter or "none", action, outcome).inc()
+    if duration_ms is not None:
+        PUSH_DURATION.labels(adapter or "none", action).observe(duration_ms / 1000)
+
+@contextmanager
+def timed(histogram):
+    """Observe the wall time of the block on ``histogram`` (already labelled)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - t0)
+
+class PortalAccessCollector:
+    """
+    Scrape-time gauges: assignments needing a push and FAILED assignments
+    awaiting retry, per portal (one grouped query on the needs_push index),
+    plus the depth of the default RQ queue and its scheduled registry.
+    """
+
+    def describe(self):
+        # Declared up front so registering the collector doesn't hit the database
+        from prometheus_client.core import GaugeMetricFamily
+        yield GaugeMetricFamily(f"{PREFIX}_needs_push", "Assignments with unpushed changes", labels=["portal_id", "portal"])
+        yield GaugeMetricFamily(f"{PREFIX}_retry_pending", "FAILED assignments awaiting an automatic retry", labels=["portal_id", "portal"])
+        yield GaugeMetricFamily(f"{PREFIX}_queue_depth", "Jobs in the RQ queue", labels=["queue", "state"])
+
+    def collect(self):
+        from django.db.models import Count, Q
+        from prometheus_client.core import GaugeMetricFamily
+        from .models import AccessAssignment
+
+        needs_push = GaugeMetricFamily(f"{PREFIX}_needs_push", "Assignments with unpushed changes", labels=["portal_id", "portal"])
+        retry = GaugeMetricFamily(f"{PREFIX}_retry_pending", "FAILED assignments awaiting an automatic retry", labels=["portal_id", "portal"])
+        rows = (
+            AccessAssignment.objects.filter(needs_push=True)
+            .order_by()
+            .values("portal_id", "portal__name")
+            .annotate(total=Count("pk"), retry=Count("pk", filter=Q(next_retry_at__isnull=False)))
+        )
+        for row in rows:
+            # Portal names are only unique per vendor, so the id keeps label sets distinct
+            labels = [str(row["portal_id"]), row["portal__name"]]
+            needs_push.add_metric(labels, row["total"])
+            retry.add_metric(labels, row["retry"])
+        yield needs_push
+        yield retry
+
+        depth = GaugeMetricFamily(f"{PREFIX}_queue_depth", "Jobs in the RQ queue", labels=["queue", "state"])
+        try:
+            from django_rq import get_queue
+            queue = get_queue("default")
+            depth.add_metric(["default", "queued"], queue.count)
+            depth.add_metric(["default", "scheduled"], queue.scheduled_job_registry.count)
+        except Exception:
+            # Redis unavailable: report nothing rather than failing the whole scrape
+            pass
+        yield depth
+
+_collector_registered = False
+
+def register_collector() -> None:
+    """Add PortalAccessCollector to the default registry (once per process)."""
+    global _collector_registered
+    if prometheus_client is None or _collector_registered:
+        return
+    prometheus_client.REGISTRY.register(PortalAccessCollector())
+    _collector_registered = True
+
+def render() -> tuple[bytes, str]:
+    """
+    Exposition payload for the plugin metrics endpoint: aggregated across
+    processes when PROMETHEUS_MULTIPROC_DIR is set, else the default registry.
+    """
+    import os
+    if prometheus_client is None:
+        return b"", "text/plain; charset=utf-8"
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(PortalAccessCollector())
+    else:
+        register_collector()
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
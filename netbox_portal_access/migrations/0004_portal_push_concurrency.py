@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_portal_access', '0003_portalcredential'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portal',
+            name='push_concurrency',
+            field=models.PositiveSmallIntegerField(default=4, help_text='Maximum vendor requests in flight at once for concurrent pushes'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.db import migrations, models
+from django.db.models import F, Q
+
+# Push results used to be written back with save(), which sets last_updated
+# a moment after last_push_at; edits within this window count as the push itself.
+PUSH_WRITE_WINDOW = timedelta(seconds=5)
+
+
+def populate_needs_push(apps, schema_editor):
+    AccessAssignment = apps.get_model('netbox_portal_access', 'AccessAssignment')
+    AccessAssignment.objects.filter(
+        Q(last_push_status='SUCCESS', last_push_at__isnull=False),
+        Q(last_updated__isnull=True) | Q(last_updated__lte=F('last_push_at') + PUSH_WRITE_WINDOW),
+    ).update(needs_push=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_portal_access', '0004_portal_push_concurrency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessassignment',
+            name='needs_push',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.RunPython(populate_needs_push, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='accessassignment',
+            index=models.Index(fields=['portal', 'needs_push'], name='netbox_port_needs_push_idx'),
+        ),
+    ]
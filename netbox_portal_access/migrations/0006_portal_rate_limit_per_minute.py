@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_portal_access', '0005_accessassignment_needs_push'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portal',
+            name='rate_limit_per_minute',
+            field=models.PositiveIntegerField(blank=True, null=True, help_text='Vendor API request budget shared by all workers (overrides the adapter default)'),
+        ),
+    ]
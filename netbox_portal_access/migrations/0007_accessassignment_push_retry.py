@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_portal_access', '0006_portal_rate_limit_per_minute'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessassignment',
+            name='push_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='accessassignment',
+            name='next_retry_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='accessassignment',
+            index=models.Index(fields=['last_push_status', 'next_retry_at'], name='netbox_port_retry_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_portal_access', '0007_accessassignment_push_retry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PushAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=16)),
+                ('adapter', models.CharField(blank=True, max_length=64)),
+                ('started_at', models.DateTimeField(db_index=True)),
+                ('duration_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('http_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('outcome', models.CharField(choices=[('PENDING', 'Pending'), ('SUCCESS', 'Success'), ('FAILED', 'Failed')], max_length=10)),
+                ('message', models.CharField(blank=True, max_length=500)),
+                ('assignment', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='push_attempts_log', to='netbox_portal_access.accessassignment')),
+                ('portal', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='netbox_portal_access.portal')),
+            ],
+            options={
+                'ordering': ('-started_at',),
+                'indexes': [models.Index(fields=['portal', 'started_at'], name='netbox_port_attempt_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PushAttemptRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('adapter', models.CharField(blank=True, max_length=64)),
+                ('action', models.CharField(max_length=16)),
+                ('outcome', models.CharField(choices=[('PENDING', 'Pending'), ('SUCCESS', 'Success'), ('FAILED', 'Failed')], max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('total_duration_ms', models.BigIntegerField(default=0)),
+                ('portal', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='netbox_portal_access.portal')),
+            ],
+            options={
+                'ordering': ('-day',),
+                'constraints': [models.UniqueConstraint(fields=('day', 'portal', 'adapter', 'action', 'outcome'), name='netbox_port_rollup_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_portal_access', '0008_pushattempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portal',
+            name='sync_cursor',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_portal_access', '0009_portal_sync_cursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessassignment',
+            name='last_push_action',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+    ]
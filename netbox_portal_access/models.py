@@ -3,9 +3,11 @@ from django.db import models
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.urls import reverse
+from django.utils import timezone
 from netbox.models import NetBoxModel
 from .adapters import get as get_adapter
 from .secrets import encrypt_json, decrypt_json
+from .querysets import AccessAssignmentQuerySet, PortalQuerySet, VendorRoleQuerySet
 
 class RoleCategory(models.TextChoices):
     PORTAL_ADMIN = "PORTAL_ADMIN", "Portal Admin"
@@ -30,7 +32,13 @@ class Portal(NetBoxModel):
     request_timeout = models.PositiveSmallIntegerField(default=10, help_text="Seconds to wait for API responses")
     request_retries = models.PositiveSmallIntegerField(default=3, help_text="Number of times to retry failed requests")
     ssl_verify = models.BooleanField(default=True, help_text="Verify SSL certificates when connecting to the API")
+    push_concurrency = models.PositiveSmallIntegerField(default=4, help_text="Maximum vendor requests in flight at once for concurrent pushes")
+    rate_limit_per_minute = models.PositiveIntegerField(null=True, blank=True, help_text="Vendor API request budget shared by all workers (overrides the adapter default)")
     last_sync_at = models.DateTimeField(null=True, blank=True)
+    # Vendor change-feed position checkpointed by incremental sync
+    sync_cursor = models.CharField(max_length=255, blank=True, editable=False)
+
+    objects = PortalQuerySet.as_manager()
 
     class Meta:
         unique_together = [('vendor_ct', 'vendor_id', 'name')]
@@ -57,6 +65,17 @@ class Portal(NetBoxModel):
 
         return cls(self, cfg, creds)
 
+    @property
+    def supports_sync(self) -> bool:
+        """Whether this portal's adapter can list vendor users for sync."""
+        cls = get_adapter(self.adapter) if self.adapter else None
+        return bool(cls and cls.supports_sync())
+
+    @property
+    def breaker_status(self) -> dict:
+        from .breaker import CircuitBreaker
+        return CircuitBreaker(self.pk).status()
+
     def get_credentials(self) -> dict:
         cred = getattr(self, "credential", None)
         return decrypt_json(cred.data_encrypted) if cred else {}
@@ -87,12 +106,27 @@ class PortalCredential(NetBoxModel):
     def get_absolute_url(self):
         return reverse("plugins:netbox_portal_access:portal_credentials_edit", args=[self.portal.pk])
 
+    def record_test(self, ok: bool, message: str) -> None:
+        """Store a connection test result with a single UPDATE (no save(), no changelog)."""
+        from .audit import status_write
+        self.last_test_at = timezone.now()
+        self.last_test_status = "OK" if ok else "Failed"
+        self.last_test_message = message
+        PortalCredential.objects.filter(pk=self.pk).update(
+            last_test_at=self.last_test_at,
+            last_test_status=self.last_test_status,
+            last_test_message=self.last_test_message,
+        )
+        status_write("portalcredential", self.pk, status=self.last_test_status)
+
 class VendorRole(NetBoxModel):
     portal     = models.ForeignKey(Portal, on_delete=models.CASCADE, related_name='roles')
     name       = models.CharField(max_length=100)  # vendor's literal label
     category   = models.CharField(max_length=20, choices=RoleCategory.choices)
     description = models.TextField(blank=True)
 
+    objects = VendorRoleQuerySet.as_manager()
+
     class Meta:
         unique_together = [('portal', 'name')]
         ordering = ("portal", "name")
@@ -136,17 +170,23 @@ class AccessAssignment(NetBoxModel):
     last_push_at = models.DateTimeField(null=True, blank=True)
     last_push_message = models.TextField(blank=True, null=True)
 
-    @property
-    def needs_push(self) -> bool:
-        # Unpushed if never pushed or updated after last push
-        from django.utils import timezone
-        if not self.last_push_at:
-            return True
-        last_updated = getattr(self, "last_updated", None)
-        return bool(last_updated and last_updated > self.last_push_at)
+    # Maintained flag rather than a computed property so it can be filtered,
+    # sorted and indexed. save() raises it; push write-back clears it.
+    needs_push = models.BooleanField(default=True, editable=False)
+    # Automatic retries of FAILED pushes (see tasks.retry_failed_pushes)
+    push_attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    next_retry_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Action of the last push, so retries repeat a delete/deactivate rather than upserting
+    last_push_action = models.CharField(max_length=16, blank=True, editable=False)
+
+    objects = AccessAssignmentQuerySet.as_manager()
 
     class Meta:
-        indexes = [models.Index(fields=['active', 'last_verified', 'expires_on'])]
+        indexes = [
+            models.Index(fields=['active', 'last_verified', 'expires_on']),
+            models.Index(fields=['portal', 'needs_push'], name='netbox_port_needs_push_idx'),
+            models.Index(fields=['last_push_status', 'next_retry_at'], name='netbox_port_retry_idx'),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=(models.Q(user__isnull=False) | models.Q(contact_id__isnull=False)),
@@ -159,6 +199,64 @@ class AccessAssignment(NetBoxModel):
                 ("can_sync_vendor", "Can sync from vendor"),
         ]
 
+    def save(self, *args, **kwargs):
+        # An edit is a fresh change to push: it gets a full set of retries
+        self.needs_push = True
+        self.push_attempts = 0
+        self.next_retry_at = None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            reset = ("needs_push", "push_attempts", "next_retry_at")
+            kwargs["update_fields"] = [*update_fields, *(f for f in reset if f not in update_fields)]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         who = getattr(self.user, "username", None) or str(self.contact) or "Unknown"
         return f"{who} -> {self.portal} ({self.role.name})"
+
+class PushAttempt(models.Model):
+    """
+    Append-only history of vendor push attempts. Deliberately a plain model
+    (no changelog, tags or custom fields) written with bulk_create; old rows
+    are pruned or rolled up by the prune_push_attempts command.
+    """
+    assignment = models.ForeignKey(AccessAssignment, null=True, on_delete=models.SET_NULL, related_name='push_attempts_log')
+    portal     = models.ForeignKey(Portal, null=True, on_delete=models.SET_NULL, related_name='+')
+    action     = models.CharField(max_length=16)
+    adapter    = models.CharField(max_length=64, blank=True)
+    started_at = models.DateTimeField(db_index=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    http_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    outcome    = models.CharField(max_length=10, choices=AccessAssignment.PUSH_STATUS_CHOICE)
+    message    = models.CharField(max_length=500, blank=True)
+
+    class Meta:
+        ordering = ("-started_at",)
+        indexes = [
+            models.Index(fields=['portal', 'started_at'], name='netbox_port_attempt_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.outcome} @ {self.started_at}"
+
+class PushAttemptRollup(models.Model):
+    """Daily per-portal/adapter/action/outcome counts kept after raw PushAttempt rows are pruned."""
+    day        = models.DateField()
+    portal     = models.ForeignKey(Portal, null=True, on_delete=models.SET_NULL, related_name='+')
+    adapter    = models.CharField(max_length=64, blank=True)
+    action     = models.CharField(max_length=16)
+    outcome    = models.CharField(max_length=10, choices=AccessAssignment.PUSH_STATUS_CHOICE)
+    attempts   = models.PositiveIntegerField(default=0)
+    total_duration_ms = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ("-day",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=("day", "portal", "adapter", "action", "outcome"),
+                name="netbox_port_rollup_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.action} {self.outcome}: {self.attempts}"
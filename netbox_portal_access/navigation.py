@@ -18,6 +18,11 @@ items = (
             link_text="Access Assignments",
             permissions=["netbox_portal_access.view_accessassignment"],
         ),
+        PluginMenuItem(
+            link="plugins:netbox_portal_access:access_report", 
+            link_text="Access Review",
+            permissions=["netbox_portal_access.view_accessassignment"],
+        ),
 )
 
 menu = PluginMenu(
@@ -0,0 +1,62 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.safestring import mark_safe
+from netbox.plugins import get_plugin_config
+
+# Object types that get an access panel, and how to find their assignments
+VENDOR_TYPES = ("circuits.provider", "tenancy.tenant")
+PANEL_TYPES = VENDOR_TYPES + ("users.user", "netbox_portal_access.portal")
+
+def assignment_filter(object_type: str, pk) -> Q | None:
+    if object_type == "users.user":
+        return Q(user_id=pk)
+    if object_type == "netbox_portal_access.portal":
+        return Q(portal_id=pk)
+    if object_type in VENDOR_TYPES:
+        app_label, model = object_type.split(".")
+        ct = ContentType.objects.get_by_natural_key(app_label, model)
+        return Q(portal__vendor_ct=ct, portal__vendor_id=pk)
+    return None
+
+PREFIX = "netbox_portal_access:panel"
+GENERATION_KEY = f"{PREFIX}:generation"
+
+def _generation() -> int:
+    # Bumping the generation invalidates every cached panel at once
+    gen = cache.get(GENERATION_KEY)
+    if gen is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        gen = cache.get(GENERATION_KEY, 1)
+    return gen
+
+def _version_key(object_type: str, pk) -> str:
+    return f"{PREFIX}:version:{object_type}:{pk}"
+
+def panel_key(object_type: str, pk, user_id) -> str:
+    # Fragments are permission-filtered, so each viewer gets their own copy;
+    # the per-object version lets invalidate() drop all of them at once
+    version = cache.get(_version_key(object_type, pk), 0)
+    return f"{PREFIX}:{_generation()}:{object_type}:{pk}:{version}:{user_id}"
+
+def get_or_render(object_type: str, pk, user, render) -> str:
+    """Return the cached fragment for one object and viewer, rendering and storing it on a miss."""
+    key = panel_key(object_type, pk, user.pk)
+    html = cache.get(key)
+    if html is None:
+        html = str(render())
+        cache.set(key, html, timeout=get_plugin_config("netbox_portal_access", "panel_cache_timeout"))
+    return mark_safe(html)
+
+def invalidate(object_type: str, pk) -> None:
+    key = _version_key(object_type, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+def invalidate_all() -> None:
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, timeout=None)
@@ -0,0 +1,167 @@
+"""
+Opt-in per-request profiling for the plugin's views, template extensions and API.
+
+Enabled with the ``profiling`` plugin setting; otherwise the middleware
+removes itself at startup (MiddlewareNotUsed) and the span helpers cost one
+context variable lookup. For each request that touches plugin code it
+records SQL count and time (with the first plugin stack frame as each
+query's origin, so duplicates can be traced), template extension render
+time and adapter call time. Results go into a Server-Timing header, an
+X-Portal-Access-Profile summary header and a short history shown to staff
+on the profiling page.
+"""
+from __future__ import annotations
+import functools
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils import timezone
+from netbox.plugins import get_plugin_config
+
+HISTORY_KEY = "netbox_portal_access:profiling:history"
+PACKAGE_DIR = str(Path(__file__).resolve().parent)
+THIS_FILE = str(Path(__file__).resolve())
+
+_current: ContextVar["RequestProfile | None"] = ContextVar("netbox_portal_access_profile", default=None)
+
+def _origin() -> str:
+    """The innermost plugin frame on the stack, as "path:line in function"."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PACKAGE_DIR) and filename != THIS_FILE:
+            rel = filename[len(PACKAGE_DIR) + 1:]
+            return f"{rel}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ""
+
+class RequestProfile:
+    def __init__(self, request):
+        self.method = request.method
+        self.path = request.get_full_path()
+        self.started = timezone.now()
+        self.t0 = time.perf_counter()
+        self.queries: list[tuple[str, float, str]] = []
+        self.spans: dict[str, float] = defaultdict(float)
+        self.span_counts: Counter = Counter()
+        self.plugin_view = False
+
+    def wrap_query(self, execute, sql, params, many, context):
+        """
+        connection.execute_wrapper hook: time each query and note its plugin origin.
+        Only the placeholder SQL is kept; parameters can hold credentials and
+        personal data and the profiles end up in the shared cache.
+        """
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - t0) * 1000, _origin()))
+
+    def add_span(self, kind: str, name: str, ms: float) -> None:
+        self.spans[kind] += ms
+        self.span_counts[f"{kind}:{name}"] += 1
+
+    @property
+    def in_scope(self) -> bool:
+        """Only requests that ran plugin code are reported."""
+        return self.plugin_view or bool(self.spans) or any(origin for _, _, origin in self.queries)
+
+    def summary(self) -> dict:
+        by_sql: dict[str, list] = {}
+        for sql, _, origin in self.queries:
+            by_sql.setdefault(sql, []).append(origin)
+        duplicates = sorted(
+            ({"sql": sql[:300], "count": len(origins), "origins": sorted(set(o for o in origins if o))}
+             for sql, origins in by_sql.items() if len(origins) > 1),
+            key=lambda d: -d["count"],
+        )
+        plugin = [(ms, origin) for _, ms, origin in self.queries if origin]
+        return {
+            "method": self.method,
+            "path": self.path,
+            "started": self.started.isoformat(),
+            "total_ms": round((time.perf_counter() - self.t0) * 1000, 1),
+            "queries": len(self.queries),
+            "sql_ms": round(sum(ms for _, ms, _ in self.queries), 1),
+            "plugin_queries": len(plugin),
+            "plugin_sql_ms": round(sum(ms for ms, _ in plugin), 1),
+            "duplicate_queries": sum(d["count"] - 1 for d in duplicates),
+            "duplicates": duplicates[:20],
+            "spans": {kind: round(ms, 1) for kind, ms in self.spans.items()},
+            "span_counts": dict(self.span_counts),
+        }
+
+@contextmanager
+def span(kind: str, name: str = ""):
+    """Time a block into the current request profile (no-op when not profiling)."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(kind, name, (time.perf_counter() - t0) * 1000)
+
+def profiled(kind: str):
+    """Method decorator: record the call under ``kind`` as ClassName.method."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if _current.get() is None:
+                return func(self, *args, **kwargs)
+            with span(kind, f"{type(self).__name__}.{func.__name__}"):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def history() -> list[dict]:
+    return cache.get(HISTORY_KEY) or []
+
+def _remember(summary: dict) -> None:
+    # Best effort: concurrent requests may drop an entry, which is fine for a debugging aid
+    size = get_plugin_config("netbox_portal_access", "profiling_history")
+    cache.set(HISTORY_KEY, [summary, *history()][:size], timeout=None)
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not get_plugin_config("netbox_portal_access", "profiling"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile(request)
+        token = _current.set(profile)
+        try:
+            with connection.execute_wrapper(profile.wrap_query):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        if profile.in_scope and not getattr(request, "_portal_access_profiling_page", False):
+            summary = profile.summary()
+            response["Server-Timing"] = ", ".join(
+                [f'pa-sql;dur={summary["plugin_sql_ms"]};desc="plugin SQL ({summary["plugin_queries"]} queries)"']
+                + [f"pa-{kind.replace('_', '-')};dur={ms}" for kind, ms in summary["spans"].items()]
+            )
+            response["X-Portal-Access-Profile"] = (
+                f'queries={summary["queries"]} sql_ms={summary["sql_ms"]} '
+                f'plugin_queries={summary["plugin_queries"]} duplicates={summary["duplicate_queries"]} '
+                + " ".join(f"{kind}_ms={ms}" for kind, ms in summary["spans"].items())
+            ).strip()
+            _remember(summary)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = _current.get()
+        if profile is not None and getattr(view_func, "__module__", "").startswith("netbox_portal_access"):
+            profile.plugin_view = True
+        return None
@@ -0,0 +1,23 @@
+from utilities.querysets import RestrictedQuerySet
+
+# Portal.vendor is a GenericForeignKey, so str() on a portal, role or
+# assignment fetches the vendor. with_vendor() batches that through
+# prefetch_related, which groups portals by vendor_ct and loads each vendor
+# model (Provider, Tenant) in one query, keeping list pages at a fixed
+# number of queries regardless of row count.
+
+class PortalQuerySet(RestrictedQuerySet):
+    def with_vendor(self):
+        return self.prefetch_related("vendor")
+
+class VendorRoleQuerySet(RestrictedQuerySet):
+    def with_vendor(self):
+        return self.select_related("portal").prefetch_related("portal__vendor")
+
+class AccessAssignmentQuerySet(RestrictedQuerySet):
+    def with_vendor(self):
+        # str(role) goes role -> portal -> vendor, so resolve that chain as well
+        return (
+            self.select_related("portal", "role", "role__portal", "user")
+            .prefetch_related("portal__vendor", "role__portal__vendor")
+        )
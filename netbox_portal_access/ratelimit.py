@@ -0,0 +1,91 @@
+from __future__ import annotations
+import threading
+import time
+from functools import lru_cache
+from netbox.plugins import get_plugin_config
+
+KEY_PREFIX = "netbox_portal_access:ratelimit"
+
+class RateLimited(Exception):
+    """The request budget is exhausted; try again in ``retry_after`` seconds."""
+
+    def __init__(self, key: str, retry_after: float):
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit for {key} exhausted; retry in {retry_after:.1f}s")
+
+class LocalTokenBucket:
+    """In-process token bucket with the same semantics as RedisTokenBucket, for tests and single-worker setups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: dict[str, tuple[float, float]] = {}
+
+    def take(self, key: str, rate: float, capacity: int) -> float:
+        """Take one token. Returns 0 on success, else the seconds until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            tokens, ts = self._state.get(key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - ts) * rate)
+            if tokens >= 1:
+                self._state[key] = (tokens - 1, now)
+                return 0.0
+            self._state[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+class RedisTokenBucket:
+    """Token bucket shared by every worker process, kept atomic with a Lua script using Redis' clock."""
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+    return tostring(wait)
+    """
+
+    def __init__(self, connection):
+        self._script = connection.register_script(self.SCRIPT)
+
+    def take(self, key: str, rate: float, capacity: int) -> float:
+        return float(self._script(keys=[f"{KEY_PREFIX}:{key}"], args=[rate, capacity]))
+
+@lru_cache(maxsize=1)
+def get_bucket():
+    """The configured backend: shared Redis (NetBox's RQ connection) unless rate_limit_backend is "local"."""
+    if get_plugin_config("netbox_portal_access", "rate_limit_backend") == "local":
+        return LocalTokenBucket()
+    from django_rq import get_connection
+    return RedisTokenBucket(get_connection("default"))
+
+def acquire(key: str, per_minute: int, burst: int | None = None, max_wait: float | None = None, bucket=None) -> None:
+    """
+    Block until a token for ``key`` is available, waiting at most ``max_wait``
+    seconds in total; past that, raise RateLimited so the caller can
+    reschedule instead of failing.
+    """
+    bucket = bucket or get_bucket()
+    if max_wait is None:
+        max_wait = get_plugin_config("netbox_portal_access", "rate_limit_max_wait")
+    rate = per_minute / 60.0
+    capacity = burst or max(1, per_minute // 10)
+    deadline = time.monotonic() + max_wait
+    while True:
+        wait = bucket.take(key, rate, capacity)
+        if wait <= 0:
+            return
+        if time.monotonic() + wait > deadline:
+            raise RateLimited(key, wait)
+        time.sleep(wait)
@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from django.db.models import Count, Q
+from django.utils import timezone
+from netbox.plugins import get_plugin_config
+from .models import RoleCategory
+
+BUCKETS = ("stale", "expiring", "expired")
+
+def bucket_filters(today: date | None = None) -> dict[str, Q]:
+    """
+    Q objects for each review bucket, driven by the stale_days and
+    expiring_soon_days plugin settings. Never-verified assignments count
+    as stale. Callers filter on active=True first so the
+    (active, last_verified, expires_on) index is used.
+    """
+    today = today or timezone.localdate()
+    stale_before = today - timedelta(days=get_plugin_config("netbox_portal_access", "stale_days"))
+    expiring_by = today + timedelta(days=get_plugin_config("netbox_portal_access", "expiring_soon_days"))
+    return {
+        "stale": Q(last_verified__lt=stale_before) | Q(last_verified__isnull=True),
+        "expiring": Q(expires_on__gte=today, expires_on__lte=expiring_by),
+        "expired": Q(expires_on__lt=today),
+    }
+
+def access_report(queryset, today: date | None = None) -> dict:
+    """Per-portal/per-category counts and overall totals, aggregated in the database."""
+    filters = bucket_filters(today)
+    counts = {name: Count("pk", filter=q) for name, q in filters.items()}
+    qs = queryset.filter(active=True)
+    rows = (
+        qs.order_by()
+        .values("portal", "portal__name", "role__category")
+        .annotate(total=Count("pk"), **counts)
+        .order_by("portal__name", "role__category")
+    )
+    labels = dict(RoleCategory.choices)
+    rows = [{**row, "category_label": labels.get(row["role__category"], row["role__category"])} for row in rows]
+    return {
+        "rows": rows,
+        "totals": qs.aggregate(total=Count("pk"), **counts),
+    }
+
+def bucket_assignments(queryset, bucket: str, limit: int = 50, today: date | None = None):
+    """The first ``limit`` active assignments in one bucket, oldest first."""
+    order = ("last_verified", "pk") if bucket == "stale" else ("expires_on", "pk")
+    return (
+        queryset.filter(active=True)
+        .filter(bucket_filters(today)[bucket])
+        .with_vendor()
+        .order_by(*order)[:limit]
+    )
@@ -1,25 +1,33 @@
 from __future__ import annotations
 import json
-from cryptography.fernet import Fernet, InvalidToken
+from functools import lru_cache
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from django.conf import settings
+from .metrics import DECRYPT_DURATION, DECRYPT_FAILURES, timed
 
 MASK = "**********"
 
-def _get_key() -> bytes:
-    key = (
-        getattr(settings, "PLUGINS_CONFIG", {})
-        .get("netbox_portal_access", {})
-        .get("fernet_key")
-    )
-    if not key:
+class DecryptionError(RuntimeError):
+    """Raised when a token can't be decrypted with any configured key."""
+
+def _get_keys() -> tuple[bytes, ...]:
+    """Primary key first, then any retired keys still accepted for decryption."""
+    cfg = getattr(settings, "PLUGINS_CONFIG", {}).get("netbox_portal_access", {})
+    primary = cfg.get("fernet_key")
+    if not primary:
         raise RuntimeError("Fernet key not found in settings.")
 
-    if isinstance(key, str):
-        key = key.encode()
-    return key
+    keys = [primary] if isinstance(primary, (str, bytes)) else list(primary)
+    keys += list(cfg.get("fernet_old_keys") or [])
+    return tuple(k.encode() if isinstance(k, str) else k for k in keys)
+
+@lru_cache(maxsize=4)
+def _build_cipher(keys: tuple[bytes, ...]) -> MultiFernet:
+    return MultiFernet([Fernet(k) for k in keys])
 
-def get_fernet() -> Fernet:
-    return Fernet(_get_key())
+def get_fernet() -> MultiFernet:
+    """Per-process cached cipher; rebuilt only when the configured keys change."""
+    return _build_cipher(_get_keys())
 
 def encrypt_json(data: dict) -> str:
     token = get_fernet().encrypt(json.dumps(data).encode("utf-8"))
@@ -29,12 +37,22 @@ def decrypt_json(token: str | None) -> dict:
     if not token:
         return {}
     try:
-        raw = get_fernet().decrypt(token.encode("utf-8"))
-        return json.loads(raw.decode("utf-8"))
-    except (InvalidToken, ValueError):
-        return {}
+        with timed(DECRYPT_DURATION):
+            raw = get_fernet().decrypt(token.encode("utf-8"))
+            return json.loads(raw.decode("utf-8"))
+    except InvalidToken:
+        DECRYPT_FAILURES.inc()
+        raise DecryptionError("Credentials could not be decrypted with any configured Fernet key.")
+    except ValueError as e:
+        DECRYPT_FAILURES.inc()
+        raise DecryptionError(f"Decrypted credentials are not valid JSON: {e}")
+
+def rotate_token(token: str) -> str:
+    """Re-encrypt a token under the primary key (it may have been written with an old key)."""
+    try:
+        return get_fernet().rotate(token.encode("utf-8")).decode("utf-8")
+    except InvalidToken:
+        raise DecryptionError("Credentials could not be decrypted with any configured Fernet key.")
 
 def mask(value: str | None) -> str:
     return MASK if value else ""
-
-
@@ -0,0 +1,41 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import AccessAssignment, Portal, VendorRole
+from .panels import invalidate, invalidate_all
+
+def _invalidate_owner(portal_id, user_id):
+    invalidate("netbox_portal_access.portal", portal_id)
+    vendor = Portal.objects.filter(pk=portal_id).values_list("vendor_ct_id", "vendor_id").first()
+    if vendor:
+        ct = ContentType.objects.get_for_id(vendor[0])
+        invalidate(f"{ct.app_label}.{ct.model}", vendor[1])
+    if user_id:
+        invalidate("users.user", user_id)
+
+@receiver(pre_save, sender=AccessAssignment)
+def remember_assignment_owner(sender, instance, update_fields=None, **kwargs):
+    # Moving an assignment to another portal/user must refresh the old owner's panels too
+    instance._previous_owner = None
+    if instance.pk is None or (update_fields is not None and not {"portal", "user"} & set(update_fields)):
+        return
+    instance._previous_owner = (
+        AccessAssignment.objects.filter(pk=instance.pk).values_list("portal_id", "user_id").first()
+    )
+
+@receiver(post_save, sender=AccessAssignment)
+@receiver(post_delete, sender=AccessAssignment)
+def invalidate_assignment_panels(sender, instance, **kwargs):
+    current = (instance.portal_id, instance.user_id)
+    _invalidate_owner(*current)
+    previous = getattr(instance, "_previous_owner", None)
+    if previous and previous != current:
+        _invalidate_owner(*previous)
+
+@receiver(post_save, sender=Portal)
+@receiver(post_delete, sender=Portal)
+@receiver(post_save, sender=VendorRole)
+@receiver(post_delete, sender=VendorRole)
+def invalidate_all_panels(sender, instance, **kwargs):
+    # Portal/role names show up on many vendor and user panels; these change rarely
+    invalidate_all()
@@ -0,0 +1,176 @@
+from itertools import islice
+from typing import Callable, Iterable
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from .models import AccessAssignment, VendorRole
+from .panels import invalidate_all
+
+SYNC_FIELDS = ("remote_id", "username_on_portal", "role", "active")
+
+def _chunks(iterable: Iterable, size: int):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+class Reconciler:
+    """
+    O(n) diff of a vendor's user list against a portal's assignments.
+
+    Local rows are indexed once by ``remote_id`` (rows not yet linked to the
+    vendor by ``username_on_portal``) as small tuples; vendor records are
+    consumed as a stream and applied chunk by chunk with
+    bulk_create/bulk_update, so only one chunk of vendor data is in memory at
+    a time. Rows with unpushed local changes are left alone: the pending push
+    wins over the vendor's copy.
+    """
+
+    def __init__(self, portal, chunk_size: int = 1000):
+        self.portal = portal
+        self.chunk_size = chunk_size
+        self.stats = {"seen": 0, "created": 0, "updated": 0, "deactivated": 0, "unmatched": 0, "pending_push": 0}
+        self.seen: set[int] = set()
+
+        self.by_remote: dict[str, tuple] = {}
+        self.by_username: dict[str, tuple] = {}
+        rows = (
+            AccessAssignment.objects
+            .filter(portal=portal)
+            .values_list("pk", "remote_id", "username_on_portal", "role_id", "active", "needs_push")
+        )
+        for row in rows.iterator(chunk_size=5000):
+            self._index(row)
+
+        self.roles = dict(VendorRole.objects.filter(portal=portal).values_list("name", "pk"))
+
+    def match(self, record: dict) -> tuple | None:
+        rid = record.get("remote_id")
+        if rid and str(rid) in self.by_remote:
+            return self.by_remote[str(rid)]
+        username = record.get("username")
+        if username:
+            return self.by_username.get(username.lower())
+        return None
+
+    def apply(self, records: Iterable[dict], deactivate_missing: bool = True) -> dict:
+        for chunk in _chunks(records, self.chunk_size):
+            self.apply_chunk(chunk)
+        if deactivate_missing:
+            self.deactivate_missing()
+        self.finish()
+        return self.stats
+
+    def apply_changes(self, pages: Iterable[tuple[list[dict], str | None]], checkpoint: Callable[[str], None]) -> dict:
+        """
+        Incremental sync: apply each page of vendor changes, then hand its
+        cursor to ``checkpoint``. Assignments missing from the feed are left
+        alone; only records flagged ``deleted`` are deactivated.
+        """
+        for records, cursor in pages:
+            for chunk in _chunks(records, self.chunk_size):
+                self.apply_chunk(chunk)
+            if cursor:
+                checkpoint(cursor)
+        self.finish()
+        return self.stats
+
+    def finish(self) -> None:
+        # Bulk writes skip the signals that normally invalidate cached panels
+        if self.stats["created"] or self.stats["updated"] or self.stats["deactivated"]:
+            invalidate_all()
+
+    def apply_chunk(self, chunk: list[dict]) -> None:
+        updates, creates, new_records = [], [], []
+        for record in chunk:
+            self.stats["seen"] += 1
+            row = self.match(record)
+            if row is None:
+                # Nothing to remove locally for a vendor user we never had
+                if not record.get("deleted"):
+                    new_records.append(record)
+                continue
+            self.seen.add(row[0])
+            if row[5]:
+                self.stats["pending_push"] += 1
+                continue
+            obj = self._diff(row, record)
+            if obj is not None:
+                updates.append(obj)
+
+        if new_records:
+            creates = self._build_creates(new_records)
+
+        with transaction.atomic():
+            if updates:
+                AccessAssignment.objects.bulk_update(updates, SYNC_FIELDS, batch_size=self.chunk_size)
+            if creates:
+                AccessAssignment.objects.bulk_create(creates, batch_size=self.chunk_size)
+        self.stats["updated"] += len(updates)
+        self.stats["created"] += len(creates)
+        # Keep the index current so later chunks (or pages) diff against what was just written
+        for obj in [*updates, *creates]:
+            self._index((obj.pk, obj.remote_id, obj.username_on_portal, obj.role_id, obj.active, False))
+        self.seen.update(obj.pk for obj in creates)
+
+    def _index(self, row: tuple) -> None:
+        pk, remote_id, username = row[:3]
+        if remote_id:
+            self.by_remote[remote_id] = row
+            # Once linked, a row is only matched by remote_id, so a vendor
+            # username can never re-point it to another remote account
+            if username and self.by_username.get(username.lower(), (None,))[0] == pk:
+                del self.by_username[username.lower()]
+        elif username:
+            self.by_username.setdefault(username.lower(), row)
+
+    def _diff(self, row: tuple, record: dict) -> AccessAssignment | None:
+        pk, remote_id, username, role_id, active, _ = row
+        new_remote_id = str(record["remote_id"]) if record.get("remote_id") else remote_id
+        new_username = record.get("username") or username
+        new_role_id = self.roles.get(record.get("role"), role_id)
+        new_active = bool(record.get("active", True)) and not record.get("deleted")
+        if (new_remote_id, new_username, new_role_id, new_active) == (remote_id, username, role_id, active):
+            return None
+        return AccessAssignment(
+            pk=pk,
+            remote_id=new_remote_id,
+            username_on_portal=new_username,
+            role_id=new_role_id,
+            active=new_active,
+        )
+
+    def _build_creates(self, records: list[dict]) -> list[AccessAssignment]:
+        User = get_user_model()
+        usernames = {r["user"] for r in records if r.get("user")}
+        users = dict(User.objects.filter(username__in=usernames).values_list("username", "pk")) if usernames else {}
+
+        creates = []
+        for record in records:
+            user_id = users.get(record.get("user"))
+            role_id = self.roles.get(record.get("role"))
+            if not user_id or not role_id:
+                self.stats["unmatched"] += 1
+                continue
+            creates.append(AccessAssignment(
+                portal=self.portal,
+                user_id=user_id,
+                role_id=role_id,
+                remote_id=str(record["remote_id"]) if record.get("remote_id") else None,
+                username_on_portal=record.get("username") or "",
+                active=bool(record.get("active", True)),
+                needs_push=False,
+            ))
+        return creates
+
+    def deactivate_missing(self) -> None:
+        """Deactivate active, vendor-linked assignments the vendor no longer lists (unless a push is pending)."""
+        missing = [
+            row[0] for row in self.by_remote.values()
+            if row[4] and not row[5] and row[0] not in self.seen
+        ]
+        for chunk in _chunks(missing, self.chunk_size):
+            self.stats["deactivated"] += (
+                AccessAssignment.objects.filter(pk__in=chunk).update(active=False, needs_push=False)
+            )
+
+def reconcile(portal, records: Iterable[dict], chunk_size: int = 1000) -> dict:
+    return Reconciler(portal, chunk_size=chunk_size).apply(records)
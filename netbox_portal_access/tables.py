@@ -36,7 +36,6 @@ class AccessAssignmentTable(NetBoxTable):
           <span class="text-muted">—</span>
         {% endif %}
         """,
-        orderable=False,
     )
     class Meta(NetBoxTable.Meta):
         model = AccessAssignment
@@ -1,45 +1,519 @@
-from django.utils import timezone
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import groupby
+from django.core.cache import cache
 from django.db import transaction
+from django.utils import timezone
+from django_rq import get_queue
+from netbox.plugins import get_plugin_config
+from rq import get_current_job
+from .adapters import call_info
+from .breaker import CircuitBreaker
+from .metrics import RECONCILE_DURATION, observe_push, timed
+from .ratelimit import RateLimited
+
+PUSH_ACTIONS = ("upsert", "create", "update", "deactivate", "delete")
+PUSH_STATUS_FIELDS = (
+    "last_push_at", "last_push_status", "last_push_message", "remote_id", "needs_push",
+    "last_push_action", "push_attempts", "next_retry_at",
+)
+
+# Pending-push markers live a little longer than the debounce window so a
+# backed-up queue doesn't immediately let duplicates through.
+PENDING_KEY = "netbox_portal_access:push:pending:{action}:{pk}"
+PENDING_GRACE = 300
+
+def _pending_key(pk: int, action: str) -> str:
+    return PENDING_KEY.format(action=action, pk=pk)
+
+def enqueue_push(assignment_ids: list[int], action: str = "upsert"):
+    """
+    Queue a debounced, coalesced push. (assignment, action) pairs that already
+    have a push waiting are dropped, and the job runs push_debounce_seconds
+    later, reloading the rows then, so a burst of edits to one assignment
+    produces a single vendor call carrying the final state. Returns the RQ
+    job, or None if everything was already pending.
+    """
+    debounce = get_plugin_config("netbox_portal_access", "push_debounce_seconds") or 0
+    fresh = [
+        pk for pk in assignment_ids
+        if cache.add(_pending_key(pk, action), 1, timeout=debounce + PENDING_GRACE)
+    ]
+    if not fresh:
+        return None
+
+    queue = get_queue("default")
+    func = push_job(fresh)
+    kwargs = {"assignment_ids": fresh, "action": action, "claimed": True}
+    if debounce:
+        return queue.enqueue_in(timedelta(seconds=debounce), func, **kwargs)
+    return queue.enqueue(func, **kwargs)
+
+def _clear_pending(assignment_ids: list[int] | None, action: str, claimed: bool) -> None:
+    # Once a push starts, new edits must queue a fresh push rather than coalesce into this one.
+    # Only jobs from enqueue_push() own markers; others must not drop a waiting job's.
+    if claimed and assignment_ids:
+        cache.delete_many([_pending_key(pk, action) for pk in assignment_ids])
+
+def push_job(assignment_ids: list[int]):
+    """
+    The job to enqueue for pushing these assignments: push_assignments_async()
+    when any of their portals allows more than one request in flight,
+    otherwise push_assignments().
+    """
+    from .models import AccessAssignment
+    concurrent = AccessAssignment.objects.filter(pk__in=assignment_ids, portal__push_concurrency__gt=1).exists()
+    return push_assignments_async if concurrent else push_assignments
 
 def push_assignment(assignment_id: int, action: str = "upsert"):
     """Background job: push one AccessAssignment to its vendor"""
+    return push_assignments([assignment_id], action=action)
+
+def push_assignments(assignment_ids: list[int] | None = None, action: str = "upsert", claimed: bool = False):
+    """
+    Background job: push many AccessAssignments to their vendors.
+
+    Assignments are grouped by portal so each portal's adapter (and its
+    decrypted credentials) is built once. With no IDs, everything that
+    needs a push is sent. ``claimed`` is set by enqueue_push() for jobs that
+    hold the pending-push markers of their IDs.
+    """
+    started = timezone.now()
+    _clear_pending(assignment_ids, action, claimed)
+    job = get_current_job()
+    results = []
+    for portal, objs in _portal_groups(assignment_ids):
+        results.extend(zip(objs, _push_portal_group(portal, objs, action)))
+        _report_progress(job, results, assignment_ids)
+
+    _record_results(results, started, action)
+    return _summary(results)
+
+def push_assignments_async(assignment_ids: list[int] | None = None, action: str = "upsert", claimed: bool = False):
+    """
+    Background job: same as push_assignments(), but keeps up to
+    Portal.push_concurrency vendor requests in flight per portal.
+    """
+    started = timezone.now()
+    _clear_pending(assignment_ids, action, claimed)
+    job = get_current_job()
+    groups = []
+    results = []
+    for portal, objs in _portal_groups(assignment_ids):
+        # Adapters are built here, outside the event loop, since that touches the DB.
+        adapter, error = _build_adapter(portal)
+        if error:
+            results.extend((obj, (False, error, None)) for obj in objs)
+            continue
+        breaker = CircuitBreaker(portal.pk)
+        if not breaker.allow(adapter.ping):
+            _reschedule(objs, action, breaker.retry_in() or breaker.reset_seconds)
+            continue
+        groups.append((portal, adapter, breaker, objs))
+
+    results.extend(asyncio.run(_apush_groups(groups, action)))
+    _report_progress(job, results, assignment_ids)
+    _record_results(results, started, action)
+    return _summary(results)
+
+def retry_failed_pushes(limit: int = 5000, batch_size: int = 500) -> int:
+    """
+    Periodic job: re-enqueue FAILED assignments whose backoff has elapsed.
+
+    The scan is a range read on the (last_push_status, next_retry_at) index.
+    Due rows are claimed by pushing next_retry_at out by one full backoff
+    period, so overlapping runs don't double-enqueue them and a lost job is
+    retried later instead of being stuck. Retries repeat each row's last push
+    action through push_job() in batches. Returns the number enqueued.
+    """
+    from .models import AccessAssignment
+    now = timezone.now()
+    lease = timedelta(seconds=get_plugin_config("netbox_portal_access", "push_retry_max_seconds"))
+    with transaction.atomic():
+        rows = list(
+            AccessAssignment.objects
+            .filter(last_push_status="FAILED", next_retry_at__lte=now)
+            .order_by("next_retry_at")
+            .select_for_update(skip_locked=True)
+            .values_list("pk", "last_push_action")[:limit]
+        )
+        if rows:
+            AccessAssignment.objects.filter(pk__in=[pk for pk, _ in rows]).update(next_retry_at=now + lease)
+
+    by_action = {}
+    for pk, action in rows:
+        # Rows failed before the action was recorded fall back to upsert
+        by_action.setdefault(action or "upsert", []).append(pk)
+    queue = get_queue("default")
+    for action, ids in by_action.items():
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i:i + batch_size]
+            queue.enqueue(push_job(batch), assignment_ids=batch, action=action)
+    return len(rows)
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter: a random delay between half and all of base * 2^(attempts-1), capped."""
+    base = get_plugin_config("netbox_portal_access", "push_retry_base_seconds")
+    cap = get_plugin_config("netbox_portal_access", "push_retry_max_seconds")
+    delay = min(cap, base * 2 ** max(0, attempts - 1))
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+def sync_portal(portal_id: int):
+    """
+    Background job: reconcile a portal's assignments against the vendor's
+    full user list. Returns the reconcile stats with ok=True, or ok=False and
+    a message when the adapter can't be built or has no user-list API. When
+    the rate limiter holds it back, the job is rescheduled instead.
+    """
+    from .models import Portal
+    from .sync import reconcile
+    portal = Portal.objects.get(pk=portal_id)
+    adapter, error = _build_adapter(portal)
+    if error:
+        return {"ok": False, "message": error}
+    if not adapter.supports_sync():
+        return {"ok": False, "message": "List not implemented"}
+
+    started = timezone.now()
+    try:
+        with timed(RECONCILE_DURATION.labels(portal.adapter or "none", "full")):
+            stats = reconcile(portal, adapter.list_accesses())
+    except RateLimited as e:
+        return _reschedule_sync(sync_portal, portal_id, e.retry_after)
+    # A full read supersedes any change-feed position
+    Portal.objects.filter(pk=portal.pk).update(last_sync_at=started, sync_cursor="")
+    return {"ok": True, **stats}
+
+def sync_portal_incremental(portal_id: int):
+    """
+    Background job: apply only the vendor changes since the last sync.
+
+    Resumes from Portal.sync_cursor (checkpointed after every page) or, with
+    no cursor, asks for changes since last_sync_at. Falls back to a full
+    sync_portal() when the portal was never synced or its adapter has no
+    change feed. Returns stats in the same shape as sync_portal().
+    """
+    from .models import Portal
+    from .sync import Reconciler
+    portal = Portal.objects.get(pk=portal_id)
+    if not portal.sync_cursor and not portal.last_sync_at:
+        return sync_portal(portal_id)
+    adapter, error = _build_adapter(portal)
+    if error:
+        return {"ok": False, "message": error}
+    if not adapter.supports_changes():
+        return sync_portal(portal_id)
+
+    def checkpoint(cursor: str) -> None:
+        Portal.objects.filter(pk=portal.pk).update(sync_cursor=cursor)
+
+    started = timezone.now()
+    try:
+        with timed(RECONCILE_DURATION.labels(portal.adapter or "none", "incremental")):
+            pages = adapter.list_changes(cursor=portal.sync_cursor or None, since=portal.last_sync_at)
+            stats = Reconciler(portal).apply_changes(pages, checkpoint)
+    except RateLimited as e:
+        # Pages applied so far are checkpointed, so the rerun picks up from there
+        return _reschedule_sync(sync_portal_incremental, portal_id, e.retry_after)
+    Portal.objects.filter(pk=portal.pk).update(last_sync_at=started)
+    return {"ok": True, **stats}
+
+def sync_portals(portal_ids: list[int] | None = None, full: bool = False) -> list[str]:
+    """Enqueue one sync job per portal whose adapter can sync; returns the job ids."""
+    from .models import Portal
+    qs = Portal.objects.exclude(adapter__isnull=True).exclude(adapter="")
+    if portal_ids:
+        qs = qs.filter(pk__in=portal_ids)
+    job = sync_portal if full else sync_portal_incremental
+    queue = get_queue("default")
+    return [queue.enqueue(job, portal.pk).id for portal in qs.only("pk", "adapter") if portal.supports_sync]
+
+def _portal_groups(assignment_ids: list[int] | None):
     from .models import AccessAssignment
-    obj = AccessAssignment.objects.select_related("portal", "role", "user").get(pk=assignment_id)
-    portal = obj.portal
-    adapter = portal.get_adapter()
+    qs = AccessAssignment.objects.select_related("portal", "role", "user").order_by("portal_id", "pk")
+    if assignment_ids is not None:
+        qs = qs.filter(pk__in=assignment_ids)
+    else:
+        qs = qs.filter(needs_push=True)
+
+    for _, group in groupby(qs, key=lambda a: a.portal_id):
+        objs = list(group)
+        yield objs[0].portal, objs
+
+def _build_adapter(portal):
+    """Return (adapter, None) or (None, error message)."""
+    try:
+        adapter = portal.get_adapter()
+    except Exception as e:
+        return None, f"Exception building adapter: {e}"
     if not adapter:
-        _fail(obj, "No adapter configured on portal.")
-        return
+        return None, "No adapter configured on portal."
+    return adapter, None
+
+def _push_portal_group(portal, objs, action: str) -> list[tuple[bool, str, str | None]]:
+    """
+    Push all assignments of one portal through a single adapter instance.
+    Assignments held back by the rate limiter or an open circuit breaker are
+    rescheduled, so the returned list can be shorter than ``objs``.
+    """
+    adapter, error = _build_adapter(portal)
+    if error:
+        return [(False, error, None)] * len(objs)
+
+    breaker = CircuitBreaker(portal.pk)
+    if not breaker.allow(adapter.ping):
+        _reschedule(objs, action, breaker.retry_in() or breaker.reset_seconds)
+        return []
+
+    batch = _push_batch(adapter, objs, action, breaker)
+    if batch is not None:
+        return batch
+
+    results = []
+    for i, obj in enumerate(objs):
+        try:
+            results.append(_push_one(adapter, obj, action, breaker))
+        except RateLimited as e:
+            _reschedule(objs[i:], action, e.retry_after)
+            break
+        if breaker.tripped:
+            _reschedule(objs[i + 1:], action, breaker.reset_seconds)
+            break
+    return results
+
+@contextmanager
+def _timed(objs):
+    """Stamp each assignment with (started_at, duration_ms, http_status) for the push attempt history."""
+    info = {}
+    token = call_info.set(info)
+    started_at = timezone.now()
+    t0 = time.perf_counter()
+    try:
+        yield info
+    finally:
+        call_info.reset(token)
+        attempt = (started_at, round((time.perf_counter() - t0) * 1000), info.get("http_status"))
+        for obj in objs:
+            obj._push_attempt = attempt
+
+def _record_outcome(breaker: CircuitBreaker, ok: bool, http_status: int | None) -> None:
+    """
+    Feed one vendor call into the breaker. Rejections the vendor answered with
+    a 4xx still mean it is up; 5xx responses and failures without any HTTP
+    status (timeouts, dropped connections) count against it.
+    """
+    if ok or (http_status is not None and http_status < 500):
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+
+def _push_batch(adapter, objs, action: str, breaker: CircuitBreaker) -> list[tuple[bool, str, str | None]] | None:
+    try:
+        with _timed(objs) as info:
+            batch = adapter.push_many(objs, action=action)
+    except RateLimited as e:
+        _reschedule(objs, action, e.retry_after)
+        return []
+    except Exception as e:
+        breaker.record_failure()
+        return [(False, f"Exception during push: {e}", None)] * len(objs)
+    if batch is None:
+        return None
+    batch = list(batch)
+    if len(batch) != len(objs):
+        _record_outcome(breaker, False, info.get("http_status"))
+        msg = f"Adapter returned {len(batch)} results for {len(objs)} assignments."
+        return [(False, msg, None)] * len(objs)
+    _record_outcome(breaker, any(ok for ok, _, _ in batch), info.get("http_status"))
+    return batch
+
+def _reschedule(objs, action: str, delay: float) -> None:
+    """Re-queue assignments held back by the rate limiter or circuit breaker instead of failing them."""
+    if objs:
+        # Same choice as push_job(), from the loaded portals: this may run inside the event loop
+        concurrent = any(_concurrency(obj.portal) > 1 for obj in objs)
+        _enqueue_later(
+            delay,
+            push_assignments_async if concurrent else push_assignments,
+            assignment_ids=[obj.pk for obj in objs],
+            action=action,
+        )
+
+def _reschedule_sync(job, portal_id: int, delay: float) -> dict:
+    """Re-queue a sync the rate limiter held back, returning the result for this run."""
+    _enqueue_later(delay, job, portal_id=portal_id)
+    return {"ok": False, "message": f"Rate limited; sync rescheduled in {max(1, round(delay))}s."}
+
+def _enqueue_later(delay: float, func, **kwargs):
+    return get_queue("default").enqueue_in(timedelta(seconds=max(1, round(delay))), func, **kwargs)
 
+def _call_adapter(adapter, obj, action: str) -> tuple[bool, str, str | None]:
+    if action == "create":
+        return adapter.create_access(obj)
+    elif action == "update":
+        return adapter.update_access(obj)
+    elif action == "deactivate":
+        ok, msg = adapter.deactivate_access(obj)
+        return ok, msg, obj.remote_id
+    elif action == "delete":
+        ok, msg = adapter.delete_access(obj)
+        return ok, msg, None if ok else obj.remote_id
+    # default to upsert
+    return adapter.upsert_access(obj)
+
+def _push_one(adapter, obj, action: str, breaker: CircuitBreaker) -> tuple[bool, str, str | None]:
+    """Push one assignment; exceptions and vendor-side failures count against the breaker."""
     try:
-        if action == "create":
-            ok, msg, rid = adapter.create_access(obj)
-        elif action == "update":
-            ok, msg, rid = adapter.update_access(obj)
-        elif action == "deactivate":
-            ok, msg = adapter.deactivate_access(obj)
-            rid = obj.remote_id
-        elif action == "delete":
-            ok, msg = adapter.delete_access(obj)
-            rid = None if ok else obj.remote_id
-        else:  # default to upsert
-            ok, msg, rid = adapter.upsert_access(obj)
-
-        with transaction.atomic():
-            obj.last_push_at = timezone.now()
-            obj.last_push_status = "SUCCESS" if ok else "FAILED"
-            obj.last_push_message = msg[:4000] if msg else None
-            if rid is not None:
-                obj.remote_id = rid
-            obj.save()
+        with _timed([obj]) as info:
+            result = _call_adapter(adapter, obj, action)
+    except RateLimited:
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        return False, f"Exception during push: {e}", None
+    _record_outcome(breaker, result[0], info.get("http_status"))
+    return result
+
+async def _apush_groups(groups, action: str) -> list:
+    results = await asyncio.gather(*(_apush_portal_group(*group, action) for group in groups))
+    return [pair for group in results for pair in group]
+
+def _concurrency(portal) -> int:
+    return max(1, getattr(portal, "push_concurrency", 1) or 1)
+
+async def _apush_portal_group(portal, adapter, breaker, objs, action: str) -> list:
+    # Each portal gets its own pool sized to its cap, so one busy portal can't
+    # take the threads another needs, and the loop's default pool isn't used
+    cap = _concurrency(portal)
+    with ThreadPoolExecutor(max_workers=cap, thread_name_prefix=f"portal-push-{portal.pk}") as pool:
+        adapter.executor = pool
+        return await _apush_portal_objs(adapter, breaker, objs, action, cap)
+
+async def _apush_portal_objs(adapter, breaker, objs, action: str, cap: int) -> list:
+    batch = await adapter.run_in_thread(_push_batch, adapter, objs, action, breaker)
+    if batch is not None:
+        return list(zip(objs, batch))
+
+    limit = asyncio.Semaphore(cap)
+    deferred = []
+
+    async def run(obj):
+        async with limit:
+            if breaker.tripped:
+                deferred.append((obj, breaker.reset_seconds))
+                return obj, None
+            try:
+                return obj, await _apush_one(adapter, obj, action, breaker)
+            except RateLimited as e:
+                deferred.append((obj, e.retry_after))
+                return obj, None
 
+    results = await asyncio.gather(*(run(obj) for obj in objs))
+    if deferred:
+        _reschedule([obj for obj, _ in deferred], action, max(delay for _, delay in deferred))
+    return [(obj, result) for obj, result in results if result is not None]
+
+async def _apush_one(adapter, obj, action: str, breaker: CircuitBreaker) -> tuple[bool, str, str | None]:
+    try:
+        with _timed([obj]) as info:
+            result = await _acall_adapter(adapter, obj, action)
+    except RateLimited:
+        raise
     except Exception as e:
-        _fail(obj, f"Exception during push: {e}")
+        breaker.record_failure()
+        return False, f"Exception during push: {e}", None
+    _record_outcome(breaker, result[0], info.get("http_status"))
+    return result
+
+async def _acall_adapter(adapter, obj, action: str) -> tuple[bool, str, str | None]:
+    if action == "create":
+        return await adapter.acreate_access(obj)
+    elif action == "update":
+        return await adapter.aupdate_access(obj)
+    elif action == "deactivate":
+        ok, msg = await adapter.adeactivate_access(obj)
+        return ok, msg, obj.remote_id
+    elif action == "delete":
+        ok, msg = await adapter.adelete_access(obj)
+        return ok, msg, None if ok else obj.remote_id
+    return await adapter.aupsert_access(obj)
+
+def _report_progress(job, results, assignment_ids) -> None:
+    """Expose running counts on the RQ job so the push status API can report progress."""
+    if job is None:
+        return
+    succeeded = sum(1 for _, (ok, _m, _r) in results if ok)
+    job.meta["progress"] = {
+        "total": len(assignment_ids) if assignment_ids is not None else None,
+        "processed": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
+    job.save_meta()
+
+def _summary(results) -> dict:
+    succeeded = sum(1 for _, (ok, _m, _r) in results if ok)
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": [
+            {"id": obj.pk, "ok": ok, "message": (msg or "")[:500], "remote_id": rid}
+            for obj, (ok, msg, rid) in results
+        ],
+    }
+
+def _record_results(results, started, action: str) -> None:
+    """
+    Write push outcomes back with one bulk update and append them to the
+    PushAttempt history with one bulk insert. This deliberately skips
+    save(): no ObjectChange rows, no signals and no last_updated bump.
+    """
+    from .models import AccessAssignment, PushAttempt
+    from .audit import status_write
+    if not results:
+        return
+    now = timezone.now()
+    max_attempts = get_plugin_config("netbox_portal_access", "push_retry_max_attempts")
+    objs = []
+    attempts = []
+    for obj, (ok, msg, rid) in results:
+        obj.last_push_at = now
+        obj.last_push_status = "SUCCESS" if ok else "FAILED"
+        obj.last_push_message = msg[:4000] if msg else None
+        obj.last_push_action = action
+        obj.needs_push = not ok
+        obj.push_attempts = 0 if ok else obj.push_attempts + 1
+        # Once out of attempts the row stays FAILED until someone re-queues it
+        obj.next_retry_at = now + retry_delay(obj.push_attempts) if not ok and obj.push_attempts < max_attempts else None
+        if rid is not None:
+            obj.remote_id = rid
+        objs.append(obj)
+        status_write("accessassignment", obj.pk, action=action, status=obj.last_push_status)
 
-def _fail(object, message: str):
-    from django.utils import timezone
-    obj.last_push_at = timezone.now()
-    obj.last_push_status = "FAILED"
-    obj.last_push_message = message[:4000]
-    obj.save()
+        # Adapter build failures never reached the vendor, so have no timing
+        started_at, duration_ms, http_status = getattr(obj, "_push_attempt", (now, None, None))
+        observe_push(obj.portal.adapter, action, obj.last_push_status, duration_ms)
+        attempts.append(PushAttempt(
+            assignment_id=obj.pk,
+            portal_id=obj.portal_id,
+            action=action,
+            adapter=obj.portal.adapter or "",
+            started_at=started_at,
+            duration_ms=duration_ms,
+            http_status=http_status,
+            outcome=obj.last_push_status,
+            message=(msg or "")[:500],
+        ))
+    with transaction.atomic():
+        AccessAssignment.objects.bulk_update(objs, PUSH_STATUS_FIELDS, batch_size=500)
+        PushAttempt.objects.bulk_create(attempts, batch_size=500)
 
+    # Anything edited after we loaded it still needs pushing
+    pushed = [obj.pk for obj in objs if not obj.needs_push]
+    if pushed:
+        AccessAssignment.objects.filter(pk__in=pushed, last_updated__gt=started).update(needs_push=True)
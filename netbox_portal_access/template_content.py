@@ -1,88 +1,77 @@
-from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Q
 from netbox.plugins import PluginTemplateExtension
-from django.urls import reverse
-from django_tables2 import RequestConfig
-from .models import AccessAssignment, Portal
-from .tables import AccessAssignmentTable
+from django.urls import NoReverseMatch, reverse
+from .models import AccessAssignment, Portal, RoleCategory
+from .panels import assignment_filter, get_or_render
+from .profiling import profiled
+from django.utils.html import escape
 from django.utils.safestring import mark_safe
 
-class ProviderPortalAccess(PluginTemplateExtension):
-    # attaches to Circuits → Provider pages
-    model = "circuits.provider"
+class AccessSummaryPanel(PluginTemplateExtension):
+    """
+    Per-portal/per-category counts for the page's object, with the detail rows
+    loaded (paginated) over HTMX. The rendered fragment is cached per object
+    and viewer, and invalidated from signals.py.
+    """
 
+    @profiled("template_extension")
     def right_page(self):
+        return self.access_panel()
+
+    def access_panel(self):
         # hide if the viewer has no permission to see assignments
         req = self.context["request"]
         if not req.user.has_perm("netbox_portal_access.view_accessassignment"):
             return ""
 
-        provider = self.context["object"]
-        ct = ContentType.objects.get_for_model(provider)
+        obj = self.context["object"]
+        object_type = obj._meta.label_lower
+        return get_or_render(
+            object_type, obj.pk, req.user, lambda: self._render_summary(obj, object_type, req.user)
+        )
 
-        qs = (
+    def _render_summary(self, obj, object_type, user):
+        labels = dict(RoleCategory.choices)
+        rows = (
             AccessAssignment.objects
-            .filter(portal__vendor_ct=ct, portal__vendor_id=provider.pk)
-            .select_related("portal", "role", "user")
-            .order_by("portal__name", "user__username")
+            .restrict(user, "view")
+            .filter(assignment_filter(object_type, obj.pk))
+            .order_by()
+            .values("portal", "portal__name", "role__category")
+            .annotate(total=Count("pk"), active=Count("pk", filter=Q(active=True)))
+            .order_by("portal__name", "role__category")
         )
-
+        summary = [{**row, "category_label": labels.get(row["role__category"], row["role__category"])} for row in rows]
+        rows_url = reverse("plugins:netbox_portal_access:accessassignment_panel")
         return self.render(
-            "netbox_portal_access/inc/portal_providers_access_panel.html",
-            extra_context={"assignments": qs}
+            "netbox_portal_access/inc/access_summary_panel.html",
+            extra_context={
+                "summary": summary,
+                "total": sum(row["total"] for row in summary),
+                "rows_url": f"{rows_url}?object_type={object_type}&object_id={obj.pk}",
+            },
         )
 
-class TenantPortalAccess(PluginTemplateExtension):
+class ProviderPortalAccess(AccessSummaryPanel):
+    # attaches to Circuits → Provider pages
+    model = "circuits.provider"
+
+class TenantPortalAccess(AccessSummaryPanel):
     # attaches to Tenancy → Tenant pages
     model = "tenancy.tenant"
 
-    def right_page(self):
-        req = self.context["request"]
-        if not req.user.has_perm("netbox_portal_access.view_accessassignment"):
-            return ""
-
-        tenant = self.context["object"]
-        ct = ContentType.objects.get_for_model(tenant)
-
-        qs = (
-            AccessAssignment.objects
-            .filter(portal__vendor_ct=ct, portal__vendor_id=tenant.pk)
-            .select_related("portal", "role", "user")
-            .order_by("portal__name", "user__username")
-        )
-
-        return self.render(
-            "netbox_portal_access/inc/portal_access_panel.html",
-            extra_context={"assignments": qs}
-        )
-
-class UserPortalAccess(PluginTemplateExtension):
+class UserPortalAccess(AccessSummaryPanel):
     # attaches to Users → <user>
     model = "users.user"
 
-    def right_page(self):
-        req = self.context["request"]
-        if not req.user.has_perm("netbox_portal_access.view_accessassignment"):
-            return ""
-
-        user = self.context["object"]
-        qs = (
-            AccessAssignment.objects
-            .filter(user=user)
-            .select_related("portal", "role")
-            .order_by("portal__name", "role__name")
-        )
-        return self.render(
-            "netbox_portal_access/inc/portal_access_panel.html",
-            extra_context={"assignments": qs},
-        )
-
-class PortalUIExtension(PluginTemplateExtension):
+class PortalUIExtension(AccessSummaryPanel):
     model = "netbox_portal_access.portal"
 
     def _get_portal(self):
         obj = self.context.get("object")
         return obj if isinstance(obj, Portal) else None
 
+    @profiled("template_extension")
     def buttons(self):
         request = self.context.get("request")
         portal = self._get_portal()
@@ -98,24 +87,44 @@ class PortalUIExtension(PluginTemplateExtension):
             if portal.adapter and request.user.has_perm("netbox_portal_access.can_sync_vendor"):
                 url = reverse("plugins:netbox_portal_access:portal_credentials_test", args=[portal.pk])
                 btns.append(f'<a href="{url}" class="btn btn-sm btn-outline-secondary">Test Adapter</a>')
+            if portal.supports_sync and request.user.has_perm("netbox_portal_access.can_sync_vendor"):
+                url = reverse("plugins:netbox_portal_access:portal_sync", args=[portal.pk])
+                btns.append(f'<a href="{url}" class="btn btn-sm btn-outline-secondary">Sync from Vendor</a>')
         except NoReverseMatch:
             return ""  # if URLs not loaded yet, fail closed
 
         return mark_safe("".join(btns))
 
+    def right_page(self):
+        return ""
+
+    @profiled("template_extension")
     def left_page(self):
-        portal = self._get_portal()
-        if not portal:
+        # Same cached summary + HTMX rows as the vendor/user pages
+        if not self._get_portal():
             return ""
-        rows = (
-            AccessAssignment.objects
-            .filter(portal=portal)
-            .select_related("user", "role")
-            .order_by("-active", "role__name", "user__username")
-        )
-        return self.render(
-            "netbox_portal_access/inc/portal_access_panel.html",
-            extra_context={"portal": portal, "rows": rows},
+        return self.access_panel()
+
+class AccessAssignmentListExtension(PluginTemplateExtension):
+    model = "netbox_portal_access.accessassignment"
+
+    @profiled("template_extension")
+    def list_buttons(self):
+        request = self.context.get("request")
+        if not request or not request.user.has_perm("netbox_portal_access.view_accessassignment"):
+            return ""
+        url = reverse("plugins:netbox_portal_access:accessassignment_export_stream")
+        query = request.GET.copy()
+        links = []
+        for fmt, label in (("csv", "CSV"), ("jsonl", "JSON Lines")):
+            query["format"] = fmt
+            links.append(f'<li><a class="dropdown-item" href="{url}?{escape(query.urlencode())}">{label}</a></li>')
+        return mark_safe(
+            '<div class="dropdown">'
+            '<button type="button" class="btn btn-purple dropdown-toggle" data-bs-toggle="dropdown">'
+            '<i class="mdi mdi-download"></i> Stream Export</button>'
+            f'<ul class="dropdown-menu dropdown-menu-end">{"".join(links)}</ul>'
+            '</div>'
         )
 
 #    def right_page(self):
@@ -128,4 +137,10 @@ class PortalUIExtension(PluginTemplateExtension):
 #            extra_context={"portal": portal, "cred": cred},
 #        )
 
-template_extensions = [ProviderPortalAccess, PortalUIExtension]
+template_extensions = [
+    ProviderPortalAccess,
+    TenantPortalAccess,
+    UserPortalAccess,
+    PortalUIExtension,
+    AccessAssignmentListExtension,
+]
@@ -14,11 +14,13 @@ urlpatterns = (
     path("portals/<int:pk>/delete/", views.PortalDeleteView.as_view(), name="portal_delete"),
     path("portals/<int:pk>/credentials/", views.PortalCredentialEditView.as_view(), name="portal_credentials_edit"),
     path("portals/<int:pk>/credentials/test/", views.PortalCredentialTestView.as_view(), name="portal_credentials_test"),
+    path("portals/<int:pk>/sync/", views.PortalSyncView.as_view(), name="portal_sync"),
 
 
     # Vendor Roles
     path("roles/", views.VendorRoleListView.as_view(), name="vendorrole_list"),
     path("roles/add/", views.VendorRoleEditView.as_view(), name="vendorrole_add"),
+    path("roles/import/", views.VendorRoleImportView.as_view(), name="vendorrole_bulk_import"),
     path("roles/<int:pk>/", views.VendorRoleView.as_view(), name="vendorrole"),
     path("roles/<int:pk>/edit/", views.VendorRoleEditView.as_view(), name="vendorrole_edit"),
     path("roles/<int:pk>/delete/", views.VendorRoleDeleteView.as_view(), name="vendorrole_delete"),
@@ -26,10 +28,16 @@ urlpatterns = (
     # Access Assignments
     path("assignments/", views.AccessAssignmentListView.as_view(), name="accessassignment_list"),
     path("assignments/add/", views.AccessAssignmentEditView.as_view(), name="accessassignment_add"),
+    path("assignments/export/", views.AccessAssignmentExportView.as_view(), name="accessassignment_export_stream"),
+    path("assignments/panel/", views.AccessAssignmentPanelView.as_view(), name="accessassignment_panel"),
+    path("assignments/import/", views.AccessAssignmentImportView.as_view(), name="accessassignment_bulk_import"),
     path("assignments/<int:pk>/", views.AccessAssignmentView.as_view(), name="accessassignment"),
     path("assignments/<int:pk>/edit/", views.AccessAssignmentEditView.as_view(), name="accessassignment_edit"),
     path("assignments/<int:pk>/delete/", views.AccessAssignmentDeleteView.as_view(), name="accessassignment_delete"),
     path("assignments/<int:pk>/queue-push/", views.AccessAssignmentQueuePushView.as_view(), name="accessassignment_queue_push"),
+    # Reports
+    path("report/", views.AccessReportView.as_view(), name="access_report"),
+    path("profiling/", views.ProfilingView.as_view(), name="profiling"),
     # Changelogs
     path("portals/<int:pk>/changelog/", views.PortalChangelogView.as_view(), name="portal_changelog", kwargs={"model": models.Portal}),
     path("roles/<int:pk>/changelog/", views.VendorRoleChangelogView.as_view(), name="vendorrole_changelog", kwargs={"model": models.VendorRole}),
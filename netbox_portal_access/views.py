@@ -2,21 +2,33 @@
 from netbox.views import generic
 from . import models, forms, tables, filters
 from django_rq import enqueue
-from .tasks import push_assignment
+from .tasks import enqueue_push, sync_portal
+from .secrets import DecryptionError
+from .breaker import CircuitBreaker
 from django.contrib.auth.mixins import PermissionRequiredMixin
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404, render
+from django.views import View
+from netbox.plugins import get_plugin_config
+from .reports import BUCKETS, access_report, bucket_assignments
+from .imports import AccessAssignmentImporter, VendorRoleImporter, parse_records
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from .panels import PANEL_TYPES, assignment_filter
+from .exports import iter_csv, iter_jsonl
+from . import profiling
 from django.contrib import messages
-from django.utils import timezone
+from django.urls import reverse
 
 #
 # Portals
 #
 class PortalView(generic.ObjectView):
-    queryset = models.Portal.objects.all()
-    template_name = "netbox_portal_access/object.html"
+    queryset = models.Portal.objects.with_vendor()
+    template_name = "netbox_portal_access/portal.html"
 
 class PortalListView(generic.ObjectListView):
-    queryset = models.Portal.objects.all()
+    queryset = models.Portal.objects.with_vendor()
     table = tables.PortalTable
     filterset = filters.PortalFilterSet
 
@@ -52,7 +64,11 @@ class PortalCredentialTestView(generic.ObjectView):
 
     def get(self, request, *args, **kwargs):
         portal = self.get_object(**kwargs)
-        adapter = portal.get_adapter()
+        try:
+            adapter = portal.get_adapter()
+        except DecryptionError as e:
+            messages.error(request, str(e))
+            return redirect(portal.get_absolute_url())
         if not adapter:
             messages.error(request, "No adapter configured for this portal.")
             return redirect(portal.get_absolute_url())
@@ -68,10 +84,10 @@ class PortalCredentialTestView(generic.ObjectView):
 
         cred = getattr(portal, "credential", None)
         if cred:
-            cred.last_test_at = timezone.now()
-            cred.last_test_status = "OK" if ok else "Failed"
-            cred.last_test_message = msg
-            cred.save()
+            cred.record_test(ok, msg)
+        if ok:
+            # A manual test that succeeds closes the circuit breaker right away
+            CircuitBreaker(portal.pk).record_success()
 
         if ok:
             messages.success(request, f"Connection test succeeded: {msg}")
@@ -79,16 +95,32 @@ class PortalCredentialTestView(generic.ObjectView):
             messages.error(request, f"Connection test failed: {msg}")
         return redirect(portal.get_absolute_url())
 
+class PortalSyncView(PermissionRequiredMixin, generic.ObjectView):
+    permission_required = "netbox_portal_access.can_sync_vendor"
+    queryset = models.Portal.objects.all()
+
+    def get(self, request, *args, **kwargs):
+        portal = self.get_object(**kwargs)
+        if not portal.adapter:
+            messages.error(request, "No adapter configured for this portal.")
+            return redirect(portal.get_absolute_url())
+        if not portal.supports_sync:
+            messages.error(request, f"The {portal.adapter} adapter can't list vendor users, so it can't sync.")
+            return redirect(portal.get_absolute_url())
+        enqueue(sync_portal, portal_id=portal.pk)
+        messages.success(request, f"Queued sync of {portal} from vendor portal.")
+        return redirect(portal.get_absolute_url())
+
 
 #
 # Vendor Roles
 #
 class VendorRoleView(generic.ObjectView):
-    queryset = models.VendorRole.objects.all()
+    queryset = models.VendorRole.objects.with_vendor()
     template_name = "netbox_portal_access/object.html"
 
 class VendorRoleListView(generic.ObjectListView):
-    queryset = models.VendorRole.objects.all()
+    queryset = models.VendorRole.objects.with_vendor()
     table = tables.VendorRoleTable
     filterset = filters.VendorRoleFilterSet
 
@@ -103,11 +135,11 @@ class VendorRoleDeleteView(generic.ObjectDeleteView):
 # Access Assignments
 #
 class AccessAssignmentView(generic.ObjectView):
-    queryset = models.AccessAssignment.objects.all()
+    queryset = models.AccessAssignment.objects.with_vendor()
     template_name = "netbox_portal_access/object.html"
 
 class AccessAssignmentListView(generic.ObjectListView):
-    queryset = models.AccessAssignment.objects.all()
+    queryset = models.AccessAssignment.objects.with_vendor()
     table = tables.AccessAssignmentTable
     filterset = filters.AccessAssignmentFilterSet
 
@@ -118,22 +150,147 @@ class AccessAssignmentEditView(generic.ObjectEditView):
     def form_valid(self, form):
         response = super().form_valid(form)
         if form.cleaned_data.get("queue_push_now") and self.request.user.has_perm("netbox_portal_access.can_push_vendor"):
-            enqueue(push_assignment, assignment_id=self.object.pk, action="upsert")
+            enqueue_push([self.object.pk], action="upsert")
         return response
 
 class AccessAssignmentDeleteView(generic.ObjectDeleteView):
     queryset = models.AccessAssignment.objects.all()
 
+class AccessAssignmentExportView(PermissionRequiredMixin, View):
+    """Stream the filtered assignment list as CSV or JSON Lines with flat memory use."""
+    permission_required = "netbox_portal_access.view_accessassignment"
+    formats = {
+        "csv": (iter_csv, "text/csv", "csv"),
+        "jsonl": (iter_jsonl, "application/x-ndjson", "jsonl"),
+    }
+
+    def get(self, request):
+        qs = models.AccessAssignment.objects.restrict(request.user, "view")
+        qs = filters.AccessAssignmentFilterSet(request.GET, queryset=qs).qs
+        stream, content_type, ext = self.formats.get(request.GET.get("format"), self.formats["csv"])
+
+        response = StreamingHttpResponse(stream(qs), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="access_assignments.{ext}"'
+        return response
+
+class AccessAssignmentPanelView(PermissionRequiredMixin, View):
+    """Paginated assignment rows for the provider/tenant/user/portal panels (loaded via HTMX)."""
+    permission_required = "netbox_portal_access.view_accessassignment"
+    template_name = "netbox_portal_access/inc/access_rows.html"
+
+    def get(self, request):
+        object_type = request.GET.get("object_type", "")
+        object_id = request.GET.get("object_id", "")
+        if object_type not in PANEL_TYPES or not object_id.isdigit():
+            return HttpResponseBadRequest("Invalid object_type or object_id")
+
+        qs = (
+            models.AccessAssignment.objects
+            .restrict(request.user, "view")
+            .filter(assignment_filter(object_type, int(object_id)))
+            .select_related("portal", "role", "user")
+            .order_by("portal__name", "role__name", "pk")
+        )
+        paginator = Paginator(qs, get_plugin_config("netbox_portal_access", "panel_page_size"))
+        return render(request, self.template_name, {
+            "page": paginator.get_page(request.GET.get("page")),
+            "base_url": f"{request.path}?object_type={object_type}&object_id={object_id}",
+            "show_user": object_type != "users.user",
+        })
+
 class AccessAssignmentQueuePushView(PermissionRequiredMixin, generic.ObjectView):
     permission_required = "netbox_portal_access.can_push_vendor"
     queryset = models.AccessAssignment.objects.all()
 
     def get(self, request, *args, **kwargs):
         obj = self.get_object(**kwargs)
-        enqueue(push_assignment, assignment_id=obj.pk, action="upsert")
-        messages.success(request, f"Queued push of assignment {obj} to vendor portal.")
+        if enqueue_push([obj.pk], action="upsert"):
+            messages.success(request, f"Queued push of assignment {obj} to vendor portal.")
+        else:
+            messages.info(request, f"A push of assignment {obj} is already queued.")
         return redirect(obj.get_absolute_url())
 
+#
+# Bulk import
+#
+class BaseImportView(PermissionRequiredMixin, View):
+    template_name = "netbox_portal_access/bulk_import.html"
+    importer = None
+    list_url = None
+    columns = ()
+
+    def _render(self, request, form, errors=()):
+        return render(request, self.template_name, {
+            "form": form,
+            "errors": errors,
+            "columns": self.columns,
+            "model": self.importer.model,
+            "return_url": reverse(self.list_url),
+        })
+
+    def get(self, request):
+        return self._render(request, forms.BulkImportForm())
+
+    def post(self, request):
+        form = forms.BulkImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return self._render(request, form)
+        try:
+            records = parse_records(form.cleaned_data["data"], form.cleaned_data["format"])
+        except ValidationError as e:
+            return self._render(request, form, e.messages)
+
+        importer = self.importer(records, request.user)
+        created = importer.run()
+        if importer.errors:
+            return self._render(request, form, importer.errors)
+        messages.success(request, f"Imported {len(created)} {self.importer.model._meta.verbose_name_plural}.")
+        return redirect(self.list_url)
+
+class VendorRoleImportView(BaseImportView):
+    permission_required = "netbox_portal_access.add_vendorrole"
+    importer = VendorRoleImporter
+    list_url = "plugins:netbox_portal_access:vendorrole_list"
+    columns = ("portal", "name", "category", "description")
+
+class AccessAssignmentImportView(BaseImportView):
+    permission_required = "netbox_portal_access.add_accessassignment"
+    importer = AccessAssignmentImporter
+    list_url = "plugins:netbox_portal_access:accessassignment_list"
+    columns = (
+        "user", "portal", "role", "account_identifier", "username_on_portal", "active",
+        "mfa_type", "sso_provider", "last_verified", "expires_on", "notes", "remote_id",
+    )
+
+#
+# Reports
+#
+class AccessReportView(PermissionRequiredMixin, View):
+    permission_required = "netbox_portal_access.view_accessassignment"
+    template_name = "netbox_portal_access/access_report.html"
+
+    def get(self, request):
+        qs = models.AccessAssignment.objects.restrict(request.user, "view")
+        return render(request, self.template_name, {
+            "report": access_report(qs),
+            "lists": {bucket: bucket_assignments(qs, bucket) for bucket in BUCKETS},
+            "stale_days": get_plugin_config("netbox_portal_access", "stale_days"),
+            "expiring_soon_days": get_plugin_config("netbox_portal_access", "expiring_soon_days"),
+        })
+
+class ProfilingView(View):
+    """Recent request profiles recorded by ProfilingMiddleware (superusers only)."""
+    template_name = "netbox_portal_access/profiling.html"
+
+    def get(self, request):
+        if not request.user.is_superuser:
+            raise PermissionDenied()
+        request._portal_access_profiling_page = True
+        return render(request, self.template_name, {
+            "enabled": get_plugin_config("netbox_portal_access", "profiling"),
+            "profiles": profiling.history(),
+        })
+
 # 
 # Changelog Views
 #
@@ -0,0 +1,23 @@
+"""
+Shared fixtures for the benchmark suites.
+
+Benchmarks need a NetBox test environment with pytest-django, e.g. from the
+NetBox source directory:
+
+    pytest -p pytest_django --ds=netbox.settings /path/to/netbox-portal-access/tests/benchmarks
+
+Elsewhere they are skipped. Sizes and fault rates come from BENCH_* environment
+variables; results are appended to bench_output.txt (or $BENCH_OUTPUT).
+"""
+from datetime import datetime
+import pytest
+from .helpers import OUTPUT, BenchReport
+
+@pytest.fixture(scope="session")
+def bench_report():
+    report = BenchReport()
+    yield report
+    if report.lines:
+        with OUTPUT.open("a") as f:
+            f.write(f"# {datetime.now().isoformat(timespec='seconds')}\n")
+            f.write("\n".join(report.lines) + "\n")
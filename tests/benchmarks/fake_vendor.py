@@ -0,0 +1,115 @@
+"""
+In-process fake vendor API for the push benchmarks.
+
+A stdlib ThreadingHTTPServer that accepts any JSON request, answers with a
+generated remote id and can inject latency, 5xx errors and 429s at
+configurable rates. Nothing leaves the machine, so runs are repeatable
+offline.
+"""
+from __future__ import annotations
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0       # added to every response
+    jitter_ms: float = 0.0        # uniform +/- on top of latency_ms
+    error_rate: float = 0.0       # fraction answered with 503
+    throttle_rate: float = 0.0    # fraction answered with 429
+    retry_after: int = 1          # Retry-After seconds sent with 429s
+    seed: int = 0
+
+@dataclass
+class VendorStats:
+    requests: int = 0
+    errors: int = 0
+    throttled: int = 0
+    by_path: dict[str, int] = field(default_factory=dict)
+
+class FakeVendor:
+    """Start with ``with FakeVendor(FaultConfig(...)) as vendor:``; ``vendor.url`` is the base URL."""
+
+    def __init__(self, faults: FaultConfig | None = None):
+        self.faults = faults or FaultConfig()
+        self.stats = VendorStats()
+        self._lock = threading.Lock()
+        self._random = random.Random(self.faults.seed)
+        self._ids = count(1)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeVendor":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self, faults: FaultConfig | None = None) -> None:
+        with self._lock:
+            if faults is not None:
+                self.faults = faults
+                self._random = random.Random(faults.seed)
+            self.stats = VendorStats()
+
+    def _decide(self, path: str) -> tuple[int, float]:
+        """Pick (status, delay seconds) for one request and count it."""
+        with self._lock:
+            f = self.faults
+            self.stats.requests += 1
+            self.stats.by_path[path] = self.stats.by_path.get(path, 0) + 1
+            delay = max(0.0, f.latency_ms + self._random.uniform(-f.jitter_ms, f.jitter_ms)) / 1000
+            roll = self._random.random()
+            if roll < f.throttle_rate:
+                self.stats.throttled += 1
+                return 429, delay
+            if roll < f.throttle_rate + f.error_rate:
+                self.stats.errors += 1
+                return 503, delay
+            return 200, delay
+
+    def _handler(self):
+        vendor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"null") if length else None
+                status, delay = vendor._decide(self.path.split("?")[0])
+                if delay:
+                    time.sleep(delay)
+                if status == 200:
+                    items = body if isinstance(body, list) else [body]
+                    payload = [{"id": f"r{next(vendor._ids)}"} for _ in items]
+                    payload = payload if isinstance(body, list) else payload[0]
+                else:
+                    payload = {"error": "throttled" if status == 429 else "unavailable"}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", str(vendor.faults.retry_after))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
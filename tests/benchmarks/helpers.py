@@ -0,0 +1,34 @@
+"""
+Helpers shared by the benchmark modules: BENCH_* environment settings,
+latency percentiles and the report appended to bench_output.txt (or
+$BENCH_OUTPUT).
+"""
+import os
+import statistics
+from pathlib import Path
+
+OUTPUT = Path(os.environ.get("BENCH_OUTPUT") or Path(__file__).resolve().parents[2] / "bench_output.txt")
+
+def env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name) or default)
+
+def env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name) or default)
+
+def percentiles(values) -> dict[str, float]:
+    """p50/p95/p99 of ``values`` (0 for each when there are too few samples)."""
+    values = [v for v in values if v is not None]
+    if len(values) < 2:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+class BenchReport:
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def add(self, name: str, **metrics) -> None:
+        parts = [f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in metrics.items()]
+        line = f"{name:<32} " + " ".join(parts)
+        self.lines.append(line)
+        print(line)
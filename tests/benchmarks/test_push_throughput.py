@@ -0,0 +1,169 @@
+"""
+Push throughput against the local fake vendor.
+
+Drives the sequential, concurrent and batched push paths (and single
+push_assignment calls) over BENCH_ASSIGNMENTS synthetic assignments and
+reports throughput, p50/p95/p99 vendor-call latency from the PushAttempt
+history and DB queries per push. Query counts are asserted so an N+1 in
+the push path fails the run.
+"""
+import math
+import time
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from circuits.models import Provider
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from netbox_portal_access import tasks
+from netbox_portal_access.adapters import BaseAdapter, register
+from netbox_portal_access.models import AccessAssignment, Portal, PushAttempt, RoleCategory, VendorRole
+from .helpers import env_float, env_int, percentiles
+from .fake_vendor import FakeVendor, FaultConfig
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+ASSIGNMENTS = env_int("BENCH_ASSIGNMENTS", 2000)
+SINGLE_PUSHES = env_int("BENCH_SINGLE_PUSHES", 200)
+LATENCY_MS = env_float("BENCH_LATENCY_MS", 2)
+JITTER_MS = env_float("BENCH_JITTER_MS", 1)
+ERROR_RATE = env_float("BENCH_ERROR_RATE", 0.02)
+THROTTLE_RATE = env_float("BENCH_THROTTLE_RATE", 0.01)
+
+# Fixed setup (groups, credential lookup, savepoints) plus write-back batches of 500
+BASE_QUERIES = 10
+QUERIES_PER_BATCH = 2
+# A single push_assignment() call, end to end
+MAX_QUERIES_PER_SINGLE_PUSH = 12
+
+@register("bench", "Benchmark vendor")
+class BenchAdapter(BaseAdapter):
+    def _payload(self, assignment) -> dict:
+        return {"assignment_id": assignment.pk, "user": assignment.user.username, "role": assignment.role.name}
+
+    def create_access(self, assignment):
+        r = self.request("POST", "users", json=self._payload(assignment))
+        if r.status_code == 200:
+            return True, "created", r.json()["id"]
+        return False, f"HTTP {r.status_code}", None
+
+    def update_access(self, assignment):
+        r = self.request("PUT", f"users/{assignment.remote_id}", json=self._payload(assignment))
+        return r.status_code == 200, f"HTTP {r.status_code}", assignment.remote_id
+
+@register("bench-batch", "Benchmark vendor (batched)")
+class BatchBenchAdapter(BenchAdapter):
+    def push_many(self, assignments, action="upsert"):
+        r = self.request("POST", "users/batch", json=[self._payload(a) for a in assignments])
+        if r.status_code != 200:
+            return [(False, f"HTTP {r.status_code}", None)] * len(assignments)
+        return [(True, "created", item["id"]) for item in r.json()]
+
+@pytest.fixture(scope="module")
+def vendor():
+    with FakeVendor(FaultConfig(latency_ms=LATENCY_MS, jitter_ms=JITTER_MS)) as server:
+        yield server
+
+@pytest.fixture
+def rescheduled(monkeypatch):
+    """Collect rescheduled assignment ids instead of queueing them in RQ."""
+    calls = []
+    monkeypatch.setattr(tasks, "_reschedule", lambda objs, action, delay: calls.extend(o.pk for o in objs))
+    return calls
+
+def seed(vendor, adapter: str, count: int) -> list[int]:
+    provider = Provider.objects.create(name=f"Bench {adapter} {time.monotonic_ns()}", slug=f"bench-{time.monotonic_ns()}")
+    portal = Portal.objects.create(
+        vendor_ct=ContentType.objects.get_for_model(Provider),
+        vendor_id=provider.pk,
+        name="Bench portal",
+        adapter=adapter,
+        base_url=vendor.url,
+        request_retries=0,
+        push_concurrency=16,
+    )
+    role = VendorRole.objects.create(portal=portal, name="Bench role", category=RoleCategory.choices[0][0])
+    User = get_user_model()
+    prefix = f"bench{portal.pk}-"
+    User.objects.bulk_create([User(username=f"{prefix}{i}") for i in range(count)], batch_size=1000)
+    user_ids = User.objects.filter(username__startswith=prefix).values_list("pk", flat=True)
+    AccessAssignment.objects.bulk_create(
+        [AccessAssignment(portal=portal, role=role, user_id=pk) for pk in user_ids],
+        batch_size=1000,
+    )
+    return list(AccessAssignment.objects.filter(portal=portal).values_list("pk", flat=True))
+
+def measure(bench_report, name: str, vendor, run, ids: list[int]) -> dict:
+    started = timezone.now()
+    with CaptureQueriesContext(connection) as ctx:
+        t0 = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - t0
+    durations = PushAttempt.objects.filter(assignment_id__in=ids, started_at__gte=started).values_list("duration_ms", flat=True)
+    outcomes = dict.fromkeys(("SUCCESS", "FAILED"), 0)
+    for outcome in PushAttempt.objects.filter(assignment_id__in=ids, started_at__gte=started).values_list("outcome", flat=True):
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    metrics = {
+        "n": len(ids),
+        "per_sec": len(ids) / elapsed if elapsed else 0.0,
+        **{f"{k}_ms": v for k, v in percentiles(durations).items()},
+        "queries": len(ctx.captured_queries),
+        "queries_per_push": len(ctx.captured_queries) / len(ids),
+        "ok": outcomes["SUCCESS"],
+        "failed": outcomes["FAILED"],
+        "vendor_requests": vendor.stats.requests,
+    }
+    bench_report.add(name, **metrics)
+    return metrics
+
+def batch_budget(count: int) -> int:
+    return BASE_QUERIES + QUERIES_PER_BATCH * math.ceil(count / 500)
+
+@pytest.mark.parametrize("name, adapter, runner", [
+    ("push.sequential", "bench", tasks.push_assignments),
+    ("push.concurrent", "bench", tasks.push_assignments_async),
+    ("push.batched", "bench-batch", tasks.push_assignments),
+])
+def test_push_throughput(vendor, bench_report, rescheduled, name, adapter, runner):
+    ids = seed(vendor, adapter, ASSIGNMENTS)
+    vendor.reset(FaultConfig(latency_ms=LATENCY_MS, jitter_ms=JITTER_MS))
+
+    metrics = measure(bench_report, name, vendor, lambda: runner(assignment_ids=ids), ids)
+
+    assert metrics["ok"] == len(ids)
+    assert not AccessAssignment.objects.filter(pk__in=ids, needs_push=True).exists()
+    assert metrics["queries"] <= batch_budget(len(ids))
+
+def test_push_with_faults(vendor, bench_report, rescheduled, plugin_settings):
+    # Keep the breaker closed so injected errors are measured rather than short-circuited
+    plugin_settings(breaker_failure_threshold=10 ** 6)
+    ids = seed(vendor, "bench", ASSIGNMENTS)
+    vendor.reset(FaultConfig(
+        latency_ms=LATENCY_MS, jitter_ms=JITTER_MS, error_rate=ERROR_RATE, throttle_rate=THROTTLE_RATE, seed=42,
+    ))
+
+    metrics = measure(bench_report, "push.faults", vendor, lambda: tasks.push_assignments_async(assignment_ids=ids), ids)
+
+    assert metrics["ok"] + metrics["failed"] + len(rescheduled) == len(ids)
+    assert metrics["failed"] == vendor.stats.errors
+    assert len(rescheduled) == vendor.stats.throttled
+    assert metrics["queries"] <= batch_budget(len(ids))
+
+def test_single_push_queries(vendor, bench_report, rescheduled):
+    ids = seed(vendor, "bench", SINGLE_PUSHES)
+    vendor.reset(FaultConfig(latency_ms=LATENCY_MS, jitter_ms=JITTER_MS))
+
+    def run():
+        for pk in ids:
+            tasks.push_assignment(pk)
+
+    metrics = measure(bench_report, "push.single", vendor, run, ids)
+
+    assert metrics["ok"] == len(ids)
+    assert metrics["queries_per_push"] <= MAX_QUERIES_PER_SINGLE_PUSH
@@ -0,0 +1,142 @@
+"""
+Query-count and render-time benchmarks for list views, panels and the API at scale.
+
+Seeds BENCH_PORTALS portals (split between provider and tenant vendors, one
+role each) and BENCH_SCALE_ASSIGNMENTS assignments once per module, then
+renders each page cold. Every page must stay under a fixed query budget
+and issue the same number of queries at two page sizes, so an N+1 (GFK
+vendor lookups, role names, users) fails the run. Render times go to the
+bench report.
+
+The seeded rows are left in the disposable test database.
+"""
+import statistics
+import time
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from circuits.models import Provider
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tenancy.models import Tenant
+
+from netbox_portal_access.models import AccessAssignment, Portal, RoleCategory, VendorRole
+from netbox_portal_access.panels import invalidate_all
+from .helpers import env_int
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+PORTALS = env_int("BENCH_PORTALS", 10_000)
+ASSIGNMENTS = env_int("BENCH_SCALE_ASSIGNMENTS", 100_000)
+VENDORS = env_int("BENCH_VENDORS", 200)
+USERS = env_int("BENCH_USERS", 5_000)
+REPEAT = env_int("BENCH_REPEAT", 5)
+# NetBox's own per-request overhead (session, user config, table config,
+# saved filters, counts) plus the plugin's fixed lookups
+MAX_QUERIES = env_int("BENCH_MAX_QUERIES", 30)
+PAGE_SIZES = (25, 100)
+
+@pytest.fixture(scope="module")
+def scale_data(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        return seed()
+
+def seed() -> dict:
+    providers = Provider.objects.bulk_create(
+        [Provider(name=f"Scale provider {i}", slug=f"scale-provider-{i}") for i in range(VENDORS // 2)]
+    )
+    tenants = Tenant.objects.bulk_create(
+        [Tenant(name=f"Scale tenant {i}", slug=f"scale-tenant-{i}") for i in range(VENDORS - VENDORS // 2)]
+    )
+    vendors = (
+        [(ContentType.objects.get_for_model(Provider), p.pk) for p in providers]
+        + [(ContentType.objects.get_for_model(Tenant), t.pk) for t in tenants]
+    )
+    portals = Portal.objects.bulk_create(
+        [
+            Portal(vendor_ct=vendors[i % len(vendors)][0], vendor_id=vendors[i % len(vendors)][1], name=f"Scale portal {i}")
+            for i in range(PORTALS)
+        ],
+        batch_size=2000,
+    )
+    categories = [value for value, _ in RoleCategory.choices]
+    roles = VendorRole.objects.bulk_create(
+        [VendorRole(portal=p, name=f"Role {p.pk}", category=categories[i % len(categories)]) for i, p in enumerate(portals)],
+        batch_size=2000,
+    )
+    User = get_user_model()
+    User.objects.bulk_create([User(username=f"scale-{i}") for i in range(USERS)], batch_size=2000)
+    user_ids = list(User.objects.filter(username__startswith="scale-").values_list("pk", flat=True))
+    for start in range(0, ASSIGNMENTS, 5000):
+        AccessAssignment.objects.bulk_create([
+            AccessAssignment(portal_id=roles[i % len(roles)].portal_id, role=roles[i % len(roles)], user_id=user_ids[i % len(user_ids)])
+            for i in range(start, min(start + 5000, ASSIGNMENTS))
+        ])
+    return {"provider": providers[0].pk, "tenant": tenants[0].pk, "user": user_ids[0]}
+
+@pytest.fixture
+def client(client, django_user_model):
+    admin = django_user_model.objects.create_superuser(username="bench-admin", password="bench", email="")
+    client.force_login(admin)
+    return client
+
+def panel_url(object_type: str, pk: int) -> str:
+    return f"{reverse('plugins:netbox_portal_access:accessassignment_panel')}?object_type={object_type}&object_id={pk}"
+
+PAGES = {
+    "view.portal_list": lambda d: reverse("plugins:netbox_portal_access:portal_list"),
+    "view.vendorrole_list": lambda d: reverse("plugins:netbox_portal_access:vendorrole_list"),
+    "view.assignment_list": lambda d: reverse("plugins:netbox_portal_access:accessassignment_list"),
+    "view.access_report": lambda d: reverse("plugins:netbox_portal_access:access_report"),
+    "panel.provider_detail": lambda d: reverse("circuits:provider", kwargs={"pk": d["provider"]}),
+    "panel.tenant_detail": lambda d: reverse("tenancy:tenant", kwargs={"pk": d["tenant"]}),
+    "panel.provider_rows": lambda d: panel_url("circuits.provider", d["provider"]),
+    "panel.tenant_rows": lambda d: panel_url("tenancy.tenant", d["tenant"]),
+    "panel.user_rows": lambda d: panel_url("users.user", d["user"]),
+    "api.portals": lambda d: reverse("plugins-api:netbox_portal_access-api:portal-list"),
+    "api.portals_brief": lambda d: reverse("plugins-api:netbox_portal_access-api:portal-list") + "?brief=1",
+    "api.vendor_roles": lambda d: reverse("plugins-api:netbox_portal_access-api:vendorrole-list"),
+    "api.assignments": lambda d: reverse("plugins-api:netbox_portal_access-api:accessassignment-list"),
+    "api.assignments_brief": lambda d: reverse("plugins-api:netbox_portal_access-api:accessassignment-list") + "?brief=1",
+}
+
+def with_page_size(url: str, size: int) -> str:
+    sep = "&" if "?" in url else "?"
+    key = "limit" if "/api/" in url else "per_page"
+    return f"{url}{sep}{key}={size}"
+
+def render(client, url: str) -> tuple[int, float]:
+    """Render ``url`` cold (panel caches cleared); return (queries, milliseconds)."""
+    invalidate_all()
+    with CaptureQueriesContext(connection) as ctx:
+        t0 = time.perf_counter()
+        response = client.get(url)
+        elapsed = (time.perf_counter() - t0) * 1000
+    assert response.status_code == 200, f"{url} returned {response.status_code}"
+    return len(ctx.captured_queries), elapsed
+
+@pytest.mark.parametrize("name", PAGES)
+def test_page_queries(scale_data, client, bench_report, name):
+    url = PAGES[name](scale_data)
+    render(client, with_page_size(url, PAGE_SIZES[0]))  # warm up ContentType and config caches
+
+    counts = {}
+    for size in PAGE_SIZES:
+        sized = with_page_size(url, size)
+        samples = [render(client, sized) for _ in range(REPEAT)]
+        counts[size] = max(q for q, _ in samples)
+        timings = [ms for _, ms in samples]
+        bench_report.add(
+            f"{name}[{size}]",
+            queries=counts[size],
+            median_ms=statistics.median(timings),
+            max_ms=max(timings),
+        )
+
+    assert counts[PAGE_SIZES[0]] == counts[PAGE_SIZES[-1]], f"{name}: query count grows with page size {counts}"
+    assert counts[PAGE_SIZES[-1]] <= MAX_QUERIES
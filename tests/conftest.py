@@ -0,0 +1,99 @@
+"""
+Fixtures shared by the unit tests and benchmarks. Everything except the
+smoke test needs a NetBox test environment with pytest-django, e.g. from the
+NetBox source directory:
+
+    pytest -p pytest_django --ds=netbox.settings /path/to/netbox-portal-access/tests
+"""
+from uuid import uuid4
+import pytest
+
+@pytest.fixture
+def plugin_settings(settings):
+    """Override netbox_portal_access plugin settings for one test: ``plugin_settings(key=value)``."""
+    def override(**values):
+        config = dict(settings.PLUGINS_CONFIG)
+        config["netbox_portal_access"] = {**config.get("netbox_portal_access", {}), **values}
+        settings.PLUGINS_CONFIG = config
+    return override
+
+@pytest.fixture
+def locmem_cache(settings):
+    """Swap the shared (Redis) cache for a per-test local memory cache."""
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"}}
+    from django.core.cache import cache
+    cache.clear()
+    return cache
+
+@pytest.fixture
+def portal(db):
+    """A provider portal with "Admin" and "Read" roles."""
+    from circuits.models import Provider
+    from django.contrib.contenttypes.models import ContentType
+    from netbox_portal_access.models import Portal, RoleCategory, VendorRole
+
+    provider = Provider.objects.create(name="Test Provider", slug="test-provider")
+    portal = Portal.objects.create(
+        vendor_ct=ContentType.objects.get_for_model(Provider),
+        vendor_id=provider.pk,
+        name="Test Portal",
+    )
+    VendorRole.objects.create(portal=portal, name="Admin", category=RoleCategory.PORTAL_ADMIN)
+    VendorRole.objects.create(portal=portal, name="Read", category=RoleCategory.READ_ONLY)
+    return portal
+
+@pytest.fixture
+def make_user(db):
+    from django.contrib.auth import get_user_model
+
+    def make(username: str, **kwargs):
+        return get_user_model().objects.create(username=username, **kwargs)
+    return make
+
+class FakeJob:
+    """Stands in for an RQ job: what was enqueued, plus the fields the push status API reads."""
+
+    def __init__(self, func, args, kwargs, delay=None):
+        self.id = uuid4().hex
+        self.func = func
+        self.func_name = f"{func.__module__}.{func.__name__}"
+        self.args = args
+        self.kwargs = kwargs
+        self.delay = delay
+        self.meta = {}
+        self.status = "queued"
+        self.result = None
+        self.exc_info = None
+        self.enqueued_at = self.started_at = self.ended_at = None
+
+    @property
+    def is_failed(self) -> bool:
+        return self.status == "failed"
+
+    def get_status(self) -> str:
+        return self.status
+
+class FakeQueue:
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, func, *args, **kwargs):
+        job = FakeJob(func, args, kwargs)
+        self.jobs.append(job)
+        return job
+
+    def enqueue_in(self, delay, func, *args, **kwargs):
+        job = FakeJob(func, args, kwargs, delay=delay)
+        self.jobs.append(job)
+        return job
+
+    def fetch_job(self, job_id):
+        return next((job for job in self.jobs if job.id == job_id), None)
+
+@pytest.fixture
+def queue(monkeypatch):
+    """Collect the jobs the plugin enqueues in ``queue.jobs`` instead of sending them to Redis."""
+    fake = FakeQueue()
+    for module in ("netbox_portal_access.api.views", "netbox_portal_access.tasks"):
+        monkeypatch.setattr(f"{module}.get_queue", lambda name="default": fake)
+    return fake
@@ -0,0 +1,59 @@
+"""Adapter discovery through entry points."""
+from importlib.metadata import EntryPoint
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from netbox_portal_access import adapters
+from netbox_portal_access.adapters import BaseAdapter, EchoAdapter, register
+
+class VendorAdapter(BaseAdapter):
+    """What a third-party package would expose, without using @register."""
+
+class KeyedAdapter(BaseAdapter):
+    pass
+
+def entry_point(name: str, target: str) -> EntryPoint:
+    return EntryPoint(name, f"{__name__}:{target}", adapters.ENTRY_POINT_GROUP)
+
+@pytest.fixture
+def installed(monkeypatch):
+    """Pretend "vendor" and "broken" are installed, with a registry of our own."""
+    monkeypatch.setattr(adapters, "_REGISTRY", {})
+    eps = {"vendor": entry_point("vendor", "VendorAdapter"), "broken": entry_point("broken", "Missing")}
+    monkeypatch.setattr(adapters, "_entry_points", lambda: eps)
+    return adapters._REGISTRY
+
+def test_entry_points_load_on_first_use(installed):
+    assert "vendor" not in installed
+    assert adapters.get("vendor") is VendorAdapter
+    assert installed["vendor"] is VendorAdapter
+    assert (VendorAdapter.slug, VendorAdapter.label) == ("vendor", "vendor")
+
+def test_unknown_or_broken_adapters_are_none(installed):
+    assert adapters.get("nope") is None
+    assert adapters.get("broken") is None
+    assert "broken" not in installed
+
+def test_choices_list_entry_points_without_loading_them(installed):
+    config = {"netbox_portal_access": {"adapters": {"vendor": {"label": "Vendor Portal"}}}}
+    assert adapters.available_choices(config) == [("broken", "broken"), ("vendor", "Vendor Portal")]
+    assert installed == {}
+
+def test_choices_hide_adapters_missing_required_keys(installed):
+    register("keyed", "Keyed", required_keys=("api_key",))(KeyedAdapter)
+    without = {"netbox_portal_access": {}}
+    with_key = {"netbox_portal_access": {"adapters": {"keyed": {"api_key": "x"}}}}
+    assert ("keyed", "Keyed") not in adapters.available_choices(without)
+    assert ("keyed", "Keyed") in adapters.available_choices(with_key)
+
+def retried_methods(cls) -> set[str]:
+    portal = SimpleNamespace(pk=1, base_url="", rate_limit_per_minute=None, push_concurrency=1)
+    return set(cls(portal, {}).build_session().get_adapter("https://").max_retries.allowed_methods)
+
+def test_session_only_resends_idempotent_methods_by_default():
+    assert retried_methods(VendorAdapter) == {"HEAD", "GET", "OPTIONS", "PUT", "DELETE"}
+
+def test_adapters_opt_in_to_resending_posts():
+    assert "POST" in retried_methods(EchoAdapter)
@@ -0,0 +1,96 @@
+"""The bulk push endpoint and push job status."""
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from netbox_portal_access import tasks
+from netbox_portal_access.models import AccessAssignment
+
+PUSH_URL = "plugins-api:netbox_portal_access-api:push"
+STATUS_URL = "plugins-api:netbox_portal_access-api:push-status"
+
+@pytest.fixture
+def api(make_user):
+    client = APIClient()
+    client.force_authenticate(make_user("admin", is_superuser=True))
+    return client
+
+@pytest.fixture
+def assignments(portal, make_user):
+    """Active assignments for alice and bob, and an inactive one for carol."""
+    role = portal.roles.get(name="Read")
+    return [
+        AccessAssignment.objects.create(portal=portal, role=role, user=make_user(name), active=active)
+        for name, active in (("alice", True), ("bob", True), ("carol", False))
+    ]
+
+def push(api, body):
+    return api.post(reverse(PUSH_URL), body, format="json")
+
+def test_push_by_ids_enqueues_one_job(api, assignments, queue):
+    ids = [assignments[1].pk, assignments[0].pk]
+    response = push(api, {"ids": ids, "action": "deactivate"})
+
+    assert response.status_code == 202
+    [job] = queue.jobs
+    # The test portal allows concurrent requests
+    assert job.func is tasks.push_assignments_async
+    assert job.kwargs == {"assignment_ids": sorted(ids), "action": "deactivate"}
+    assert (response.data["job_id"], response.data["count"]) == (job.id, 2)
+    assert response.data["status_url"].endswith(reverse(STATUS_URL, kwargs={"job_id": job.id}))
+
+def test_push_by_filter(api, assignments, queue):
+    response = push(api, {"filter": {"active": False}})
+
+    assert response.status_code == 202
+    assert queue.jobs[0].kwargs == {"assignment_ids": [assignments[2].pk], "action": "upsert"}
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"ids": [1], "filter": {"active": True}},
+    {"ids": []},
+    {"ids": [1], "action": "explode"},
+    {"ids": [999999]},
+])
+def test_bad_requests_enqueue_nothing(api, assignments, queue, body):
+    assert push(api, body).status_code == 400
+    assert queue.jobs == []
+
+def test_push_needs_permission(assignments, make_user, queue):
+    client = APIClient()
+    client.force_authenticate(make_user("viewer"))
+    assert client.post(reverse(PUSH_URL), {"ids": [assignments[0].pk]}, format="json").status_code == 403
+    assert queue.jobs == []
+
+def test_job_status_reports_progress_and_result(api, assignments, queue):
+    job_id = push(api, {"ids": [assignments[0].pk]}).data["job_id"]
+    job = queue.fetch_job(job_id)
+    url = reverse(STATUS_URL, kwargs={"job_id": job_id})
+
+    job.status = "started"
+    job.meta["progress"] = {"total": 1, "processed": 0, "succeeded": 0, "failed": 0}
+    data = api.get(url).data
+    assert (data["status"], data["progress"]["processed"], data["result"]) == ("started", 0, None)
+
+    job.status = "finished"
+    job.result = {"total": 1, "succeeded": 1, "failed": 0, "results": []}
+    data = api.get(url).data
+    assert (data["status"], data["result"]["succeeded"], data["error"]) == ("finished", 1, None)
+
+def test_status_of_other_jobs_is_not_found(api, queue):
+    other = queue.enqueue(print, "not a push")
+    assert api.get(reverse(STATUS_URL, kwargs={"job_id": other.id})).status_code == 404
+    assert api.get(reverse(STATUS_URL, kwargs={"job_id": "missing"})).status_code == 404
+
+def test_failed_job_reports_only_the_exception(api, assignments, queue):
+    job_id = push(api, {"ids": [assignments[0].pk]}).data["job_id"]
+    job = queue.fetch_job(job_id)
+    job.status = "failed"
+    job.exc_info = 'Traceback (most recent call last):\n  File "tasks.py", line 1\nConnectionError: vendor unreachable\n'
+
+    data = api.get(reverse(STATUS_URL, kwargs={"job_id": job_id})).data
+    assert data["error"] == "ConnectionError: vendor unreachable"
@@ -0,0 +1,109 @@
+"""Per-portal circuit breaker and how push outcomes feed it."""
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from netbox_portal_access import tasks
+from netbox_portal_access.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+@pytest.fixture
+def breaker(locmem_cache, plugin_settings):
+    plugin_settings(breaker_failure_threshold=3, breaker_reset_seconds=60)
+    return CircuitBreaker(portal_id=1)
+
+def test_opens_after_threshold(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow(probe=lambda: True)
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.tripped
+    assert not breaker.allow(probe=lambda: True)
+    assert 0 < breaker.retry_in() <= 60
+
+def test_success_resets_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.status()["failures"] == 1
+
+def test_state_is_shared_between_instances(breaker):
+    for _ in range(3):
+        breaker.record_failure()
+    assert CircuitBreaker(portal_id=1).state == OPEN
+    assert CircuitBreaker(portal_id=2).state == CLOSED
+
+@pytest.fixture
+def half_open(breaker, monkeypatch):
+    for _ in range(3):
+        breaker.record_failure()
+    monkeypatch.setattr(breaker, "reset_seconds", 0)
+    assert breaker.state == HALF_OPEN
+    return breaker
+
+def test_half_open_probe_success_closes(half_open):
+    assert half_open.allow(probe=lambda: True)
+    assert half_open.state == CLOSED
+    assert half_open.status()["failures"] == 0
+
+@pytest.mark.parametrize("probe", [lambda: False, lambda: 1 / 0])
+def test_half_open_probe_failure_reopens(half_open, probe):
+    assert not half_open.allow(probe=probe)
+    assert half_open.tripped
+
+def test_only_one_worker_probes(half_open, locmem_cache):
+    locmem_cache.add(half_open.probe_key, 1)
+    probed = []
+    assert not half_open.allow(probe=lambda: probed.append(1) or True)
+    assert probed == []
+
+@pytest.mark.parametrize("ok, http_status, failures", [
+    (True, 200, 0),
+    (False, 404, 0),   # the vendor answered; the request was bad
+    (False, 503, 2),
+    (False, None, 2),  # timeout or dropped connection
+])
+def test_push_outcome_feeds_breaker(breaker, ok, http_status, failures):
+    breaker.record_failure()
+    tasks._record_outcome(breaker, ok, http_status)
+    assert breaker.status()["failures"] == failures
+
+def test_failed_push_results_count_as_failures(breaker):
+    class Adapter:
+        def upsert_access(self, obj):
+            tasks.call_info.get()["http_status"] = 502
+            return False, "HTTP 502", None
+
+    obj = type("Assignment", (), {})()
+    for _ in range(3):
+        assert tasks._push_one(Adapter(), obj, "upsert", breaker) == (False, "HTTP 502", None)
+    assert breaker.state == OPEN
+    assert obj._push_attempt[2] == 502
+
+def test_push_exceptions_count_as_failures(breaker):
+    class Adapter:
+        def upsert_access(self, obj):
+            raise ConnectionError("vendor unreachable")
+
+    obj = type("Assignment", (), {})()
+    for _ in range(3):
+        ok, msg, _ = tasks._push_one(Adapter(), obj, "upsert", breaker)
+        assert (ok, msg) == (False, "Exception during push: vendor unreachable")
+    assert breaker.state == OPEN
+
+def test_portal_api_reports_breaker_state(portal, breaker, make_user):
+    tripped = CircuitBreaker(portal.pk)
+    for _ in range(3):
+        tripped.record_failure()
+    client = APIClient()
+    client.force_authenticate(make_user("admin", is_superuser=True))
+    data = client.get(reverse("plugins-api:netbox_portal_access-api:portal-detail", kwargs={"pk": portal.pk})).data
+    assert (data["circuit_breaker"]["state"], data["circuit_breaker"]["failures"]) == (OPEN, 3)
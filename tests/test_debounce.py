@@ -0,0 +1,57 @@
+"""Debounced, coalesced push enqueueing."""
+from datetime import timedelta
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from netbox_portal_access import tasks
+from netbox_portal_access.models import AccessAssignment
+
+# enqueue_push() looks up the portals to pick the push job
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def debounce(plugin_settings, locmem_cache):
+    plugin_settings(push_debounce_seconds=5)
+
+def test_push_runs_after_the_debounce_window(debounce, queue):
+    job = tasks.enqueue_push([1, 2], action="update")
+
+    assert queue.jobs == [job]
+    assert job.delay == timedelta(seconds=5)
+    assert job.func is tasks.push_assignments
+    assert job.kwargs == {"assignment_ids": [1, 2], "action": "update", "claimed": True}
+
+def test_no_debounce_enqueues_immediately(plugin_settings, locmem_cache, queue):
+    plugin_settings(push_debounce_seconds=0)
+    job = tasks.enqueue_push([1])
+    assert job.delay is None
+
+def test_pending_pushes_coalesce(debounce, queue):
+    tasks.enqueue_push([1])
+    job = tasks.enqueue_push([1, 2])
+
+    assert tasks.enqueue_push([1, 2]) is None
+    assert job.kwargs["assignment_ids"] == [2]
+    assert len(queue.jobs) == 2
+
+def test_actions_are_pending_separately(debounce, queue):
+    tasks.enqueue_push([1], action="upsert")
+    assert tasks.enqueue_push([1], action="delete") is not None
+
+def test_starting_a_push_lets_edits_queue_again(debounce, queue, portal, make_user):
+    obj = AccessAssignment.objects.create(portal=portal, role=portal.roles.get(name="Read"), user=make_user("alice"))
+    tasks.enqueue_push([obj.pk])
+    assert tasks.enqueue_push([obj.pk]) is None
+
+    tasks.push_assignments([obj.pk], claimed=True)
+    assert tasks.enqueue_push([obj.pk]) is not None
+
+def test_other_pushes_leave_a_waiting_push_alone(debounce, queue, portal, make_user):
+    obj = AccessAssignment.objects.create(portal=portal, role=portal.roles.get(name="Read"), user=make_user("alice"))
+    tasks.enqueue_push([obj.pk])
+
+    # e.g. a retry or bulk API push of the same row
+    tasks.push_assignments([obj.pk])
+    assert tasks.enqueue_push([obj.pk]) is None
@@ -0,0 +1,122 @@
+"""Bulk CSV/JSON/YAML import of assignments and vendor roles."""
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from core.models import ObjectType
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from users.models import ObjectPermission
+
+from netbox_portal_access.imports import AccessAssignmentImporter, VendorRoleImporter, parse_records
+from netbox_portal_access.models import AccessAssignment, Portal, VendorRole
+
+@pytest.mark.parametrize("data, fmt", [
+    ("portal,name\nTest Portal,Ops\n", "auto"),
+    ('[{"portal": "Test Portal", "name": "Ops"}]', "auto"),
+    ('{"portal": "Test Portal", "name": "Ops"}', "json"),
+    ("- portal: Test Portal\n  name: Ops\n", "auto"),
+])
+def test_parse_records(data, fmt):
+    assert parse_records(data, fmt) == [{"portal": "Test Portal", "name": "Ops"}]
+
+@pytest.mark.parametrize("data, fmt", [("[{", "json"), ("[1, 2]", "json"), ("key: [", "yaml")])
+def test_parse_records_rejects_bad_input(data, fmt):
+    with pytest.raises(ValidationError):
+        parse_records(data, fmt)
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin", is_superuser=True)
+
+def test_imports_assignments(portal, admin, make_user):
+    alice = make_user("alice")
+    records = parse_records(
+        "portal,user,role,active,expires_on,username_on_portal\n"
+        f"{portal.pk},alice,admin,no,2030-01-31,alice@vendor\n"
+        "test portal,admin,Read,,,\n"
+    )
+    importer = AccessAssignmentImporter(records, admin)
+    created = importer.run()
+    assert importer.errors == []
+    assert len(created) == 2
+    row = AccessAssignment.objects.get(user=alice)
+    assert (row.role.name, row.active, str(row.expires_on), row.username_on_portal) == ("Admin", False, "2030-01-31", "alice@vendor")
+    assert row.needs_push
+
+def test_invalid_rows_import_nothing(portal, admin, make_user):
+    make_user("alice")
+    records = [
+        {"portal": portal.pk, "user": "alice", "role": "Admin"},
+        {"portal": portal.pk, "user": "nobody", "role": "Admin"},
+        {"portal": portal.pk, "user": "alice", "role": "Billing"},
+        {"portal": "Elsewhere", "user": "alice", "role": "Admin"},
+        {"portal": portal.pk, "user": "alice", "role": "Admin", "active": "maybe"},
+        {"portal": portal.pk, "user": "alice", "role": "Admin", "expires_on": "31/01/2030"},
+    ]
+    importer = AccessAssignmentImporter(records, admin)
+    assert importer.run() == []
+    assert [e.split(":")[0] for e in importer.errors] == ["Row 2", "Row 3", "Row 4", "Row 5", "Row 6"]
+    assert not AccessAssignment.objects.exists()
+
+def test_ambiguous_portal_name_needs_id(portal, admin):
+    Portal.objects.create(vendor_ct=portal.vendor_ct, vendor_id=portal.vendor_id + 1, name=portal.name)
+    importer = VendorRoleImporter([{"portal": portal.name, "name": "Ops", "category": "billing"}], admin)
+    assert importer.run() == []
+    assert "use the portal ID" in importer.errors[0]
+
+def test_imports_roles_and_rejects_duplicates(portal, admin):
+    records = [
+        {"portal": portal.pk, "name": "Ops", "category": "Ticketing"},
+        {"portal": portal.pk, "name": "Billing", "category": "BILLING", "description": "Invoices"},
+    ]
+    importer = VendorRoleImporter(records, admin)
+    assert len(importer.run()) == 2
+    assert VendorRole.objects.get(portal=portal, name="Billing").description == "Invoices"
+
+    importer = VendorRoleImporter([
+        {"portal": portal.pk, "name": "New", "category": "Reports"},
+        {"portal": portal.pk, "name": "New", "category": "Reports"},
+        {"portal": portal.pk, "name": "Admin", "category": "Reports"},
+    ], admin)
+    assert importer.run() == []
+    assert len(importer.errors) == 2
+    assert not VendorRole.objects.filter(name="New").exists()
+
+def grant(user, model, actions, constraints=None):
+    permission = ObjectPermission.objects.create(name=f"{model._meta.model_name} {actions}", actions=actions, constraints=constraints)
+    permission.object_types.add(ObjectType.objects.get_for_model(model))
+    permission.users.add(user)
+
+@pytest.fixture
+def operator(portal, make_user):
+    """A non-superuser who may view everything but only add assignments on "Allowed Portal"."""
+    user = make_user("operator")
+    for model in (Portal, VendorRole, get_user_model()):
+        grant(user, model, ["view"])
+    grant(user, AccessAssignment, ["view", "add"], constraints={"portal__name": "Allowed Portal"})
+    return get_user_model().objects.get(pk=user.pk)
+
+def test_add_constraints_roll_back_the_import(portal, operator):
+    allowed = Portal.objects.create(vendor_ct=portal.vendor_ct, vendor_id=portal.vendor_id, name="Allowed Portal")
+    VendorRole.objects.create(portal=allowed, name="Admin", category="PORTAL_ADMIN")
+    records = [
+        {"portal": allowed.pk, "user": "operator", "role": "Admin"},
+        {"portal": portal.pk, "user": "operator", "role": "Admin"},
+    ]
+    importer = AccessAssignmentImporter(records, operator)
+    assert importer.run() == []
+    assert "outside your permitted" in importer.errors[0]
+    assert not AccessAssignment.objects.exists()
+
+    importer = AccessAssignmentImporter(records[:1], operator)
+    assert len(importer.run()) == 1
+
+def test_lookups_only_see_viewable_objects(portal, make_user):
+    user = make_user("viewer")
+    grant(user, AccessAssignment, ["view", "add"])
+    user = get_user_model().objects.get(pk=user.pk)
+    importer = AccessAssignmentImporter([{"portal": portal.pk, "user": "viewer", "role": "Admin"}], user)
+    assert importer.run() == []
+    assert "not found" in importer.errors[0]
@@ -0,0 +1,68 @@
+"""Prometheus push metrics, scrape-time gauges and the metrics endpoint."""
+from datetime import timedelta
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+prometheus_client = pytest.importorskip("prometheus_client")
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from netbox_portal_access import metrics
+from netbox_portal_access.models import AccessAssignment, Portal, VendorRole
+
+# Scraping the default registry runs PortalAccessCollector once it is registered
+pytestmark = pytest.mark.django_db
+
+def sample(name: str, **labels) -> float:
+    return prometheus_client.REGISTRY.get_sample_value(f"netbox_portal_access_{name}", labels) or 0.0
+
+def gauge(name: str) -> dict:
+    family = next(f for f in metrics.PortalAccessCollector().collect() if f.name == f"netbox_portal_access_{name}")
+    return {(s.labels["portal_id"], s.labels["portal"]): s.value for s in family.samples}
+
+def test_observe_push_counts_and_times():
+    labels = {"adapter": "test-metrics", "action": "upsert"}
+    pushes = sample("pushes_total", outcome="SUCCESS", **labels)
+    timed = sample("push_duration_seconds_count", **labels)
+    seconds = sample("push_duration_seconds_sum", **labels)
+
+    metrics.observe_push("test-metrics", "upsert", "SUCCESS", 250)
+    metrics.observe_push("test-metrics", "upsert", "SUCCESS", None)
+    assert sample("pushes_total", outcome="SUCCESS", **labels) == pushes + 2
+    assert sample("push_duration_seconds_count", **labels) == timed + 1
+    assert sample("push_duration_seconds_sum", **labels) == pytest.approx(seconds + 0.25)
+
+def test_collector_reports_unpushed_and_retrying_assignments(portal, make_user):
+    role = portal.roles.get(name="Read")
+    _, b, c = (AccessAssignment.objects.create(portal=portal, role=role, user=make_user(name)) for name in "abc")
+    AccessAssignment.objects.filter(pk=b.pk).update(next_retry_at=timezone.now() + timedelta(minutes=5))
+    AccessAssignment.objects.filter(pk=c.pk).update(needs_push=False)
+
+    key = (str(portal.pk), "Test Portal")
+    assert gauge("needs_push") == {key: 2}
+    assert gauge("retry_pending") == {key: 1}
+
+def test_portals_sharing_a_name_are_reported_separately(portal, make_user):
+    from circuits.models import Provider
+
+    provider = Provider.objects.create(name="Other Provider", slug="other-provider")
+    twin = Portal.objects.create(vendor_ct=portal.vendor_ct, vendor_id=provider.pk, name=portal.name)
+    twin_role = VendorRole.objects.create(portal=twin, name="Read", category="READ_ONLY")
+    AccessAssignment.objects.create(portal=portal, role=portal.roles.get(name="Read"), user=make_user("a"))
+    AccessAssignment.objects.create(portal=twin, role=twin_role, user=make_user("b"))
+
+    assert gauge("needs_push") == {(str(portal.pk), "Test Portal"): 1, (str(twin.pk), "Test Portal"): 1}
+
+def test_metrics_endpoint_needs_view_permission(make_user):
+    url = reverse("plugins-api:netbox_portal_access-api:metrics")
+    client = APIClient()
+    client.force_authenticate(make_user("viewer"))
+    assert client.get(url).status_code == 403
+
+    client.force_authenticate(make_user("admin", is_superuser=True))
+    response = client.get(url)
+    assert response.status_code == 200
+    assert b"netbox_portal_access_pushes_total" in response.content
@@ -0,0 +1,35 @@
+"""Data migrations."""
+from datetime import timedelta
+from importlib import import_module
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from django.apps import apps
+from django.utils import timezone
+
+from netbox_portal_access.models import AccessAssignment
+
+def test_needs_push_backfill(portal, make_user):
+    migration = import_module("netbox_portal_access.migrations.0005_accessassignment_needs_push")
+    pushed_at = timezone.now() - timedelta(days=1)
+    rows = {}
+    for name, status, updated in (
+        ("pushed", "SUCCESS", pushed_at + timedelta(seconds=1)),  # save() right after the push
+        ("edited", "SUCCESS", pushed_at + timedelta(hours=1)),
+        ("failed", "FAILED", pushed_at),
+        ("never", None, pushed_at),
+    ):
+        obj = AccessAssignment.objects.create(portal=portal, role=portal.roles.get(name="Read"), user=make_user(name))
+        AccessAssignment.objects.filter(pk=obj.pk).update(
+            needs_push=True, last_push_status=status, last_updated=updated,
+            last_push_at=pushed_at if status else None,
+        )
+        rows[name] = obj.pk
+
+    migration.populate_needs_push(apps, None)
+    needs_push = dict(AccessAssignment.objects.values_list("pk", "needs_push"))
+    assert {name: needs_push[pk] for name, pk in rows.items()} == {
+        "pushed": False, "edited": True, "failed": True, "never": True,
+    }
@@ -0,0 +1,47 @@
+"""Bookkeeping the models do on save."""
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from django.utils import timezone
+
+from netbox_portal_access.models import AccessAssignment, PortalCredential
+
+@pytest.fixture
+def assignment(portal, make_user):
+    """An assignment that is in sync with the vendor."""
+    obj = AccessAssignment.objects.create(portal=portal, role=portal.roles.get(name="Read"), user=make_user("alice"))
+    AccessAssignment.objects.filter(pk=obj.pk).update(needs_push=False)
+    return AccessAssignment.objects.get(pk=obj.pk)
+
+def test_save_flags_needs_push(assignment):
+    assignment.notes = "Moved to the NOC team"
+    assignment.save()
+    assert AccessAssignment.objects.get(pk=assignment.pk).needs_push
+
+def test_save_with_update_fields_flags_needs_push(assignment):
+    assignment.active = False
+    assignment.save(update_fields=["active"])
+    assert AccessAssignment.objects.get(pk=assignment.pk).needs_push
+
+@pytest.mark.parametrize("update_fields", [None, ["notes"]])
+def test_save_resets_push_retries(assignment, update_fields):
+    AccessAssignment.objects.filter(pk=assignment.pk).update(
+        last_push_status="FAILED", push_attempts=5, next_retry_at=timezone.now(),
+    )
+    assignment = AccessAssignment.objects.get(pk=assignment.pk)
+    assignment.notes = "Fixed the username"
+    assignment.save(update_fields=update_fields)
+
+    saved = AccessAssignment.objects.get(pk=assignment.pk)
+    assert (saved.needs_push, saved.push_attempts, saved.next_retry_at) == (True, 0, None)
+
+def test_credential_test_result_skips_save(portal):
+    cred = PortalCredential.objects.create(portal=portal, data_encrypted="")
+    before = PortalCredential.objects.get(pk=cred.pk).last_updated
+
+    cred.record_test(False, "Connection refused")
+    cred = PortalCredential.objects.get(pk=cred.pk)
+    assert (cred.last_test_status, cred.last_test_message) == ("Failed", "Connection refused")
+    assert cred.last_updated == before
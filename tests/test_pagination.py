@@ -0,0 +1,62 @@
+"""Keyset (?after=<id>) pagination on the REST API."""
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from netbox_portal_access.api.pagination import KeysetPagination
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def users(make_user):
+    return [make_user(f"keyset-{i}").pk for i in range(5)]
+
+def queryset():
+    # Deliberately not ordered by id: keyset pages must re-order
+    return get_user_model().objects.filter(username__startswith="keyset-").order_by("-username")
+
+def page(params: dict):
+    paginator = KeysetPagination()
+    request = Request(APIRequestFactory().get("/api/plugins/portal-access/assignments/", params))
+    rows = paginator.paginate_queryset(queryset(), request)
+    return [row.pk for row in rows], paginator.get_paginated_response([]).data
+
+def test_pages_follow_next_until_exhausted(users):
+    ids, data = page({"after": 0, "limit": 2})
+    assert ids == users[:2]
+    assert "count" not in data and data["previous"] is None
+    assert f"after={users[1]}" in data["next"]
+    assert "limit=2" in data["next"]
+
+    ids, data = page({"after": users[1], "limit": 2})
+    assert ids == users[2:4]
+
+    ids, data = page({"after": users[3], "limit": 2})
+    assert ids == users[4:]
+    assert data["next"] is None
+
+def test_exact_last_page_has_no_next(users):
+    ids, data = page({"after": users[0], "limit": 4})
+    assert ids == users[1:]
+    assert data["next"] is None
+
+def test_after_last_id_is_empty(users):
+    ids, data = page({"after": users[-1], "limit": 2})
+    assert ids == []
+    assert data["next"] is None
+
+def test_invalid_after_is_rejected(users):
+    with pytest.raises(ValidationError):
+        page({"after": "abc"})
+
+def test_without_after_falls_back_to_limit_offset(users):
+    ids, data = page({"limit": 2, "offset": 1})
+    assert len(ids) == 2
+    assert data["count"] == len(users)
+    assert "offset=3" in data["next"]
@@ -0,0 +1,72 @@
+"""Cached access panels and their invalidation from signals."""
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from netbox_portal_access.models import AccessAssignment
+from netbox_portal_access.panels import get_or_render
+
+VIEWER = SimpleNamespace(pk=1)
+
+class Panels:
+    """Shows panels through the fragment cache, noting which ones had to be rendered."""
+
+    def __init__(self):
+        self.rendered = []
+
+    def show(self, object_type: str, pk, viewer=VIEWER):
+        def render():
+            self.rendered.append((object_type, pk))
+            return f"{object_type}:{pk}"
+        return get_or_render(object_type, pk, viewer, render)
+
+@pytest.fixture
+def panels(locmem_cache):
+    return Panels()
+
+@pytest.fixture
+def assignment(portal, make_user):
+    return AccessAssignment.objects.create(portal=portal, role=portal.roles.get(name="Read"), user=make_user("alice"))
+
+def test_fragments_are_cached_per_viewer(panels):
+    assert panels.show("tenancy.tenant", 1) == "tenancy.tenant:1"
+    panels.show("tenancy.tenant", 1)
+    assert panels.rendered == [("tenancy.tenant", 1)]
+
+    # Counts are permission-filtered, so another viewer never sees this copy
+    panels.show("tenancy.tenant", 1, SimpleNamespace(pk=2))
+    assert len(panels.rendered) == 2
+
+def test_assignment_changes_refresh_portal_vendor_and_user_panels(portal, assignment, panels):
+    affected = [
+        ("netbox_portal_access.portal", portal.pk),
+        ("circuits.provider", portal.vendor_id),
+        ("users.user", assignment.user_id),
+    ]
+    shown = [*affected, ("tenancy.tenant", 1)]
+    for key in shown:
+        panels.show(*key)
+
+    for change in (lambda: assignment.save(), lambda: assignment.delete()):
+        panels.rendered.clear()
+        change()
+        for key in shown:
+            panels.show(*key)
+        assert panels.rendered == affected
+
+def test_moving_an_assignment_refreshes_the_old_owner(assignment, make_user, panels):
+    old_owner = ("users.user", assignment.user_id)
+    panels.show(*old_owner)
+
+    assignment.user = make_user("bob")
+    assignment.save()
+    panels.show(*old_owner)
+    assert panels.rendered == [old_owner, old_owner]
+
+def test_portal_changes_refresh_every_panel(portal, panels):
+    panels.show("tenancy.tenant", 1)
+    portal.save()
+    panels.show("tenancy.tenant", 1)
+    assert len(panels.rendered) == 2
@@ -0,0 +1,67 @@
+"""Opt-in request profiling middleware and the profiling page."""
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from netbox_portal_access import profiling
+from netbox_portal_access.models import Portal
+
+@pytest.fixture
+def enabled(plugin_settings, locmem_cache):
+    plugin_settings(profiling=True, profiling_history=10)
+
+def run(view, path: str = "/plugins/portal-access/portals/"):
+    """Send one request through the middleware to ``view``."""
+    return profiling.ProfilingMiddleware(lambda request: view())(RequestFactory().get(path))
+
+def test_middleware_is_removed_when_disabled(plugin_settings):
+    plugin_settings(profiling=False)
+    with pytest.raises(MiddlewareNotUsed):
+        profiling.ProfilingMiddleware(lambda request: HttpResponse())
+
+def test_spans_are_reported_and_kept(enabled):
+    def view():
+        with profiling.span("adapter", "VendorAdapter.upsert_access"):
+            pass
+        return HttpResponse()
+
+    response = run(view)
+    assert "pa-adapter;dur=" in response["Server-Timing"]
+    assert "adapter_ms=" in response["X-Portal-Access-Profile"]
+    [summary] = profiling.history()
+    assert summary["path"] == "/plugins/portal-access/portals/"
+    assert summary["span_counts"] == {"adapter:VendorAdapter.upsert_access": 1}
+
+def test_requests_without_plugin_code_are_not_reported(enabled):
+    response = run(HttpResponse, "/dcim/sites/")
+    assert not response.has_header("Server-Timing")
+    assert profiling.history() == []
+
+@pytest.mark.django_db
+def test_queries_are_grouped_by_shape_without_parameters(enabled):
+    def view():
+        with profiling.span("panel", "AccessPanel"):
+            for name in ("s3cret-1", "s3cret-2", "s3cret-3"):
+                list(Portal.objects.filter(name=name))
+        return HttpResponse()
+
+    run(view)
+    [summary] = profiling.history()
+    assert summary["duplicate_queries"] == 2
+    assert summary["duplicates"][0]["count"] == 3
+    assert "s3cret" not in str(summary)
+
+@pytest.mark.django_db
+def test_profiling_page_is_superuser_only(client, enabled, make_user):
+    url = reverse("plugins:netbox_portal_access:profiling")
+    client.force_login(make_user("staff", is_staff=True))
+    assert client.get(url).status_code == 403
+
+    client.force_login(make_user("admin", is_superuser=True))
+    assert client.get(url).status_code == 200
@@ -0,0 +1,74 @@
+"""prune_push_attempts retention and daily rollups."""
+from datetime import timedelta
+from io import StringIO
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from netbox_portal_access.models import PushAttempt, PushAttemptRollup
+
+def attempt(portal, days_ago: int, outcome: str = "SUCCESS", duration_ms: int = 100) -> PushAttempt:
+    return PushAttempt.objects.create(
+        portal=portal, action="upsert", adapter="test", outcome=outcome, duration_ms=duration_ms,
+        started_at=timezone.now() - timedelta(days=days_ago),
+    )
+
+def prune(**options) -> str:
+    out = StringIO()
+    call_command("prune_push_attempts", stdout=out, **options)
+    return out.getvalue()
+
+def test_prunes_only_attempts_past_retention(portal):
+    attempt(portal, 40)
+    attempt(portal, 35)
+    recent = attempt(portal, 1)
+
+    assert "Deleted 2 push attempt(s)" in prune(days=30, chunk_size=1)
+    assert list(PushAttempt.objects.values_list("pk", flat=True)) == [recent.pk]
+    assert not PushAttemptRollup.objects.exists()
+
+def test_rollup_keeps_daily_counts(portal):
+    first = attempt(portal, 40, duration_ms=100)
+    attempt(portal, 40, duration_ms=200)
+    attempt(portal, 40, outcome="FAILED", duration_ms=None)
+    day = timezone.localdate(first.started_at)
+
+    prune(days=30, rollup=True)
+    counts = {r.outcome: (r.attempts, r.total_duration_ms) for r in PushAttemptRollup.objects.filter(day=day)}
+    assert counts == {"SUCCESS": (2, 300), "FAILED": (1, 0)}
+    assert not PushAttempt.objects.exists()
+
+    # A later run merges into the existing rollup rather than adding a row
+    attempt(portal, 40, duration_ms=50)
+    prune(days=30, rollup=True)
+    rollup = PushAttemptRollup.objects.get(day=day, outcome="SUCCESS")
+    assert (rollup.attempts, rollup.total_duration_ms) == (3, 350)
+
+def test_days_must_be_positive(db):
+    with pytest.raises(CommandError):
+        prune(days=0)
+
+def test_failed_rollup_keeps_that_days_attempts(portal, monkeypatch):
+    from netbox_portal_access.management.commands.prune_push_attempts import Command
+
+    rolled = attempt(portal, 41)
+    kept = attempt(portal, 40)
+    rollup = Command._rollup
+    calls = []
+
+    def rollup_once(self, qs):
+        calls.append(qs)
+        if len(calls) > 1:
+            raise RuntimeError("rollup failed")
+        return rollup(self, qs)
+    monkeypatch.setattr(Command, "_rollup", rollup_once)
+
+    with pytest.raises(RuntimeError):
+        prune(days=30, rollup=True)
+    # The first day committed; the failed day keeps its raw rows and has no rollup
+    assert list(PushAttempt.objects.values_list("pk", flat=True)) == [kept.pk]
+    assert list(PushAttemptRollup.objects.values_list("day", flat=True)) == [timezone.localdate(rolled.started_at)]
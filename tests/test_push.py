@@ -0,0 +1,193 @@
+"""Batched per-portal pushes and the status write-back."""
+import threading
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from netbox_portal_access import tasks
+from netbox_portal_access.adapters import BaseAdapter, register
+from netbox_portal_access.models import AccessAssignment, Portal, PushAttempt, VendorRole
+
+pytestmark = pytest.mark.django_db
+
+# Vendor calls made by the adapters below, in order
+calls = []
+
+@register("test-single", "Test (per item)")
+class SingleAdapter(BaseAdapter):
+    """Pushes one assignment per call; usernames starting with "reject" fail."""
+
+    def upsert_access(self, assignment):
+        calls.append(("upsert", assignment.pk))
+        if assignment.username_on_portal.startswith("reject"):
+            return False, "Rejected by vendor", None
+        return True, "OK", f"r{assignment.pk}"
+
+@register("test-batch", "Test (batched)")
+class BatchAdapter(BaseAdapter):
+    def push_many(self, assignments, action="upsert"):
+        calls.append(("push_many", [a.pk for a in assignments]))
+        return [(True, "OK", f"b{a.pk}") for a in assignments]
+
+@register("test-short", "Test (short batch)")
+class ShortBatchAdapter(BaseAdapter):
+    def push_many(self, assignments, action="upsert"):
+        return [(True, "OK", None)] * (len(assignments) - 1)
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+@pytest.fixture
+def assign(make_user):
+    def create(portal, username: str) -> AccessAssignment:
+        return AccessAssignment.objects.create(
+            portal=portal,
+            role=portal.roles.get(name="Read"),
+            user=make_user(username),
+            username_on_portal=username,
+        )
+    return create
+
+def use_adapter(portal, slug: str) -> None:
+    Portal.objects.filter(pk=portal.pk).update(adapter=slug)
+
+def other_portal(portal, name: str, adapter: str) -> Portal:
+    other = Portal.objects.create(vendor_ct=portal.vendor_ct, vendor_id=portal.vendor_id, name=name, adapter=adapter)
+    VendorRole.objects.create(portal=other, name="Read", category="READ_ONLY")
+    return other
+
+def fresh(obj) -> AccessAssignment:
+    return AccessAssignment.objects.get(pk=obj.pk)
+
+def test_batching_adapter_gets_one_call_per_portal(portal, assign):
+    use_adapter(portal, "test-batch")
+    other = other_portal(portal, "Other Portal", "test-batch")
+    a, b = assign(portal, "alice"), assign(portal, "bob")
+    c = assign(other, "carol")
+
+    summary = tasks.push_assignments([a.pk, b.pk, c.pk])
+    assert calls == [("push_many", [a.pk, b.pk]), ("push_many", [c.pk])]
+    assert (summary["total"], summary["succeeded"], summary["failed"]) == (3, 3, 0)
+    assert fresh(a).remote_id == f"b{a.pk}"
+    assert fresh(c).last_push_status == "SUCCESS"
+
+def test_falls_back_to_one_call_per_assignment(portal, assign):
+    use_adapter(portal, "test-single")
+    a, b = assign(portal, "alice"), assign(portal, "reject-bob")
+
+    summary = tasks.push_assignments([a.pk, b.pk])
+    assert calls == [("upsert", a.pk), ("upsert", b.pk)]
+    assert (summary["succeeded"], summary["failed"]) == (1, 1)
+    assert (fresh(a).last_push_status, fresh(a).remote_id) == ("SUCCESS", f"r{a.pk}")
+    assert (fresh(b).last_push_status, fresh(b).last_push_message) == ("FAILED", "Rejected by vendor")
+
+def test_short_batch_fails_every_assignment(portal, assign):
+    use_adapter(portal, "test-short")
+    a, b = assign(portal, "alice"), assign(portal, "bob")
+
+    assert tasks.push_assignments([a.pk, b.pk])["failed"] == 2
+    assert fresh(a).last_push_message == "Adapter returned 1 results for 2 assignments."
+
+def test_portal_without_adapter_fails_its_assignments(portal, assign):
+    a = assign(portal, "alice")
+    assert tasks.push_assignments([a.pk])["failed"] == 1
+    assert fresh(a).last_push_message == "No adapter configured on portal."
+
+def test_without_ids_only_unpushed_assignments_are_sent(portal, assign):
+    use_adapter(portal, "test-single")
+    a, b = assign(portal, "alice"), assign(portal, "bob")
+    tasks.push_assignments([a.pk])
+    calls.clear()
+
+    tasks.push_assignments()
+    assert calls == [("upsert", b.pk)]
+
+def test_write_back_clears_needs_push_only_on_success(portal, assign):
+    use_adapter(portal, "test-single")
+    a, b = assign(portal, "alice"), assign(portal, "reject-bob")
+    assert fresh(a).needs_push and fresh(b).needs_push
+
+    tasks.push_assignments([a.pk, b.pk])
+    assert not fresh(a).needs_push
+    assert fresh(b).needs_push
+
+def test_edits_during_a_push_still_need_pushing(portal, assign, monkeypatch):
+    use_adapter(portal, "test-single")
+    a = assign(portal, "alice")
+
+    def upsert_while_edited(adapter, assignment):
+        # Someone saves the assignment while the vendor call is in flight
+        AccessAssignment.objects.get(pk=assignment.pk).save()
+        return True, "OK", None
+    monkeypatch.setattr(SingleAdapter, "upsert_access", upsert_while_edited)
+
+    tasks.push_assignments([a.pk])
+    assert fresh(a).last_push_status == "SUCCESS"
+    assert fresh(a).needs_push
+
+def test_write_back_leaves_last_updated_alone(portal, assign):
+    use_adapter(portal, "test-single")
+    a = assign(portal, "alice")
+    before = fresh(a).last_updated
+
+    tasks.push_assignments([a.pk])
+    assert fresh(a).last_push_status == "SUCCESS"
+    assert fresh(a).last_updated == before
+
+def test_status_writes_can_be_audited(portal, assign, plugin_settings, caplog):
+    plugin_settings(audit_status_writes=True)
+    use_adapter(portal, "test-single")
+    a = assign(portal, "alice")
+
+    with caplog.at_level("INFO", logger="netbox.plugins.netbox_portal_access.audit"):
+        tasks.push_assignments([a.pk])
+    assert f"accessassignment {a.pk} action=upsert status=SUCCESS" in caplog.text
+
+def test_summary_lists_each_result(portal, assign):
+    use_adapter(portal, "test-single")
+    a, b = assign(portal, "alice"), assign(portal, "reject-bob")
+
+    assert tasks.push_assignments([a.pk, b.pk])["results"] == [
+        {"id": a.pk, "ok": True, "message": "OK", "remote_id": f"r{a.pk}"},
+        {"id": b.pk, "ok": False, "message": "Rejected by vendor", "remote_id": None},
+    ]
+
+def test_each_push_is_logged(portal, assign):
+    use_adapter(portal, "test-single")
+    a, b = assign(portal, "alice"), assign(portal, "reject-bob")
+
+    tasks.push_assignments([a.pk, b.pk])
+    logged = {attempt.assignment_id: attempt for attempt in PushAttempt.objects.all()}
+    assert sorted(logged) == [a.pk, b.pk]
+    assert (logged[a.pk].portal_id, logged[a.pk].adapter, logged[a.pk].action) == (portal.pk, "test-single", "upsert")
+    assert (logged[a.pk].outcome, logged[b.pk].outcome) == ("SUCCESS", "FAILED")
+    assert logged[b.pk].message == "Rejected by vendor"
+    assert logged[a.pk].duration_ms is not None
+
+def test_concurrent_portals_get_the_async_job(portal, assign):
+    a = assign(portal, "alice")
+    Portal.objects.filter(pk=portal.pk).update(push_concurrency=1)
+    assert tasks.push_job([a.pk]) is tasks.push_assignments
+
+    Portal.objects.filter(pk=portal.pk).update(push_concurrency=2)
+    assert tasks.push_job([a.pk]) is tasks.push_assignments_async
+
+def test_async_push_runs_on_the_portals_own_pool(portal, assign, monkeypatch):
+    use_adapter(portal, "test-single")
+    Portal.objects.filter(pk=portal.pk).update(push_concurrency=2)
+    objs = [assign(portal, name) for name in ("alice", "bob", "reject-carol")]
+    threads = set()
+    upsert_access = SingleAdapter.upsert_access
+
+    def upsert_noting_thread(adapter, assignment):
+        threads.add(threading.current_thread().name)
+        return upsert_access(adapter, assignment)
+    monkeypatch.setattr(SingleAdapter, "upsert_access", upsert_noting_thread)
+
+    summary = tasks.push_assignments_async([obj.pk for obj in objs])
+    assert (summary["succeeded"], summary["failed"]) == (2, 1)
+    assert sorted(calls) == sorted(("upsert", obj.pk) for obj in objs)
+    assert threads and all(name.startswith(f"portal-push-{portal.pk}") for name in threads)
+    assert len(threads) <= 2
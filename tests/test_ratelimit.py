@@ -0,0 +1,97 @@
+"""Token bucket rate limiter and the adapter's use of it."""
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from netbox_portal_access import ratelimit
+from netbox_portal_access.adapters import BaseAdapter
+from netbox_portal_access.ratelimit import LocalTokenBucket, RateLimited, acquire
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(ratelimit.time, "sleep", clock.sleep)
+    return clock
+
+def test_bucket_allows_burst_then_waits(clock):
+    bucket = LocalTokenBucket()
+    assert [bucket.take("k", rate=1.0, capacity=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take("k", rate=1.0, capacity=3) == pytest.approx(1.0)
+
+def test_bucket_refills_at_rate(clock):
+    bucket = LocalTokenBucket()
+    for _ in range(2):
+        bucket.take("k", rate=2.0, capacity=2)
+    clock.now += 0.5
+    assert bucket.take("k", rate=2.0, capacity=2) == 0.0
+    assert bucket.take("k", rate=2.0, capacity=2) == pytest.approx(0.5)
+
+def test_bucket_never_exceeds_capacity(clock):
+    bucket = LocalTokenBucket()
+    bucket.take("k", rate=1.0, capacity=2)
+    clock.now += 3600
+    assert [bucket.take("k", rate=1.0, capacity=2) for _ in range(3)][-1] > 0
+
+def test_bucket_keys_are_independent(clock):
+    bucket = LocalTokenBucket()
+    bucket.take("a", rate=1.0, capacity=1)
+    assert bucket.take("a", rate=1.0, capacity=1) > 0
+    assert bucket.take("b", rate=1.0, capacity=1) == 0.0
+
+def test_acquire_waits_for_a_token(clock):
+    bucket = LocalTokenBucket()
+    acquire("k", per_minute=60, burst=1, max_wait=5, bucket=bucket)
+    acquire("k", per_minute=60, burst=1, max_wait=5, bucket=bucket)
+    assert clock.now == pytest.approx(1001.0)
+
+def test_acquire_raises_past_max_wait(clock):
+    bucket = LocalTokenBucket()
+    acquire("k", per_minute=6, burst=1, max_wait=1, bucket=bucket)
+    with pytest.raises(RateLimited) as exc:
+        acquire("k", per_minute=6, burst=1, max_wait=1, bucket=bucket)
+    assert exc.value.key == "k"
+    assert exc.value.retry_after == pytest.approx(10.0)
+    assert clock.now == 1000.0
+
+def test_default_burst_is_a_tenth_of_the_rate(clock):
+    bucket = LocalTokenBucket()
+    for _ in range(6):
+        acquire("k", per_minute=60, max_wait=0, bucket=bucket)
+    with pytest.raises(RateLimited):
+        acquire("k", per_minute=60, max_wait=0, bucket=bucket)
+
+class LimitedAdapter(BaseAdapter):
+    slug = "test-limited"
+
+def make_adapter(rate_limit_per_minute=None):
+    portal = SimpleNamespace(pk=1, base_url="", rate_limit_per_minute=rate_limit_per_minute, push_concurrency=1)
+    return LimitedAdapter(portal, {})
+
+def test_session_retries_statuses_without_rate_limit():
+    retry = make_adapter().build_session().get_adapter("https://").max_retries
+    assert set(retry.status_forcelist) == set(BaseAdapter.retry_statuses)
+
+def test_session_skips_status_retries_under_rate_limit():
+    # urllib3 re-sends would bypass throttle()
+    retry = make_adapter(rate_limit_per_minute=60).build_session().get_adapter("https://").max_retries
+    assert not retry.status_forcelist
+    assert retry.read == 0
+
+def test_throttle_uses_portal_limit(monkeypatch):
+    calls = []
+    monkeypatch.setattr("netbox_portal_access.adapters.acquire", lambda *args: calls.append(args))
+    make_adapter(rate_limit_per_minute=120).throttle()
+    assert calls == [("portal:1", 120)]
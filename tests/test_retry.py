@@ -0,0 +1,78 @@
+"""Backoff schedule and re-enqueueing of FAILED pushes."""
+from datetime import timedelta
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from django.utils import timezone
+
+from netbox_portal_access import tasks
+from netbox_portal_access.models import AccessAssignment
+
+@pytest.fixture
+def backoff(plugin_settings):
+    plugin_settings(push_retry_base_seconds=60, push_retry_max_seconds=3600)
+
+@pytest.mark.parametrize("attempts, low, high", [
+    (0, 30, 60),
+    (1, 30, 60),
+    (2, 60, 120),
+    (4, 240, 480),
+    (7, 1800, 3600),   # 3840 is capped
+    (50, 1800, 3600),
+])
+def test_retry_delay_doubles_with_jitter_and_cap(backoff, attempts, low, high):
+    delays = [tasks.retry_delay(attempts).total_seconds() for _ in range(200)]
+    assert all(low <= d <= high for d in delays)
+    assert len(set(delays)) > 1
+
+def failed(portal, user, action: str, due: bool = True) -> AccessAssignment:
+    obj = AccessAssignment.objects.create(portal=portal, role=portal.roles.get(name="Read"), user=user)
+    retry_at = timezone.now() + timedelta(minutes=-1 if due else 10)
+    AccessAssignment.objects.filter(pk=obj.pk).update(
+        last_push_status="FAILED", last_push_action=action, next_retry_at=retry_at,
+    )
+    return obj
+
+def test_retries_keep_the_failed_action(portal, make_user, queue, backoff):
+    delete = failed(portal, make_user("a"), "delete")
+    deactivate = failed(portal, make_user("b"), "deactivate")
+    upsert = failed(portal, make_user("c"), "upsert")
+    legacy = failed(portal, make_user("d"), "")
+    failed(portal, make_user("e"), "upsert", due=False)
+
+    assert tasks.retry_failed_pushes() == 4
+    enqueued = {job.kwargs["action"]: set(job.kwargs["assignment_ids"]) for job in queue.jobs}
+    assert enqueued == {
+        "delete": {delete.pk},
+        "deactivate": {deactivate.pk},
+        "upsert": {upsert.pk, legacy.pk},
+    }
+    assert all(job.func is tasks.push_assignments_async for job in queue.jobs)
+
+def test_claimed_rows_are_not_enqueued_twice(portal, make_user, queue, backoff):
+    obj = failed(portal, make_user("a"), "upsert")
+    assert tasks.retry_failed_pushes() == 1
+    assert tasks.retry_failed_pushes() == 0
+    obj.refresh_from_db()
+    assert obj.next_retry_at > timezone.now() + timedelta(minutes=59)
+
+def test_batches_split_per_action(portal, make_user, queue, backoff):
+    for i in range(5):
+        failed(portal, make_user(f"u{i}"), "update")
+    tasks.retry_failed_pushes(batch_size=2)
+    assert [len(job.kwargs["assignment_ids"]) for job in queue.jobs] == [2, 2, 1]
+
+def test_failures_back_off_until_attempts_run_out(portal, make_user, backoff, plugin_settings):
+    plugin_settings(push_retry_max_attempts=2)
+    obj = AccessAssignment.objects.create(portal=portal, role=portal.roles.get(name="Read"), user=make_user("a"))
+
+    for attempts, retried in ((1, True), (2, False)):
+        tasks._record_results([(obj, (False, "HTTP 503", None))], timezone.now(), "upsert")
+        obj.refresh_from_db()
+        assert (obj.push_attempts, obj.next_retry_at is not None) == (attempts, retried)
+
+    tasks._record_results([(obj, (True, "OK", None))], timezone.now(), "upsert")
+    obj.refresh_from_db()
+    assert (obj.push_attempts, obj.next_retry_at) == (0, None)
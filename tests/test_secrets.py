@@ -0,0 +1,80 @@
+"""Credential encryption and Fernet key rotation."""
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from cryptography.fernet import Fernet
+
+from netbox_portal_access.secrets import DecryptionError, decrypt_json, encrypt_json, get_fernet, rotate_token
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+DATA = {"username": "api", "password": "s3cret"}
+
+@pytest.fixture
+def keys(plugin_settings):
+    def configure(primary, old=()):
+        plugin_settings(fernet_key=primary, fernet_old_keys=list(old))
+    return configure
+
+def test_round_trip(keys):
+    keys(NEW_KEY)
+    token = encrypt_json(DATA)
+    assert "s3cret" not in token
+    assert decrypt_json(token) == DATA
+
+def test_empty_token_decrypts_to_empty_dict(keys):
+    keys(NEW_KEY)
+    assert decrypt_json("") == {}
+    assert decrypt_json(None) == {}
+
+def test_retired_key_still_decrypts(keys):
+    keys(OLD_KEY)
+    token = encrypt_json(DATA)
+    keys(NEW_KEY, old=[OLD_KEY])
+    assert decrypt_json(token) == DATA
+
+def test_rotate_moves_token_to_primary_key(keys):
+    keys(OLD_KEY)
+    token = encrypt_json(DATA)
+    keys(NEW_KEY, old=[OLD_KEY])
+    rotated = rotate_token(token)
+    # Once the old key is dropped only the rotated token still decrypts
+    keys(NEW_KEY)
+    assert decrypt_json(rotated) == DATA
+    with pytest.raises(DecryptionError):
+        decrypt_json(token)
+
+def test_new_tokens_use_primary_key(keys):
+    keys(NEW_KEY, old=[OLD_KEY])
+    token = encrypt_json(DATA)
+    keys(NEW_KEY)
+    assert decrypt_json(token) == DATA
+
+def test_unknown_key_raises(keys):
+    keys(OLD_KEY)
+    token = encrypt_json(DATA)
+    keys(NEW_KEY)
+    with pytest.raises(DecryptionError):
+        decrypt_json(token)
+    with pytest.raises(DecryptionError):
+        rotate_token(token)
+
+def test_non_json_payload_raises(keys):
+    keys(NEW_KEY)
+    token = Fernet(NEW_KEY.encode()).encrypt(b"not json").decode()
+    with pytest.raises(DecryptionError):
+        decrypt_json(token)
+
+def test_cipher_is_cached_per_key_set(keys):
+    keys(NEW_KEY, old=[OLD_KEY])
+    cipher = get_fernet()
+    assert get_fernet() is cipher
+    keys(NEW_KEY)
+    assert get_fernet() is not cipher
+
+def test_missing_key_raises(keys):
+    keys(None)
+    with pytest.raises(RuntimeError):
+        encrypt_json(DATA)
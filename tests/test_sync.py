@@ -0,0 +1,215 @@
+"""Vendor reconciliation (full and incremental)."""
+import pytest
+
+pytest.importorskip("netbox")
+pytest.importorskip("pytest_django")
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from netbox_portal_access import tasks
+from netbox_portal_access.adapters import BaseAdapter, register
+from netbox_portal_access.models import AccessAssignment, Portal, VendorRole
+from netbox_portal_access.ratelimit import RateLimited
+from netbox_portal_access.sync import Reconciler, reconcile
+
+pytestmark = pytest.mark.django_db
+
+# Vendor reads made by the adapters below
+reads = []
+
+@register("test-feed", "Test (change feed)")
+class FeedAdapter(BaseAdapter):
+    def list_accesses(self):
+        reads.append("full")
+        yield {"remote_id": "r1", "username": "alice", "role": "Admin"}
+
+    def list_changes(self, cursor=None, since=None):
+        reads.append(("changes", cursor))
+        yield [{"remote_id": "r1", "username": "alice", "role": "Admin"}], "c2"
+
+@register("test-list", "Test (full list only)")
+class ListAdapter(BaseAdapter):
+    def list_accesses(self):
+        reads.append("full")
+        return []
+
+@register("test-limited", "Test (rate limited)")
+class LimitedAdapter(BaseAdapter):
+    """Runs into the rate limiter: straight away on full reads, after one page of changes."""
+
+    def list_accesses(self):
+        raise RateLimited("portal:1", 12.0)
+
+    def list_changes(self, cursor=None, since=None):
+        yield [{"remote_id": "r1", "username": "alice", "role": "Admin"}], "c2"
+        raise RateLimited("portal:1", 12.0)
+
+@register("test-push-only", "Test (push only)")
+class PushOnlyAdapter(BaseAdapter):
+    pass
+
+@pytest.fixture(autouse=True)
+def clear_reads():
+    reads.clear()
+
+@pytest.fixture
+def roles(portal):
+    return dict(VendorRole.objects.filter(portal=portal).values_list("name", "pk"))
+
+@pytest.fixture
+def assign(portal, roles, make_user):
+    """Create an assignment that is in sync with the vendor (unless ``needs_push``)."""
+    def create(username, remote_id=None, role="Read", active=True, needs_push=False, username_on_portal=None):
+        obj = AccessAssignment.objects.create(
+            portal=portal,
+            user=make_user(username),
+            role_id=roles[role],
+            remote_id=remote_id,
+            username_on_portal=username if username_on_portal is None else username_on_portal,
+            active=active,
+        )
+        AccessAssignment.objects.filter(pk=obj.pk).update(needs_push=needs_push)
+        return obj
+    return create
+
+def fresh(obj) -> AccessAssignment:
+    return AccessAssignment.objects.get(pk=obj.pk)
+
+def test_updates_matched_rows_by_remote_id(portal, roles, assign):
+    a = assign("alice", remote_id="r1")
+    b = assign("bob", remote_id="r2")
+    stats = reconcile(portal, [
+        {"remote_id": "r1", "username": "alice", "role": "Admin"},
+        {"remote_id": "r2", "username": "bob", "role": "Read"},
+    ])
+    assert stats["updated"] == 1
+    assert fresh(a).role_id == roles["Admin"]
+    assert fresh(b).role_id == roles["Read"]
+    assert not fresh(a).needs_push
+
+def test_links_unlinked_rows_by_username(portal, assign):
+    a = assign("alice", username_on_portal="Alice")
+    reconcile(portal, [{"remote_id": 17, "username": "alice", "role": "Read"}])
+    assert fresh(a).remote_id == "17"
+
+def test_username_never_repoints_a_linked_row(portal, assign):
+    a = assign("alice", remote_id="r1")
+    stats = reconcile(portal, [{"remote_id": "r2", "username": "alice", "role": "Read"}])
+    assert fresh(a).remote_id == "r1"
+    assert stats["unmatched"] == 1
+
+def test_creates_rows_for_known_users(portal, roles, make_user):
+    carol = make_user("carol")
+    stats = reconcile(portal, [
+        {"remote_id": "r3", "username": "carol@vendor", "user": "carol", "role": "Admin"},
+        {"remote_id": "r4", "username": "nobody", "user": "nobody", "role": "Admin"},
+        {"remote_id": "r5", "username": "carol2", "user": "carol", "role": "No such role"},
+    ])
+    assert stats["created"] == 1
+    assert stats["unmatched"] == 2
+    created = AccessAssignment.objects.get(portal=portal, remote_id="r3")
+    assert (created.user_id, created.role_id, created.needs_push) == (carol.pk, roles["Admin"], False)
+
+def test_deactivates_linked_rows_the_vendor_dropped(portal, assign):
+    gone = assign("alice", remote_id="r1")
+    unlinked = assign("bob")
+    stats = reconcile(portal, [])
+    assert stats["deactivated"] == 1
+    assert not fresh(gone).active
+    assert fresh(unlinked).active
+
+def test_pending_pushes_win_over_vendor_copy(portal, roles, assign):
+    edited = assign("alice", remote_id="r1", role="Admin", needs_push=True)
+    created_locally = assign("bob", remote_id="r2", needs_push=True)
+    stats = reconcile(portal, [{"remote_id": "r1", "username": "alice", "role": "Read", "active": False}])
+    assert stats["pending_push"] == 1
+    assert (fresh(edited).role_id, fresh(edited).active, fresh(edited).needs_push) == (roles["Admin"], True, True)
+    assert fresh(created_locally).active
+
+def test_unchanged_rows_are_not_written(portal, assign):
+    assign("alice", remote_id="r1")
+    stats = reconcile(portal, [{"remote_id": "r1", "username": "alice", "role": "Read", "active": True}])
+    assert (stats["seen"], stats["updated"], stats["created"], stats["deactivated"]) == (1, 0, 0, 0)
+
+def test_later_chunks_see_earlier_writes(portal, make_user):
+    make_user("carol")
+    stats = Reconciler(portal, chunk_size=1).apply([
+        {"remote_id": "r3", "username": "carol", "user": "carol", "role": "Read"},
+        {"remote_id": "r3", "username": "carol", "user": "carol", "role": "Read"},
+    ])
+    assert stats["created"] == 1
+    assert AccessAssignment.objects.filter(portal=portal, remote_id="r3").count() == 1
+
+def test_incremental_changes_checkpoint_each_page(portal, roles, assign):
+    a = assign("alice", remote_id="r1")
+    b = assign("bob", remote_id="r2")
+    untouched = assign("carol", remote_id="r3")
+    checkpoints = []
+    pages = [
+        ([{"remote_id": "r1", "username": "alice", "role": "Admin"}], "c1"),
+        ([{"remote_id": "r2", "deleted": True}, {"remote_id": "r9", "deleted": True}], "c2"),
+    ]
+    stats = Reconciler(portal).apply_changes(pages, checkpoints.append)
+    assert checkpoints == ["c1", "c2"]
+    assert fresh(a).role_id == roles["Admin"]
+    assert not fresh(b).active
+    assert fresh(untouched).active
+    assert stats["created"] == 0 and stats["unmatched"] == 0
+
+def use_adapter(portal, slug: str, **fields) -> None:
+    Portal.objects.filter(pk=portal.pk).update(adapter=slug, **fields)
+
+def test_incremental_sync_resumes_from_cursor(portal, roles, assign):
+    a = assign("alice", remote_id="r1")
+    use_adapter(portal, "test-feed", sync_cursor="c1", last_sync_at=timezone.now())
+
+    stats = tasks.sync_portal_incremental(portal.pk)
+    assert reads == [("changes", "c1")]
+    assert stats["updated"] == 1
+    assert fresh(a).role_id == roles["Admin"]
+    assert Portal.objects.get(pk=portal.pk).sync_cursor == "c2"
+
+def test_first_sync_is_a_full_sync(portal, assign):
+    assign("alice", remote_id="r1")
+    use_adapter(portal, "test-feed")
+
+    tasks.sync_portal_incremental(portal.pk)
+    assert reads == ["full"]
+    synced = Portal.objects.get(pk=portal.pk)
+    assert synced.last_sync_at is not None
+    assert synced.sync_cursor == ""
+
+def test_sync_reports_missing_adapter_or_user_list(portal):
+    assert tasks.sync_portal(portal.pk) == {"ok": False, "message": "No adapter configured on portal."}
+    use_adapter(portal, "test-push-only")
+    assert tasks.sync_portal(portal.pk) == {"ok": False, "message": "List not implemented"}
+
+def test_adapter_without_change_feed_gets_full_sync(portal):
+    use_adapter(portal, "test-list", last_sync_at=timezone.now())
+    assert tasks.sync_portal_incremental(portal.pk)["ok"]
+    assert reads == ["full"]
+
+def test_incremental_sync_reports_missing_adapter(portal):
+    use_adapter(portal, None, last_sync_at=timezone.now())
+    assert tasks.sync_portal_incremental(portal.pk) == {"ok": False, "message": "No adapter configured on portal."}
+
+def test_only_portals_that_can_sync_are_enqueued(portal, queue):
+    use_adapter(portal, "test-push-only")
+    feed = Portal.objects.create(vendor_ct=portal.vendor_ct, vendor_id=portal.vendor_id, name="Feed Portal", adapter="test-feed")
+    tasks.sync_portals()
+    assert [(job.func, job.args) for job in queue.jobs] == [(tasks.sync_portal_incremental, (feed.pk,))]
+
+@pytest.mark.parametrize("full", [True, False])
+def test_rate_limited_sync_is_rescheduled(portal, assign, queue, full):
+    assign("alice", remote_id="r1")
+    use_adapter(portal, "test-limited", sync_cursor="c1", last_sync_at=timezone.now())
+    job = tasks.sync_portal if full else tasks.sync_portal_incremental
+
+    assert job(portal.pk) == {"ok": False, "message": "Rate limited; sync rescheduled in 12s."}
+    [rescheduled] = queue.jobs
+    assert (rescheduled.func, rescheduled.kwargs) == (job, {"portal_id": portal.pk})
+    assert rescheduled.delay == timedelta(seconds=12)
+    # The page read before the limit is kept; the rerun starts after it
+    assert Portal.objects.get(pk=portal.pk).sync_cursor == ("c1" if full else "c2")